@@ -1,5 +1,7 @@
 import { useEffect, useRef, useState, useCallback } from 'react';
 
+export type Handedness = 'Left' | 'Right' | null;
+
 export interface GestureData {
   type: 'none' | 'pinch' | 'swipe' | 'no_hand';
   cursor?: {
@@ -9,8 +11,58 @@ export interface GestureData {
   direction?: 'left' | 'right' | 'up' | 'down';
   action?: 'add_item' | 'rotate_left' | 'rotate_right' | 'open_modal' | 'close_modal';
   timestamp: number;
+  hand_id?: number;  // Stable track ID of the hand this frame describes
+  handedness?: Handedness;  // null for recorded landmark streams
+  hands?: GestureData[];  // Every visible hand, when the server tracks more than one
 }
 
+export type GestureProtocol = 'json' | 'binary';
+export type CursorFilter = 'none' | 'one_euro' | 'kalman';
+
+// Binary protocol (see gesture_protocol.py): little-endian packed frames,
+// sent only when the cursor moved, the hand was lost, or a gesture fired.
+const MSG_CURSOR = 1;
+const MSG_NO_HAND = 2;
+const MSG_EVENT = 3;
+
+const EVENT_CODES: Record<number, Pick<GestureData, 'type' | 'direction' | 'action'>> = {
+  1: { type: 'pinch', action: 'add_item' },
+  2: { type: 'swipe', direction: 'left', action: 'rotate_left' },
+  3: { type: 'swipe', direction: 'right', action: 'rotate_right' },
+  4: { type: 'swipe', direction: 'up', action: 'open_modal' },
+  5: { type: 'swipe', direction: 'down', action: 'close_modal' },
+};
+const HANDEDNESS: Handedness[] = [null, 'Left', 'Right'];
+
+export const decodeBinaryGesture = (buffer: ArrayBuffer): GestureData => {
+  const view = new DataView(buffer);
+  const kind = view.getUint8(0);
+  const timestamp = view.getFloat64(1, true);
+
+  switch (kind) {
+    case MSG_NO_HAND:
+      return { type: 'no_hand', timestamp };
+    case MSG_CURSOR:
+      return {
+        type: 'none',
+        timestamp,
+        cursor: { x: view.getFloat32(9, true), y: view.getFloat32(13, true) },
+      };
+    case MSG_EVENT:
+      return {
+        ...EVENT_CODES[view.getUint8(9)],
+        timestamp,
+        cursor: { x: view.getFloat32(10, true), y: view.getFloat32(14, true) },
+        // Hand ID and handedness bytes (absent from older servers)
+        ...(view.byteLength >= 20
+          ? { hand_id: view.getUint8(18), handedness: HANDEDNESS[view.getUint8(19)] ?? null }
+          : {}),
+      };
+    default:
+      throw new Error(`Unknown gesture message type ${kind}`);
+  }
+};
+
 export interface GestureCallbacks {
   onCursorMove?: (x: number, y: number) => void;
   onPinch?: () => void;  // Add gift/card
@@ -25,6 +77,9 @@ interface UseHandGestureOptions {
   serverUrl?: string;
   callbacks?: GestureCallbacks;
   debug?: boolean;
+  protocol?: GestureProtocol;  // 'binary' = packed frames, only sent on change
+  cursorFilter?: CursorFilter;  // Smoothing applied by the server, no need to re-filter here
+  predictCursor?: boolean;  // Server extrapolates the cursor by the pipeline latency
 }
 
 export const useHandGesture = ({
@@ -32,6 +87,9 @@ export const useHandGesture = ({
   serverUrl = 'ws://localhost:8000/ws/gestures',
   callbacks = {},
   debug = false,
+  protocol = 'json',
+  cursorFilter = 'none',
+  predictCursor = false,
 }: UseHandGestureOptions = {}) => {
   const [isConnected, setIsConnected] = useState(false);
   const [isHandDetected, setIsHandDetected] = useState(false);
@@ -57,7 +115,14 @@ export const useHandGesture = ({
     try {
       if (debug) console.log('🔌 Connecting to gesture server:', serverUrl);
 
-      const ws = new WebSocket(serverUrl);
+      const params = new URLSearchParams();
+      if (protocol !== 'json') params.set('protocol', protocol);
+      if (cursorFilter !== 'none') params.set('filter', cursorFilter);
+      if (predictCursor) params.set('predict', '1');
+      const query = params.toString();
+      const url = query ? `${serverUrl}${serverUrl.includes('?') ? '&' : '?'}${query}` : serverUrl;
+      const ws = new WebSocket(url);
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -68,7 +133,9 @@ export const useHandGesture = ({
 
       ws.onmessage = (event) => {
         try {
-          const data: GestureData = JSON.parse(event.data);
+          const data: GestureData = typeof event.data === 'string'
+            ? JSON.parse(event.data)
+            : decodeBinaryGesture(event.data);
           setLastGesture(data);
 
           // Update hand detection status
@@ -133,7 +200,7 @@ export const useHandGesture = ({
     } catch (error) {
       console.error('Failed to create WebSocket connection:', error);
     }
-  }, [enabled, serverUrl, debug]);
+  }, [enabled, serverUrl, debug, protocol, cursorFilter, predictCursor]);
 
   const disconnect = useCallback(() => {
     if (reconnectTimeoutRef.current) {
@@ -120,6 +120,8 @@ const Index = () => {
   } = useHandGesture({
     enabled: gestureEnabled,
     debug: true,
+    cursorFilter: 'one_euro',
+    predictCursor: true,
     callbacks: {
       // ACTION 1: Pinch - Add gift or card based on cursor position
       onPinch: () => {
@@ -0,0 +1,604 @@
+"""
+Gesture recognition benchmark
+Runs GestureDetector over recorded clips or landmark files and reports
+per-stage timings, end-to-end FPS and latency percentiles, plus per-gesture
+precision/recall for labeled clips. Results are stored as JSON so runs can be
+compared and regressions flagged.
+
+Usage:
+    python gesture_benchmark.py clip.mp4 session.jsonl --output results.json
+    python gesture_benchmark.py clip.mp4 --compare baseline.json
+    python gesture_benchmark.py clip.mp4 --scaling 1,2,4
+    python gesture_benchmark.py clip.mp4 --trace-allocations
+    python gesture_benchmark.py clip.mp4 --hands 1,2,4
+    python gesture_benchmark.py clip.mp4 --temporal-skip
+
+Labels are read from --labels, or from <clip>.labels.jsonl next to each input:
+one JSON object per line, {"t": seconds, "type": "pinch"} or
+{"t": seconds, "type": "swipe", "direction": "left"}.
+
+--scaling replays each clip through the process inference backend with 1, 2, 4...
+worker processes (plus the in-process thread backend) and reports throughput.
+
+Every run also checks the feature extraction + pose classification stage
+against FEATURE_BUDGET_US (mean over frames with at least one hand, since
+frames without one skip extraction); a run over budget fails like a regression.
+
+--hands replays each clip with max_hands set to each value and reports the
+per-frame cost against the number of hands actually tracked, so the cost of
+every extra hand can be read off for hardware sizing.
+
+--temporal-skip replays each clip with and without temporal skip inference and
+reports the CPU time saved against the accuracy given up: how far the cursor
+strays from the full-inference run, and event precision/recall (against the
+labels, and against the events of the full-inference run).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+import numpy as np
+import gesture_server
+from gesture_features import FEATURE_BUDGET_US
+from gesture_preview import PreviewStream
+from gesture_roi import HandRoiTracker
+from gesture_protocol import PROTOCOLS, EncodedFrame, make_encoder
+from gesture_server import GestureDetector
+from gesture_skip import TemporalSkip
+from gesture_sources import open_source
+
+STAGES = ["capture", "skip", "convert", "inference", "features", "classify", "preview", "serialize", "send"]
+GESTURE_KEYS = ["pinch", "swipe_left", "swipe_right", "swipe_up", "swipe_down"]
+MATCH_TOLERANCE = 0.3  # Seconds between a detected event and its label
+REGRESSION_TOLERANCE = 0.10  # Relative change that counts as a regression
+
+# Metrics compared against a baseline: (path inside a run, higher is better)
+COMPARED_METRICS = [
+    (("fps",), True),
+    (("latency", "p95_ms"), False),
+    (("latency", "p99_ms"), False),
+]
+
+def gesture_key(event):
+    """'pinch' or 'swipe_<direction>'"""
+    if event["type"] == "swipe":
+        return f"swipe_{event['direction']}"
+    return event["type"]
+
+def summarize(samples):
+    """Mean and percentiles of a list of durations in seconds, reported in ms"""
+    values = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(values),
+        "mean_ms": round(float(values.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+    }
+
+class AllocationTracker:
+    """tracemalloc instrumentation around each frame
+
+    tracemalloc cannot count blocks that are allocated and freed inside the
+    frame, so two figures are kept: the high-water mark of memory allocated on
+    top of what was live when the frame started (flip/convert/overlay copies
+    show up here), and the number and size of blocks still live at the end of
+    the frame that were not before (pool growth, leaks). Snapshots are slow,
+    so stage timings of an instrumented run are not representative.
+    """
+
+    def __init__(self):
+        self.peak_bytes = []
+        self.retained_blocks = []
+        self.retained_bytes = []
+        self.before = None
+        self.start_bytes = 0
+
+    def start(self):
+        tracemalloc.start()
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def frame_start(self):
+        self.before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        self.start_bytes = tracemalloc.get_traced_memory()[0]
+
+    def frame_end(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+        grown = [d for d in after.compare_to(self.before, "traceback") if d.size_diff > 0]
+        self.peak_bytes.append(peak - self.start_bytes)
+        self.retained_blocks.append(sum(max(d.count_diff, 0) for d in grown))
+        self.retained_bytes.append(sum(d.size_diff for d in grown))
+        self.before = None
+
+    def report(self):
+        # The first frames fill buffer pools and caches; steady state is what matters
+        skip = min(5, max(len(self.peak_bytes) - 1, 0))
+        peak = np.asarray(self.peak_bytes[skip:])
+        return {
+            "frames": len(peak),
+            "peak_bytes_mean": round(float(peak.mean()), 1),
+            "peak_bytes_max": int(peak.max()),
+            "retained_blocks_per_frame": round(float(np.mean(self.retained_blocks[skip:])), 2),
+            "retained_bytes_per_frame": round(float(np.mean(self.retained_bytes[skip:])), 1),
+        }
+
+class LoopbackSink:
+    """Socket pair standing in for a client connection, drained on a thread"""
+
+    def __init__(self):
+        self.sender, self.receiver = socket.socketpair()
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def _drain(self):
+        while self.receiver.recv(65536):
+            pass
+
+    def send(self, payload):
+        self.sender.sendall(payload)
+
+    def close(self):
+        self.sender.close()
+        self.thread.join(timeout=1.0)
+        self.receiver.close()
+
+def load_labels(path):
+    labels = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                labels.append(json.loads(line))
+    return labels
+
+def score(events, labels, tolerance=MATCH_TOLERANCE):
+    """Per-gesture precision/recall, matching events to labels one-to-one within tolerance"""
+    report = {}
+    for key in GESTURE_KEYS:
+        detected = sorted(e["timestamp"] for e in events if gesture_key(e) == key)
+        expected = sorted(l["t"] for l in labels if gesture_key(l) == key)
+        unmatched = list(expected)
+        tp = 0
+        for t in detected:
+            best = min(unmatched, key=lambda l: abs(l - t), default=None)
+            if best is not None and abs(best - t) <= tolerance:
+                unmatched.remove(best)
+                tp += 1
+        fp = len(detected) - tp
+        fn = len(unmatched)
+        if not detected and not expected:
+            continue
+        report[key] = {
+            "tp": tp,
+            "fp": fp,
+            "fn": fn,
+            "precision": round(tp / (tp + fp), 4) if detected else None,
+            "recall": round(tp / (tp + fn), 4) if expected else None,
+        }
+    return report
+
+def benchmark_source(path, show_preview=False, protocol="json", roi=False, inference_scale=1.0,
+                     trace_allocations=False, max_hands=1, temporal_skip=False, cursors=None):
+    """Run one clip or landmark file through the detector and time every stage
+
+    If `cursors` is a list, the cursor of every frame ((x, y), or None without a
+    hand) is appended to it.
+    """
+    source = open_source(path)
+    if source.realtime:
+        raise ValueError(f"{path}: benchmarks need a recorded clip, image directory or landmark file")
+
+    detector = GestureDetector(source, record_path=None, log_gestures=False, max_hands=max_hands)
+    if show_preview:
+        # Worst case: a viewer attached and a snapshot rendered for every frame
+        detector.preview = PreviewStream(fps=float("inf"))
+        detector.preview.attach()
+    detector.roi = HandRoiTracker(roi, downscale=inference_scale, max_hands=max_hands)
+    detector.skipper = TemporalSkip(temporal_skip)
+    if not detector.start_source():
+        raise IOError(f"Cannot open {path}")
+
+    sink = LoopbackSink()
+    encoder = make_encoder(protocol)
+    sent_bytes = 0
+    stages = {stage: [] for stage in STAGES}
+    totals = []
+    events = []
+    hand_counts = []
+    hand_features = []  # "features" stage time of frames with at least one hand
+    allocations = AllocationTracker() if trace_allocations else None
+    if allocations:
+        allocations.start()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        while True:
+            if allocations:
+                allocations.frame_start()
+            frame_start = time.perf_counter()
+            frame = source.read()
+            if frame is None:
+                if source.exhausted:
+                    break
+                continue
+            capture_time = time.perf_counter() - frame_start
+
+            gesture_data = detector.process_frame(frame)
+            source.release(frame)
+            if show_preview:
+                render_start = time.perf_counter()
+                detector.preview.next_jpeg(0)
+                preview_render = time.perf_counter() - render_start
+            serialize_start = time.perf_counter()
+            payload = encoder.encode(EncodedFrame(gesture_data))
+            if isinstance(payload, str):
+                payload = payload.encode()
+            send_start = time.perf_counter()
+            if payload is not None:
+                sink.send(payload)
+                sent_bytes += len(payload)
+            frame_end = time.perf_counter()
+            if allocations:
+                allocations.frame_end()
+
+            times = detector.stage_times
+            times["capture"] = capture_time
+            times["serialize"] = send_start - serialize_start
+            times["send"] = frame_end - send_start
+            if show_preview:
+                times["preview"] = times.get("preview", 0.0) + preview_render
+            for stage, elapsed in times.items():
+                stages[stage].append(elapsed)
+            totals.append(frame_end - frame_start)
+
+            hands = gesture_data.get("hands") or ([] if gesture_data["type"] == "no_hand" else [gesture_data])
+            hand_counts.append(len(hands))
+            if hands and "features" in times:
+                hand_features.append(times["features"])
+            events.extend(hand for hand in hands if hand["type"] in ("pinch", "swipe"))
+            if cursors is not None:
+                cursor = gesture_data.get("cursor")
+                cursors.append((cursor["x"], cursor["y"]) if cursor else None)
+    finally:
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        if allocations:
+            allocations.stop()
+        sink.close()
+        detector.stop_source()
+
+    result = {
+        "frames": len(totals),
+        "wall_seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "fps": round(len(totals) / wall, 2) if wall > 0 else None,
+        "protocol": protocol,
+        "bytes_per_frame": round(sent_bytes / len(totals), 2) if totals else None,
+        "stages": {stage: summarize(samples) for stage, samples in stages.items() if samples},
+        "latency": summarize(totals) if totals else None,
+        "max_hands": max_hands,
+        "hands_per_frame": round(float(np.mean(hand_counts)), 3) if hand_counts else None,
+        "roi_frames": detector.roi.roi_frames,
+        "full_frames": detector.roi.full_frames,
+        "skipped_frames": detector.skipper.skipped_frames,
+        "events": {key: sum(1 for e in events if gesture_key(e) == key) for key in GESTURE_KEYS},
+    }
+    if allocations and allocations.peak_bytes:
+        result["allocations"] = allocations.report()
+    if hand_features:
+        mean_us = float(np.mean(hand_features)) * 1e6
+        result["feature_budget"] = {"budget_us": FEATURE_BUDGET_US, "mean_us": round(mean_us, 1),
+                                    "frames": len(hand_features), "ok": mean_us <= FEATURE_BUDGET_US}
+    return result, events
+
+def measure_throughput(path, backend, processes=1, roi=False, inference_scale=1.0):
+    """Frames per second of the pipelined detector loop over a clip, excluding pool start-up"""
+    detector = GestureDetector(open_source(path), record_path=None, log_gestures=False,
+                               backend=backend, processes=processes)
+    detector.roi = HandRoiTracker(roi, downscale=inference_scale)
+    if not detector.start_source():
+        raise IOError(f"Cannot open {path}")
+
+    frames = 0
+    first = last = None
+    try:
+        while True:
+            try:
+                gesture_data = detector.capture_and_process()
+            except EOFError:
+                break
+            if gesture_data is None:
+                continue
+            # Start the clock at the first result, once every worker has built its graph
+            last = time.perf_counter()
+            if first is None:
+                first = last
+            frames += 1
+    finally:
+        detector.stop_source()
+
+    wall = (last - first) if frames > 1 else 0.0
+    return {
+        "frames": frames,
+        "wall_seconds": round(wall, 4),
+        "fps": round((frames - 1) / wall, 2) if wall > 0 else None,
+    }
+
+def benchmark_scaling(path, worker_counts, roi=False, inference_scale=1.0):
+    """Throughput of the thread backend and of the process backend at each worker count"""
+    if open_source(path).provides_landmarks:
+        raise ValueError(f"{path}: scaling needs a clip or image directory, landmark files skip inference")
+
+    report = {"thread": measure_throughput(path, "thread", roi=roi, inference_scale=inference_scale)}
+    for workers in worker_counts:
+        report[f"process_{workers}"] = measure_throughput(path, "process", workers, roi, inference_scale)
+
+    baseline = report["thread"]["fps"]
+    for run in report.values():
+        run["speedup"] = round(run["fps"] / baseline, 2) if run["fps"] and baseline else None
+    return report
+
+def print_scaling(name, report):
+    print(f"\n⚙️  {name}: inference scaling")
+    print(f"   {'backend':<12} {'frames':>7} {'FPS':>9} {'speedup':>8}")
+    for backend, run in report.items():
+        print(f"   {backend:<12} {run['frames']:>7} {run['fps'] or 0:>9.2f} {run['speedup'] or 0:>7.2f}x")
+
+def benchmark_hands(path, hand_limits, roi=False, inference_scale=1.0):
+    """Per-frame cost at each max_hands setting, and the marginal cost of one more tracked hand
+
+    Cost grows with the hands actually found, not with the limit, so each run is
+    compared with the first one by (extra ms per frame) / (extra hands per frame).
+    """
+    report = {}
+    for max_hands in hand_limits:
+        run, _ = benchmark_source(path, roi=roi, inference_scale=inference_scale, max_hands=max_hands)
+        stages = run["stages"]
+        report[f"max_hands_{max_hands}"] = {
+            "hands_per_frame": run["hands_per_frame"],
+            "fps": run["fps"],
+            "frame_ms": run["latency"]["mean_ms"] if run["latency"] else None,
+            "inference_ms": stages["inference"]["mean_ms"] if "inference" in stages else 0.0,
+            "classify_ms": stages["classify"]["mean_ms"] if "classify" in stages else 0.0,
+        }
+
+    base = next(iter(report.values()))
+    for run in report.values():
+        extra_hands = (run["hands_per_frame"] or 0) - (base["hands_per_frame"] or 0)
+        if extra_hands < 0.05 or run["frame_ms"] is None or base["frame_ms"] is None:
+            run["ms_per_extra_hand"] = None
+            continue
+        run["ms_per_extra_hand"] = round((run["frame_ms"] - base["frame_ms"]) / extra_hands, 3)
+    return report
+
+def print_hands(name, report):
+    print(f"\n✋ {name}: cost per tracked hand")
+    print(f"   {'limit':<14} {'hands/frame':>11} {'FPS':>9} {'frame ms':>9} {'infer ms':>9} "
+          f"{'class. ms':>9} {'ms/+hand':>9}")
+    for limit, run in report.items():
+        extra = f"{run['ms_per_extra_hand']:>9.3f}" if run["ms_per_extra_hand"] is not None else f"{'-':>9}"
+        print(f"   {limit:<14} {run['hands_per_frame'] or 0:>11.2f} {run['fps'] or 0:>9.2f} "
+              f"{run['frame_ms'] or 0:>9.3f} {run['inference_ms']:>9.3f} {run['classify_ms']:>9.3f} {extra}")
+
+def find_labels(path, labels_arg):
+    if labels_arg:
+        return labels_arg
+    candidate = os.path.splitext(path.rstrip("/"))[0] + ".labels.jsonl"
+    return candidate if os.path.exists(candidate) else None
+
+def lookup(run, path):
+    for key in path:
+        if not isinstance(run, dict) or key not in run:
+            return None
+        run = run[key]
+    return run
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """List human-readable regressions of results against a baseline run"""
+    regressions = []
+    for name, run in results["runs"].items():
+        base = baseline.get("runs", {}).get(name)
+        if base is None:
+            continue
+
+        metrics = list(COMPARED_METRICS)
+        for key in run.get("accuracy", {}):
+            metrics.append((("accuracy", key, "precision"), True))
+            metrics.append((("accuracy", key, "recall"), True))
+
+        for path, higher_is_better in metrics:
+            new, old = lookup(run, path), lookup(base, path)
+            if new is None or old is None or old == 0:
+                continue
+            change = (new - old) / abs(old)
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{name}: {'.'.join(path)} {old} -> {new} ({change:+.1%})")
+    return regressions
+
+def print_run(name, run):
+    print(f"\n📼 {name}: {run['frames']} frames, {run['fps']} FPS, "
+          f"{run['bytes_per_frame']} bytes/frame ({run['protocol']})")
+    print(f"   {'stage':<10} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}  (ms)")
+    rows = list(run["stages"].items())
+    if run["latency"]:
+        rows.append(("total", run["latency"]))
+    for stage, stats in rows:
+        print(f"   {stage:<10} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} "
+              f"{stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f}")
+    if "allocations" in run:
+        alloc = run["allocations"]
+        print(f"   allocations/frame: peak {alloc['peak_bytes_mean'] / 1024:.1f} KiB "
+              f"(max {alloc['peak_bytes_max'] / 1024:.1f} KiB), retained {alloc['retained_blocks_per_frame']} "
+              f"blocks / {alloc['retained_bytes_per_frame']:.0f} B")
+    if "feature_budget" in run:
+        budget = run["feature_budget"]
+        print(f"   features: {budget['mean_us']:.1f} µs/frame over {budget['frames']} frames with a hand, "
+              f"budget {budget['budget_us']} µs {'✅' if budget['ok'] else '❌ over budget'}")
+    for key, acc in run.get("accuracy", {}).items():
+        print(f"   {key:<12} precision={acc['precision']}  recall={acc['recall']}  "
+              f"(tp={acc['tp']} fp={acc['fp']} fn={acc['fn']})")
+
+def benchmark_skip(path, labels=None, roi=False, inference_scale=1.0, max_hands=1):
+    """CPU saved by temporal skip inference against the accuracy it gives up
+
+    Both runs see the same frames; the full-inference run is the reference for
+    the cursor error and for event agreement.
+    """
+    if open_source(path).provides_landmarks:
+        raise ValueError(f"{path}: temporal skip needs a clip or image directory, landmark files skip inference")
+
+    full_cursors, skip_cursors = [], []
+    full, full_events = benchmark_source(path, roi=roi, inference_scale=inference_scale, max_hands=max_hands,
+                                         cursors=full_cursors)
+    skip, skip_events = benchmark_source(path, roi=roi, inference_scale=inference_scale, max_hands=max_hands,
+                                         temporal_skip=True, cursors=skip_cursors)
+
+    # Cursor distance in pixels on frames where both runs saw a hand
+    errors = [np.hypot((a[0] - b[0]) * gesture_server.CAM_W, (a[1] - b[1]) * gesture_server.CAM_H)
+              for a, b in zip(full_cursors, skip_cursors) if a is not None and b is not None]
+    hand_mismatch = sum((a is None) != (b is None) for a, b in zip(full_cursors, skip_cursors))
+    reference = [{"t": e["timestamp"], "type": e["type"], "direction": e.get("direction")} for e in full_events]
+
+    report = {
+        "frames": skip["frames"],
+        "skipped_ratio": round(skip["skipped_frames"] / skip["frames"], 3) if skip["frames"] else 0.0,
+        "cpu_seconds": {"full": full["cpu_seconds"], "skip": skip["cpu_seconds"]},
+        "cpu_saving": round(1 - skip["cpu_seconds"] / full["cpu_seconds"], 3) if full["cpu_seconds"] else None,
+        "fps": {"full": full["fps"], "skip": skip["fps"]},
+        "cursor_error_px": {
+            "mean": round(float(np.mean(errors)), 2) if errors else 0.0,
+            "p95": round(float(np.percentile(errors, 95)), 2) if errors else 0.0,
+            "max": round(float(np.max(errors)), 2) if errors else 0.0,
+        },
+        "hand_mismatch_frames": hand_mismatch,
+        "event_agreement": score(skip_events, reference),
+    }
+    if labels:
+        report["accuracy"] = {"full": score(full_events, labels), "skip": score(skip_events, labels)}
+    return report
+
+def print_skip(name, report):
+    print(f"\n⏭️  {name}: temporal skip")
+    print(f"   skipped {report['skipped_ratio']:.1%} of {report['frames']} frames, "
+          f"CPU {report['cpu_seconds']['full']:.2f}s -> {report['cpu_seconds']['skip']:.2f}s "
+          f"({(report['cpu_saving'] or 0):.1%} saved), FPS {report['fps']['full'] or 0:.1f} -> {report['fps']['skip'] or 0:.1f}")
+    error = report["cursor_error_px"]
+    print(f"   cursor error vs full inference: mean {error['mean']:.2f}px  p95 {error['p95']:.2f}px  "
+          f"max {error['max']:.2f}px, hand presence differs on {report['hand_mismatch_frames']} frames")
+    print("   events vs full inference:" + ("" if report["event_agreement"] else " none in either run"))
+    for key, value in report["event_agreement"].items():
+        print(f"     {key:<12} precision={value['precision']}  recall={value['recall']}")
+    for run, scores in report.get("accuracy", {}).items():
+        print(f"   accuracy ({run}):")
+        for key, value in scores.items():
+            print(f"     {key:<12} precision={value['precision']}  recall={value['recall']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark gesture recognition on recorded input")
+    parser.add_argument("inputs", nargs="+", help="Video files, image directories or landmark recordings")
+    parser.add_argument("--labels", default=None, help="Label file (only with a single input)")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Relative change that counts as a regression")
+    parser.add_argument("--preview", action="store_true", help="Render an MJPEG preview frame for every frame in the timed loop")
+    parser.add_argument("--protocol", choices=PROTOCOLS, default="json", help="Wire protocol to serialize with")
+    parser.add_argument("--roi", action="store_true", help="Crop inference around the tracked hand")
+    parser.add_argument("--inference-scale", type=float, default=1.0, help="Downscale factor for full-frame searches")
+    parser.add_argument("--trace-allocations", action="store_true",
+                        help="Report per-frame allocations with tracemalloc (slows the run down)")
+    parser.add_argument("--scaling", default=None, metavar="N,N,...",
+                        help="Also measure process-backend throughput at these worker counts, e.g. 1,2,4")
+    parser.add_argument("--max-hands", type=int, default=1, help="Hands tracked at once in the main runs")
+    parser.add_argument("--hands", default=None, metavar="N,N,...",
+                        help="Also measure the cost per extra hand at these max_hands settings, e.g. 1,2")
+    parser.add_argument("--temporal-skip", action="store_true",
+                        help="Also compare CPU time and accuracy with and without temporal skip inference")
+    args = parser.parse_args(argv)
+
+    if args.labels and len(args.inputs) > 1:
+        parser.error("--labels needs a single input; use <clip>.labels.jsonl files instead")
+
+    results = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "config": {
+            "pinch_threshold": gesture_server.PINCH_THRESHOLD,
+            "swipe_horizontal_threshold": gesture_server.SWIPE_HORIZONTAL_THRESHOLD,
+            "swipe_vertical_threshold": gesture_server.SWIPE_VERTICAL_THRESHOLD,
+            "gesture_cooldown": gesture_server.GESTURE_COOLDOWN,
+            "movement_confirmation_frames": gesture_server.MOVEMENT_CONFIRMATION_FRAMES,
+            "max_hands": args.max_hands,
+        },
+        "runs": {},
+    }
+
+    for path in args.inputs:
+        run, events = benchmark_source(path, show_preview=args.preview, protocol=args.protocol,
+                                       roi=args.roi, inference_scale=args.inference_scale,
+                                       trace_allocations=args.trace_allocations, max_hands=args.max_hands)
+        labels_path = find_labels(path, args.labels)
+        if labels_path:
+            run["accuracy"] = score(events, load_labels(labels_path))
+        results["runs"][path] = run
+        print_run(path, run)
+
+    if args.scaling:
+        worker_counts = [int(n) for n in args.scaling.split(",")]
+        results["scaling"] = {}
+        for path in args.inputs:
+            report = benchmark_scaling(path, worker_counts, args.roi, args.inference_scale)
+            results["scaling"][path] = report
+            print_scaling(path, report)
+
+    if args.hands:
+        hand_limits = [int(n) for n in args.hands.split(",")]
+        results["hands"] = {}
+        for path in args.inputs:
+            report = benchmark_hands(path, hand_limits, args.roi, args.inference_scale)
+            results["hands"][path] = report
+            print_hands(path, report)
+
+    if args.temporal_skip:
+        results["temporal_skip"] = {}
+        for path in args.inputs:
+            labels_path = find_labels(path, args.labels)
+            report = benchmark_skip(path, load_labels(labels_path) if labels_path else None,
+                                    args.roi, args.inference_scale, args.max_hands)
+            results["temporal_skip"][path] = report
+            print_skip(path, report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    over_budget = [name for name, run in results["runs"].items() if not run.get("feature_budget", {}).get("ok", True)]
+    if over_budget:
+        print(f"\n❌ Feature extraction over its {FEATURE_BUDGET_US} µs budget: {', '.join(over_budget)}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print(f"\n✅ No regressions against {args.compare}")
+    return 1 if over_budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+Camera capture configuration
+Opens live devices with an explicit OpenCV backend, pixel format (FOURCC),
+frame rate, driver buffer depth and exposure instead of the driver defaults,
+which on many USB cameras are uncompressed YUYV at a low frame rate and an
+auto exposure that stretches frames in dim rooms. The mode the driver
+actually negotiated is read back after opening, and probe_modes() benchmarks
+candidate modes so each kiosk can use its fastest, lowest-latency one.
+
+    python gesture_camera.py --device 0                     # show the negotiated mode
+    python gesture_camera.py --device /dev/video2 --probe   # benchmark candidate modes
+    python gesture_camera.py --probe --fourcc MJPG,YUYV --sizes 640x480,1280x720 --fps 30,60
+"""
+import argparse
+import time
+from collections import namedtuple
+import numpy as np
+
+# Backend name -> cv2 capture API constant (cv2 is imported when a device opens)
+CAMERA_BACKENDS = {
+    "auto": "CAP_ANY",
+    "v4l2": "CAP_V4L2",
+    "gstreamer": "CAP_GSTREAMER",
+    "ffmpeg": "CAP_FFMPEG",  # Network streams (rtsp://, http://) and files
+}
+
+# Defaults for live devices
+CAMERA_BACKEND = "auto"
+CAMERA_FOURCC = "MJPG"  # Compressed on the camera, so USB 2.0 bandwidth allows 30+ FPS at 640x480
+CAMERA_FPS = 30
+CAMERA_BUFFER_SIZE = 1  # Driver-side frame queue; 1 keeps frames fresh (FrameGrabber drains it anyway)
+CAMERA_EXPOSURE = None  # None keeps the driver setting, "auto", or a manual value (driver units)
+
+# V4L2 values of CAP_PROP_AUTO_EXPOSURE
+AUTO_EXPOSURE_MANUAL = 1
+AUTO_EXPOSURE_AUTO = 3
+
+# Probe defaults
+PROBE_FOURCCS = ("MJPG", "YUYV")
+PROBE_SIZES = ((640, 480), (1280, 720))
+PROBE_FPS = (30, 60)
+PROBE_WARMUP_FRAMES = 10  # Frames discarded while the device starts streaming
+PROBE_FRAMES = 60  # Frames timed per mode
+
+# Options for one live device. `device` is a camera index, a /dev/video* path,
+# a stream URL or a GStreamer pipeline ending in appsink
+CameraConfig = namedtuple("CameraConfig", [
+    "device", "width", "height", "backend", "fourcc", "fps", "buffer_size", "exposure",
+], defaults=[640, 480, CAMERA_BACKEND, CAMERA_FOURCC, CAMERA_FPS, CAMERA_BUFFER_SIZE, CAMERA_EXPOSURE])
+
+def is_camera_spec(spec):
+    """True for sources that are live devices rather than recordings"""
+    if isinstance(spec, int):
+        return True
+    spec = str(spec)
+    return (spec.isdigit() or spec.startswith("/dev/video") or "!" in spec
+            or spec.lower().startswith(("rtsp://", "rtmp://", "http://", "https://")))
+
+def decode_fourcc(value):
+    code = int(value)
+    return "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\x00") or None
+
+def open_capture(config, capture_factory=None):
+    """Open a device and request the configured mode; returns the VideoCapture (check isOpened())
+
+    capture_factory(device, api) replaces cv2.VideoCapture, e.g. with a fake camera in tests.
+    """
+    import cv2
+    if config.backend not in CAMERA_BACKENDS:
+        raise ValueError(f"Unknown camera backend '{config.backend}', expected one of {', '.join(CAMERA_BACKENDS)}")
+    device = int(config.device) if str(config.device).isdigit() else config.device
+    backend = getattr(cv2, CAMERA_BACKENDS[config.backend])
+    if backend == cv2.CAP_ANY and isinstance(device, str) and "!" in device:
+        backend = cv2.CAP_GSTREAMER
+    cap = (capture_factory or cv2.VideoCapture)(device, backend)
+    if not cap.isOpened():
+        return cap
+
+    # V4L2 picks the frame interval from the format and size, so the order matters:
+    # pixel format, then size, then rate
+    if config.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*config.fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.height)
+    if config.fps:
+        cap.set(cv2.CAP_PROP_FPS, config.fps)
+    if config.buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, config.buffer_size)
+    if config.exposure == "auto":
+        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, AUTO_EXPOSURE_AUTO)
+    elif config.exposure is not None:
+        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, AUTO_EXPOSURE_MANUAL)
+        cap.set(cv2.CAP_PROP_EXPOSURE, float(config.exposure))
+    return cap
+
+def negotiated_mode(cap):
+    """The mode the driver actually applied, which may differ from the request"""
+    import cv2
+    try:
+        backend = cap.getBackendName()
+    except cv2.error:
+        backend = None
+    return {
+        "backend": backend,
+        "fourcc": decode_fourcc(cap.get(cv2.CAP_PROP_FOURCC)),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": round(cap.get(cv2.CAP_PROP_FPS), 2),
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        "exposure": cap.get(cv2.CAP_PROP_EXPOSURE),
+        "auto_exposure": cap.get(cv2.CAP_PROP_AUTO_EXPOSURE),
+    }
+
+def mode_matches(config, mode):
+    """Whether the driver accepted the requested format and size (rate is checked by measuring)"""
+    return ((not config.fourcc or mode["fourcc"] == config.fourcc)
+            and mode["width"] == config.width and mode["height"] == config.height)
+
+def describe_mode(mode):
+    return (f"{mode['fourcc'] or '?'} {mode['width']}x{mode['height']} @ {mode['fps']:g} FPS "
+            f"via {mode['backend'] or '?'}, buffer {mode['buffer_size']}")
+
+def measure_capture(cap, frames=PROBE_FRAMES, warmup=PROBE_WARMUP_FRAMES):
+    """Read frames as fast as the device delivers them
+
+    Returns the measured FPS, the p50/p95 interval between frames and, when the
+    backend stamps buffers on the monotonic clock (V4L2), the p50 age of a frame
+    when read() returns it. None when the device stops delivering frames.
+    """
+    import cv2
+    buffer = None
+    for _ in range(warmup):
+        success, buffer = cap.read(buffer)
+        if not success:
+            return None
+
+    intervals = []
+    ages = []
+    last = time.perf_counter()
+    for _ in range(frames):
+        success, buffer = cap.read(buffer)
+        now = time.perf_counter()
+        if not success:
+            return None
+        intervals.append(now - last)
+        last = now
+        age = time.monotonic() * 1000 - cap.get(cv2.CAP_PROP_POS_MSEC)
+        if 0 <= age < 1000:
+            ages.append(age)
+
+    intervals = np.asarray(intervals) * 1000
+    return {
+        "measured_fps": round(1000 / intervals.mean(), 1),
+        "interval_p50_ms": round(float(np.percentile(intervals, 50)), 2),
+        "interval_p95_ms": round(float(np.percentile(intervals, 95)), 2),
+        "age_p50_ms": round(float(np.percentile(ages, 50)), 2) if len(ages) == frames else None,
+    }
+
+def probe_modes(config, fourccs=PROBE_FOURCCS, sizes=PROBE_SIZES, rates=PROBE_FPS, frames=PROBE_FRAMES,
+                capture_factory=None):
+    """Open the device once per candidate mode and time it; best mode first
+
+    Modes the driver did not accept as requested are listed after the rest,
+    the others are ordered by measured FPS, then by frame interval jitter. A
+    mode the device fails to open is recorded with `negotiated` None and the
+    probe moves on to the next one.
+    """
+    results = []
+    for fourcc in fourccs:
+        for width, height in sizes:
+            for fps in rates:
+                candidate = config._replace(fourcc=fourcc, width=width, height=height, fps=fps)
+                requested = {"fourcc": fourcc, "width": width, "height": height, "fps": fps}
+                started = time.perf_counter()
+                cap = open_capture(candidate, capture_factory)
+                if not cap.isOpened():
+                    cap.release()
+                    results.append({"requested": requested, "negotiated": None, "matched": False,
+                                    "open_ms": round((time.perf_counter() - started) * 1000, 1), "timing": None})
+                    continue
+                try:
+                    mode = negotiated_mode(cap)
+                    opened = time.perf_counter() - started
+                    timing = measure_capture(cap, frames)
+                finally:
+                    cap.release()
+                results.append({
+                    "requested": requested,
+                    "negotiated": mode,
+                    "matched": mode_matches(candidate, mode),
+                    "open_ms": round(opened * 1000, 1),
+                    "timing": timing,
+                })
+
+    def rank(result):
+        timing = result["timing"] or {"measured_fps": 0.0, "interval_p95_ms": float("inf")}
+        return (result["negotiated"] is None, not result["matched"], -timing["measured_fps"],
+                timing["interval_p95_ms"])
+
+    return sorted(results, key=rank)
+
+def print_probe(results, config):
+    """Probe table, then the server flags that reproduce the best mode on `config`'s device"""
+    print(f"{'requested':<24} {'negotiated':<24} {'FPS':>6} {'p50 ms':>7} {'p95 ms':>7} {'age ms':>7} {'open ms':>8}")
+    for result in results:
+        req, mode, timing = result["requested"], result["negotiated"], result["timing"]
+        requested = f"{req['fourcc']} {req['width']}x{req['height']}@{req['fps']}"
+        if mode is None:
+            print(f"{requested:<24} {'failed to open':<24}")
+            continue
+        negotiated = f"{mode['fourcc'] or '?'} {mode['width']}x{mode['height']}@{mode['fps']:g}"
+        if not result["matched"]:
+            negotiated += " *"
+        if timing is None:
+            print(f"{requested:<24} {negotiated:<24} {'no frames':>6}")
+            continue
+        age = f"{timing['age_p50_ms']:.1f}" if timing["age_p50_ms"] is not None else "-"
+        print(f"{requested:<24} {negotiated:<24} {timing['measured_fps']:>6.1f} {timing['interval_p50_ms']:>7.1f} "
+              f"{timing['interval_p95_ms']:>7.1f} {age:>7} {result['open_ms']:>8.0f}")
+    print("* the driver substituted another format or size")
+
+    best = next((r for r in results if r["matched"] and r["timing"]), None)
+    if best is not None:
+        req = best["requested"]
+        print(f"\n🏁 Best mode: {req['fourcc']} {req['width']}x{req['height']} @ {req['fps']} FPS "
+              f"({best['timing']['measured_fps']:.1f} FPS measured)")
+        print(f"   gesture_server.py --source {config.device} --camera-backend {config.backend} "
+              f"--camera-fourcc {req['fourcc']} --camera-size {req['width']}x{req['height']} --camera-fps {req['fps']}")
+
+def parse_list(text, convert=str):
+    return [convert(item) for item in text.split(",") if item]
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+def parse_exposure(text):
+    """CLI exposure: "auto" or a manual value"""
+    return text if text == "auto" else float(text)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or benchmark the capture modes of a camera")
+    parser.add_argument("--device", default="0", help="Camera index, /dev/video* path, stream URL or GStreamer pipeline")
+    parser.add_argument("--backend", choices=CAMERA_BACKENDS, default=CAMERA_BACKEND, help="OpenCV capture backend")
+    parser.add_argument("--fourcc", default=None,
+                        help=f"Pixel format (default {CAMERA_FOURCC}); with --probe a comma list")
+    parser.add_argument("--size", type=parse_size, default=(640, 480), help="Frame size WxH")
+    parser.add_argument("--fps", default=None, help=f"Frame rate (default {CAMERA_FPS}); with --probe a comma list")
+    parser.add_argument("--buffer-size", type=int, default=CAMERA_BUFFER_SIZE, help="Driver frame queue depth")
+    parser.add_argument("--exposure", type=parse_exposure, default=CAMERA_EXPOSURE,
+                        help='"auto" or a manual exposure value in driver units')
+    parser.add_argument("--probe", action="store_true", help="Benchmark every candidate mode")
+    parser.add_argument("--sizes", default=None, help="Frame sizes to probe, e.g. 640x480,1280x720")
+    parser.add_argument("--frames", type=int, default=PROBE_FRAMES, help="Frames timed per probed mode")
+    args = parser.parse_args(argv)
+
+    config = CameraConfig(args.device, args.size[0], args.size[1], args.backend,
+                          args.fourcc.split(",")[0] if args.fourcc else CAMERA_FOURCC,
+                          int(args.fps.split(",")[0]) if args.fps else CAMERA_FPS,
+                          args.buffer_size, args.exposure)
+
+    if args.probe:
+        fourccs = parse_list(args.fourcc) if args.fourcc else PROBE_FOURCCS
+        sizes = parse_list(args.sizes, parse_size) if args.sizes else PROBE_SIZES
+        rates = parse_list(args.fps, int) if args.fps else PROBE_FPS
+        print(f"🔬 Probing {len(fourccs) * len(sizes) * len(rates)} modes on {args.device} ({args.frames} frames each)")
+        results = probe_modes(config, fourccs, sizes, rates, args.frames)
+        print_probe(results, config)
+        if all(result["negotiated"] is None for result in results):
+            raise SystemExit(f"Cannot open camera {args.device}")
+        return 0
+
+    cap = open_capture(config)
+    try:
+        if not cap.isOpened():
+            raise SystemExit(f"Cannot open camera {args.device}")
+        mode = negotiated_mode(cap)
+        print(f"🎥 Negotiated: {describe_mode(mode)}")
+        if not mode_matches(config, mode):
+            print(f"⚠️  Requested {config.fourcc} {config.width}x{config.height} @ {config.fps} FPS")
+        timing = measure_capture(cap)
+        if timing is not None:
+            print(f"   measured {timing['measured_fps']:.1f} FPS, frame interval p95 {timing['interval_p95_ms']:.1f} ms")
+    finally:
+        cap.release()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+"""
+Hand landmark features and static pose classification
+extract_features() turns an (H, 21, 3) landmark array into per-hand geometry
+in one vectorized pass: hand size, fingertip distances in hand-size units,
+finger extension, palm centre and orientation. Distances are measured in
+hand-size units, so the pose thresholds hold whether the visitor stands close
+to the camera or at the back of the room.
+
+Poses: "pinch" (thumb and index tips together), "fist" (no finger extended,
+used for dragging), "point" (index only), "open" (all four fingers), "other".
+"""
+from collections import namedtuple
+import numpy as np
+
+# Landmark indices (MediaPipe hand model)
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+INDEX_MCP = 5
+MIDDLE_MCP = 9
+PINKY_MCP = 17
+TIPS = np.array([4, 8, 12, 16, 20])  # Thumb, index, middle, ring, pinky
+PIPS = np.array([3, 6, 10, 14, 18])  # Joint each tip is compared against (IP for the thumb)
+PALM = np.array([0, 5, 9, 13, 17])  # Wrist and finger bases
+
+CAM_W, CAM_H = 640, 480
+
+# Thresholds in hand-size units (hand size = wrist to middle-finger base)
+PINCH_RATIO = 0.35  # Thumb-index tip gap below this is a pinch
+PINCH_MIN_REACH = 1.0  # ...with the index tip at least this far from the wrist (in a fist it is curled in)
+EXTENSION_RATIO = 1.1  # A finger is extended when its tip is this much further out than its middle joint
+MIN_HAND_SIZE = 1e-3  # Guards the division for degenerate landmarks
+
+POSES = ("pinch", "fist", "point", "open", "other")
+FEATURE_BUDGET_US = 150  # Budget for extract_features + classify_poses per frame with a hand, checked by the benchmark
+
+# Per hand (leading axis H):
+#   size          (H,)    wrist to middle-finger base, in width-scaled units
+#   tip_to_wrist  (H, 5)  each fingertip's distance from the wrist / size
+#   tip_to_thumb  (H, 4)  index..pinky tip distance from the thumb tip / size
+#   extended      (H, 5)  thumb..pinky extended
+#   palm_center   (H, 2)  mean of the wrist and finger bases, normalized image coordinates
+#   palm_normal   (H, 3)  unit normal of the palm plane (sign flips between palm and back)
+#   palm_angle    (H,)    radians of the wrist -> middle base direction, 0 = fingers up
+HandFeatures = namedtuple("HandFeatures", [
+    "size", "tip_to_wrist", "tip_to_thumb", "extended", "palm_center", "palm_normal", "palm_angle",
+])
+
+# Every landmark difference extract_features needs, as (from, to) pairs, so they
+# all come out of one gather: hand size, tips to wrist, index..pinky tips to the
+# thumb tip, tips and middle joints to their extension anchors, then the two palm edges
+SIZE_PAIRS = [(WRIST, MIDDLE_MCP)]
+WRIST_PAIRS = [(WRIST, tip) for tip in TIPS]
+THUMB_PAIRS = [(THUMB_TIP, tip) for tip in TIPS[1:]]
+ANCHORS = [PINKY_MCP, WRIST, WRIST, WRIST, WRIST]  # Thumb is measured from the pinky base
+TIP_ANCHOR_PAIRS = list(zip(ANCHORS, TIPS))
+PIP_ANCHOR_PAIRS = list(zip(ANCHORS, PIPS))
+PALM_EDGE_PAIRS = [(WRIST, INDEX_MCP), (WRIST, PINKY_MCP)]
+PAIRS = np.array(SIZE_PAIRS + WRIST_PAIRS + THUMB_PAIRS + TIP_ANCHOR_PAIRS + PIP_ANCHOR_PAIRS + PALM_EDGE_PAIRS)
+PAIR_FROM, PAIR_TO = PAIRS[:, 0], PAIRS[:, 1]
+NUM_DISTANCES = 20  # Pairs whose length is needed; the palm edges are only used for the normal
+WRIST_SLICE = slice(1, 6)
+THUMB_SLICE = slice(6, 10)
+TIP_ANCHOR_SLICE = slice(10, 15)
+PIP_ANCHOR_SLICE = slice(15, 20)
+PALM_WEIGHTS = np.zeros(21, dtype=np.float32)  # Palm centre as one matrix product
+PALM_WEIGHTS[PALM] = 1.0 / len(PALM)
+
+# Features of a frame without hands
+NO_FEATURES = HandFeatures(
+    np.empty(0, np.float32), np.empty((0, 5), np.float32), np.empty((0, 4), np.float32),
+    np.empty((0, 5), bool), np.empty((0, 2), np.float32), np.empty((0, 3), np.float32), np.empty(0, np.float32),
+)
+
+def extract_features(landmarks, frame_size=(CAM_W, CAM_H)):
+    """Features of every hand in an (H, 21, 3) array of normalized landmarks"""
+    if not len(landmarks):
+        # Most frames at an idle kiosk have no hand; skip the array work entirely
+        return NO_FEATURES
+    # x (and z, which MediaPipe scales like x) in frame-height units, so distances
+    # are not stretched by the aspect ratio
+    aspect = frame_size[0] / frame_size[1]
+    vectors = landmarks[:, PAIR_TO] - landmarks[:, PAIR_FROM]
+    vectors *= np.array([aspect, 1.0, aspect], dtype=vectors.dtype)
+
+    planar = vectors[:, :NUM_DISTANCES, :2]
+    distances = np.sqrt(np.einsum("hpk,hpk->hp", planar, planar))
+    size = np.maximum(distances[:, 0], MIN_HAND_SIZE)
+    scaled = distances / size[:, None]
+
+    # Fingers: tip further from the wrist than the middle joint. Thumb: tip further
+    # from the pinky base than its IP joint, i.e. not folded across the palm
+    extended = distances[:, TIP_ANCHOR_SLICE] > EXTENSION_RATIO * distances[:, PIP_ANCHOR_SLICE]
+
+    palm_center = PALM_WEIGHTS @ landmarks[..., :2]
+    # Cross product of the two palm edges, with the components rotated by two gathers
+    edges = vectors[:, -2:]
+    yzx, zxy = edges[..., [1, 2, 0]], edges[..., [2, 0, 1]]
+    normal = yzx[:, 0] * zxy[:, 1] - zxy[:, 0] * yzx[:, 1]
+    palm_normal = normal / np.maximum(np.sqrt(np.einsum("hk,hk->h", normal, normal)), MIN_HAND_SIZE)[:, None]
+    palm_angle = np.arctan2(vectors[:, 0, 0], -vectors[:, 0, 1])
+
+    return HandFeatures(size, scaled[:, WRIST_SLICE], scaled[:, THUMB_SLICE], extended,
+                        palm_center, palm_normal, palm_angle)
+
+def classify_poses(features, pinch_ratio=PINCH_RATIO, min_reach=PINCH_MIN_REACH):
+    """Pose name of every hand, from extract_features() output"""
+    poses = []
+    for tip_gap, reach, extended in zip(features.tip_to_thumb[:, 0].tolist(), features.tip_to_wrist[:, 1].tolist(),
+                                        features.extended[:, 1:].tolist()):
+        # Ordered by priority: a pinch with the other fingers curled is a pinch, not a fist
+        up = sum(extended)
+        if tip_gap < pinch_ratio and reach > min_reach:
+            poses.append("pinch")
+        elif up == 0:
+            poses.append("fist")
+        elif up == 1 and extended[0]:
+            poses.append("point")
+        elif up == 4:
+            poses.append("open")
+        else:
+            poses.append("other")
+    return poses
+
+def palm_velocity(palm_center, previous_center, dt):
+    """Palm velocity in normalized units per second; NaN rows in previous_center give zero"""
+    if dt <= 0:
+        return np.zeros_like(palm_center)
+    velocity = (palm_center - previous_center) / dt
+    return np.nan_to_num(velocity, nan=0.0)
@@ -0,0 +1,188 @@
+"""
+Cursor smoothing and prediction filters
+Applied per WebSocket connection on the server, so the frontend receives a
+steady cursor without filtering it again. Select with query parameters:
+
+  /ws/gestures?filter=one_euro&min_cutoff=1.0&beta=10&predict=1
+  /ws/gestures?filter=kalman&process_noise=2&measurement_noise=0.00002
+
+With predict=1 the cursor is extrapolated forward by the measured pipeline
+latency (capture to send), capped at MAX_PREDICTION seconds. Only live sources
+are predicted: video, image and landmark files carry timestamps relative to
+the start of the file, not capture times.
+"""
+import math
+import time
+import numpy as np
+from gesture_protocol import EncodedFrame
+
+FILTERS = ("none", "one_euro", "kalman")
+
+# One Euro defaults (cursor in normalized 0-1 units, time in seconds)
+ONE_EURO_MIN_CUTOFF = 1.0  # Hz, lower = smoother when the hand is still
+ONE_EURO_BETA = 10.0  # Speed coefficient, higher = less lag on fast moves
+ONE_EURO_D_CUTOFF = 1.0  # Hz, cutoff for the derivative estimate
+
+# Constant-velocity Kalman defaults
+KALMAN_PROCESS_NOISE = 2.0  # Acceleration variance
+KALMAN_MEASUREMENT_NOISE = 2e-5  # Landmark jitter variance (about 3 px at 640 wide)
+
+MAX_PREDICTION = 0.1  # Seconds; never extrapolate further than this
+
+def smoothing_factor(dt, cutoff):
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+class OneEuroFilter:
+    """One Euro filter on a 2-D point (Casiez et al. 2012)"""
+
+    def __init__(self, min_cutoff=ONE_EURO_MIN_CUTOFF, beta=ONE_EURO_BETA, d_cutoff=ONE_EURO_D_CUTOFF):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.dx = (0.0, 0.0)
+        self.t = None
+
+    def update(self, x, y, t):
+        """Filter one sample, returns the smoothed (x, y)"""
+        if self.x is None or t <= self.t:
+            self.x = (x, y)
+            self.t = t
+            return self.x
+
+        dt = t - self.t
+        self.t = t
+        a_d = smoothing_factor(dt, self.d_cutoff)
+        dx = (x - self.x[0]) / dt, (y - self.x[1]) / dt
+        self.dx = (
+            self.dx[0] + a_d * (dx[0] - self.dx[0]),
+            self.dx[1] + a_d * (dx[1] - self.dx[1]),
+        )
+
+        # Cutoff rises with speed: smooth when still, responsive when moving
+        cutoff = self.min_cutoff + self.beta * math.hypot(*self.dx)
+        a = smoothing_factor(dt, cutoff)
+        self.x = (self.x[0] + a * (x - self.x[0]), self.x[1] + a * (y - self.x[1]))
+        return self.x
+
+    @property
+    def velocity(self):
+        return self.dx
+
+class KalmanFilter2D:
+    """Constant-velocity Kalman filter, state [x, y, vx, vy]"""
+
+    def __init__(self, process_noise=KALMAN_PROCESS_NOISE, measurement_noise=KALMAN_MEASUREMENT_NOISE):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.reset()
+
+    def reset(self):
+        self.state = None
+        self.P = None
+        self.t = None
+
+    def update(self, x, y, t):
+        """Predict to t, correct with the measurement, returns the filtered (x, y)"""
+        if self.state is None or t <= self.t:
+            self.state = np.array([x, y, 0.0, 0.0])
+            self.P = np.diag([self.r, self.r, 1.0, 1.0])
+            self.t = t
+            return x, y
+
+        dt = t - self.t
+        self.t = t
+
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        # Discrete white-noise acceleration model
+        q = self.q
+        Q = np.zeros((4, 4))
+        Q[0, 0] = Q[1, 1] = q * dt ** 4 / 4
+        Q[0, 2] = Q[2, 0] = Q[1, 3] = Q[3, 1] = q * dt ** 3 / 2
+        Q[2, 2] = Q[3, 3] = q * dt ** 2
+
+        state = F @ self.state
+        P = F @ self.P @ F.T + Q
+
+        # Position-only measurement: H = [I 0], so S and K reduce to 2x2 blocks
+        S = P[:2, :2] + np.eye(2) * self.r
+        K = P[:, :2] @ np.linalg.inv(S)
+        state = state + K @ (np.array([x, y]) - state[:2])
+        P = P - K @ P[:2, :]
+
+        self.state = state
+        self.P = P
+        return float(state[0]), float(state[1])
+
+    @property
+    def velocity(self):
+        if self.state is None:
+            return 0.0, 0.0
+        return float(self.state[2]), float(self.state[3])
+
+class CursorFilter:
+    """Per-connection cursor filter with optional latency compensation"""
+
+    def __init__(self, smoother, predict=False, max_prediction=MAX_PREDICTION):
+        self.smoother = smoother
+        self.predict = predict
+        self.max_prediction = max_prediction
+        self.hand_id = None  # Hand the smoother is following
+
+    def apply(self, frame):
+        """Return the frame with its cursor filtered (a new EncodedFrame when changed)"""
+        data = frame.data
+        cursor = data.get("cursor")
+        if cursor is None:
+            # Hand lost: don't drag the old position into the next appearance
+            self.smoother.reset()
+            return frame
+
+        if data.get("hand_id") != self.hand_id:
+            # Another hand took over the cursor: start fresh instead of sliding across
+            self.smoother.reset()
+            self.hand_id = data.get("hand_id")
+
+        timestamp = data["timestamp"]
+        x, y = self.smoother.update(cursor["x"], cursor["y"], timestamp)
+
+        if self.predict:
+            # Pipeline latency: frame capture to now (only enabled for live sources, whose timestamps are wall-clock)
+            latency = min(max(time.time() - timestamp, 0.0), self.max_prediction)
+            vx, vy = self.smoother.velocity
+            x += vx * latency
+            y += vy * latency
+
+        filtered = dict(data)
+        filtered["cursor"] = {"x": min(max(x, 0.0), 1.0), "y": min(max(y, 0.0), 1.0)}
+        return EncodedFrame(filtered)
+
+def make_cursor_filter(params, realtime=True):
+    """Build a CursorFilter from query parameters, None when filtering is off
+
+    `realtime` is whether the session's source is live; prediction is ignored otherwise.
+    """
+    kind = params.get("filter", "none")
+    if kind not in FILTERS:
+        raise ValueError(f"Unknown filter '{kind}', expected one of {', '.join(FILTERS)}")
+    if kind == "none":
+        return None
+
+    if kind == "one_euro":
+        smoother = OneEuroFilter(
+            min_cutoff=float(params.get("min_cutoff", ONE_EURO_MIN_CUTOFF)),
+            beta=float(params.get("beta", ONE_EURO_BETA)),
+            d_cutoff=float(params.get("d_cutoff", ONE_EURO_D_CUTOFF)),
+        )
+    else:
+        smoother = KalmanFilter2D(
+            process_noise=float(params.get("process_noise", KALMAN_PROCESS_NOISE)),
+            measurement_noise=float(params.get("measurement_noise", KALMAN_MEASUREMENT_NOISE)),
+        )
+    predict = realtime and params.get("predict", "0").lower() in ("1", "true", "yes")
+    return CursorFilter(smoother, predict=predict)
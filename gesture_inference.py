@@ -0,0 +1,225 @@
+"""
+Hand landmark inference backends
+  thread   MediaPipe runs in-process on the calling worker thread (default)
+  process  frames are dispatched to a pool of worker processes, each holding its
+           own mp_hands.Hands graph; images travel through shared-memory slots
+           instead of being pickled, and results come back in frame order
+
+Both backends expose the same pipelined interface: submit() up to `capacity`
+frames, then result() returns their (landmarks, handedness) oldest first.
+"""
+import math
+import multiprocessing
+import queue
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+
+BACKENDS = ("thread", "process")
+
+HANDS_OPTIONS = {
+    "max_num_hands": 1,
+    "min_detection_confidence": 0.7,
+    "min_tracking_confidence": 0.7,
+}
+
+NO_LANDMARKS = np.empty((0, 21, 3), dtype=np.float32)
+NO_HANDEDNESS = ()
+MIRRORED_HANDEDNESS = {"Left": "Right", "Right": "Left"}
+WORKER_POLL_INTERVAL = 0.5  # Seconds between worker liveness checks while waiting for a result
+
+def create_hands(**options):
+    """Build one MediaPipe Hands graph (not thread-safe, so one per session or process)"""
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(**{**HANDS_OPTIONS, **options})
+
+def landmarks_from_result(result):
+    """MediaPipe result -> (H, 21, 3) float32 array of normalized landmarks"""
+    if not result.multi_hand_landmarks:
+        return NO_LANDMARKS
+    return np.array(
+        [[(p.x, p.y, p.z) for p in hand.landmark] for hand in result.multi_hand_landmarks],
+        dtype=np.float32
+    )
+
+def handedness_from_result(result):
+    """MediaPipe result -> tuple of "Left"/"Right" labels, one per hand, as MediaPipe reports them"""
+    if not result.multi_handedness:
+        return NO_HANDEDNESS
+    return tuple(hand.classification[0].label for hand in result.multi_handedness)
+
+def mirror_handedness(handedness):
+    """Swap Left/Right: MediaPipe labels assume a mirrored (selfie) input image"""
+    return tuple(MIRRORED_HANDEDNESS.get(label, label) for label in handedness)
+
+def hands_from_result(result):
+    return landmarks_from_result(result), handedness_from_result(result)
+
+class ThreadInferenceBackend:
+    """Runs MediaPipe synchronously on the calling thread"""
+    capacity = 1
+
+    def __init__(self, hands_factory=create_hands, **options):
+        self.hands = hands_factory(**options)
+        self.pending = deque()
+
+    def frame_buffer(self, shape):
+        """No buffer to lend: the caller converts into its own"""
+        return None
+
+    def process(self, image):
+        return hands_from_result(self.hands.process(image))
+
+    def submit(self, image):
+        self.pending.append(self.process(image))
+
+    def result(self):
+        return self.pending.popleft()
+
+    def close(self):
+        self.pending.clear()
+        self.hands.close()
+
+def _process_worker(shm_name, slots, slot_bytes, tasks, results, hands_factory, options):
+    """Worker process: run its own Hands graph over frames found in shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffers = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=shm.buf)
+    hands = hands_factory(**options)
+    image = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, shape = task
+            image = buffers[slot, :math.prod(shape)].reshape(shape)
+            landmarks, handedness = hands_from_result(hands.process(image))
+            results.put((seq, slot, landmarks, handedness))
+    finally:
+        hands.close()
+        del image, buffers
+        shm.close()
+
+class ProcessInferenceBackend:
+    """Dispatches frames to worker processes through shared memory, reorders results by sequence"""
+
+    def __init__(self, workers=2, max_frame_shape=(480, 640, 3), hands_factory=create_hands, **options):
+        self.capacity = workers
+        self.slots = workers * 2
+        self.slot_bytes = math.prod(max_frame_shape)
+
+        # One slot per in-flight frame; a frame is written once and read in place by a worker
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slots)
+        self.buffers = np.ndarray((self.slots, self.slot_bytes), dtype=np.uint8, buffer=self.shm.buf)
+        self.free_slots = deque(range(self.slots))
+        self.staged = None  # (slot, view) lent by frame_buffer() for the next submit()
+
+        ctx = multiprocessing.get_context("spawn")
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.workers = [
+            ctx.Process(
+                target=_process_worker,
+                args=(self.shm.name, self.slots, self.slot_bytes, self.tasks, self.results, hands_factory, options),
+                name=f"gesture-inference-{i}",
+                daemon=True
+            )
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+        self.next_seq = 0  # Sequence number of the next submitted frame
+        self.next_result = 0  # Sequence number result() hands out next
+        self.finished = {}  # Reorder buffer: seq -> (landmarks, handedness)
+
+    def process(self, image):
+        self.submit(image)
+        return self.result()
+
+    def frame_buffer(self, shape):
+        """A free slot viewed as a uint8 image of `shape`, for the caller to write the next frame into
+
+        If that view is what submit() gets, it is queued without a copy; anything else
+        (an ROI crop, a downscaled frame) is copied into another slot as usual.
+        """
+        if math.prod(shape) > self.slot_bytes:
+            raise ValueError(f"Frame {shape} does not fit a {self.slot_bytes}-byte slot")
+        if self.staged is None:
+            if not self.free_slots:
+                raise RuntimeError("More frames in flight than shared-memory slots")
+            slot = self.free_slots.popleft()
+            self.staged = (slot, None)
+        slot, view = self.staged
+        if view is None or view.shape != tuple(shape):
+            view = self.buffers[slot, :math.prod(shape)].reshape(shape)
+            self.staged = (slot, view)
+        return view
+
+    def submit(self, image):
+        """Queue a frame: in place if it is the frame_buffer() view, otherwise copied into a free slot"""
+        staged, self.staged = self.staged, None
+        if staged is not None and image.shape == staged[1].shape and image.ctypes.data == staged[1].ctypes.data:
+            slot = staged[0]
+        else:
+            if image.size > self.slot_bytes:
+                raise ValueError(f"Frame {image.shape} does not fit a {self.slot_bytes}-byte slot")
+            if not self.free_slots:
+                raise RuntimeError("More frames in flight than shared-memory slots")
+            slot = self.free_slots.popleft()
+            np.copyto(self.buffers[slot, :image.size], image.reshape(-1))
+            if staged is not None:
+                # Lent but not used as is (e.g. the input was cropped from it)
+                self.free_slots.append(staged[0])
+        self.tasks.put((self.next_seq, slot, image.shape))
+        self.next_seq += 1
+
+    def result(self):
+        """(landmarks, handedness) of the oldest submitted frame, waiting for it if needed
+
+        Raises RuntimeError once a worker process has died, instead of waiting
+        forever for a frame that may have died with it.
+        """
+        while self.next_result not in self.finished:
+            try:
+                seq, slot, landmarks, handedness = self.results.get(timeout=WORKER_POLL_INTERVAL)
+            except queue.Empty:
+                # Any worker may hold the missing frame, and its result would never come
+                dead = [worker for worker in self.workers if not worker.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Inference worker {dead[0].name} exited (code {dead[0].exitcode}) "
+                                       f"with {self.in_flight} frame(s) in flight")
+                continue
+            self.free_slots.append(slot)
+            self.finished[seq] = (landmarks, handedness)
+
+        hands = self.finished.pop(self.next_result)
+        self.next_result += 1
+        return hands
+
+    @property
+    def in_flight(self):
+        return self.next_seq - self.next_result
+
+    def close(self):
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+
+        del self.buffers
+        self.shm.close()
+        self.shm.unlink()
+
+def create_backend(kind="thread", workers=2, max_frame_shape=(480, 640, 3), max_hands=1, hands_factory=create_hands):
+    """Build an inference backend; hands_factory replaces MediaPipe (e.g. with a fake in tests)
+    and must be picklable (a module-level function or class) for the process backend
+    """
+    options = {"max_num_hands": max_hands}
+    if kind == "process":
+        return ProcessInferenceBackend(workers, max_frame_shape, hands_factory, **options)
+    if kind == "thread":
+        return ThreadInferenceBackend(hands_factory, **options)
+    raise ValueError(f"Unknown inference backend '{kind}', expected one of {', '.join(BACKENDS)}")
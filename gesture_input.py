@@ -0,0 +1,222 @@
+"""
+OS input injection for hand_control.py
+An InputDriver owns one injector backend and applies input on its own thread,
+so a slow injector never stalls capture or inference. Cursor moves are
+coalesced: only the newest target is applied, at most once per display refresh.
+Button actions are queued and applied in order, after the move that preceded them.
+
+  pyautogui  cross-platform; the per-call PAUSE is disabled
+  xdotool    X11, one long-lived `xdotool -` process fed over stdin
+  uinput     Linux virtual absolute pointer through python-evdev (needs /dev/uinput access)
+  record     no OS input, records every call (tests and headless benchmarks)
+"""
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+
+INJECTORS = ("pyautogui", "xdotool", "uinput", "record")
+INJECT_RATE = 60  # Cursor moves applied per second at most (display refresh)
+TIMING_SAMPLES = 10000  # Most recent injection timings kept for benchmarks
+
+class RecordingInjector:
+    """Records calls instead of moving the real pointer"""
+
+    def __init__(self, screen_size=(1920, 1080)):
+        self.screen_size = screen_size
+        self.calls = []  # (perf_counter, operation, args)
+
+    def move(self, x, y):
+        self.calls.append((time.perf_counter(), "move", (x, y)))
+
+    def press(self):
+        self.calls.append((time.perf_counter(), "press", ()))
+
+    def release(self):
+        self.calls.append((time.perf_counter(), "release", ()))
+
+    def click(self):
+        self.calls.append((time.perf_counter(), "click", ()))
+
+    def close(self):
+        pass
+
+class PyAutoGuiInjector:
+    """pyautogui, without its default 0.1 s sleep after every call"""
+
+    def __init__(self):
+        import pyautogui
+        pyautogui.PAUSE = 0
+        self.gui = pyautogui
+        self.screen_size = tuple(pyautogui.size())
+
+    def move(self, x, y):
+        self.gui.moveTo(x, y)
+
+    def press(self):
+        self.gui.mouseDown()
+
+    def release(self):
+        self.gui.mouseUp()
+
+    def click(self):
+        self.gui.click()
+
+    def close(self):
+        pass
+
+class XdotoolInjector:
+    """X11 input through a single xdotool process reading commands from stdin"""
+
+    def __init__(self):
+        if shutil.which("xdotool") is None:
+            raise RuntimeError("xdotool is not installed")
+        width, height = subprocess.check_output(["xdotool", "getdisplaygeometry"], text=True).split()
+        self.screen_size = (int(width), int(height))
+        self.process = subprocess.Popen(["xdotool", "-"], stdin=subprocess.PIPE, text=True, bufsize=1)
+
+    def send(self, command):
+        self.process.stdin.write(command + "\n")
+
+    def move(self, x, y):
+        self.send(f"mousemove {int(x)} {int(y)}")
+
+    def press(self):
+        self.send("mousedown 1")
+
+    def release(self):
+        self.send("mouseup 1")
+
+    def click(self):
+        self.send("click 1")
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait(timeout=2.0)
+
+class UinputInjector:
+    """Virtual absolute pointer device (Linux uinput via python-evdev)"""
+
+    def __init__(self, screen_size=(1920, 1080)):
+        from evdev import AbsInfo, UInput, ecodes
+        self.ecodes = ecodes
+        self.screen_size = screen_size
+        width, height = screen_size
+        capabilities = {
+            ecodes.EV_KEY: [ecodes.BTN_LEFT],
+            ecodes.EV_ABS: [
+                (ecodes.ABS_X, AbsInfo(0, 0, width - 1, 0, 0, 0)),
+                (ecodes.ABS_Y, AbsInfo(0, 0, height - 1, 0, 0, 0)),
+            ],
+        }
+        self.device = UInput(capabilities, name="hand-control-pointer")
+
+    def move(self, x, y):
+        self.device.write(self.ecodes.EV_ABS, self.ecodes.ABS_X, int(x))
+        self.device.write(self.ecodes.EV_ABS, self.ecodes.ABS_Y, int(y))
+        self.device.syn()
+
+    def button(self, down):
+        self.device.write(self.ecodes.EV_KEY, self.ecodes.BTN_LEFT, int(down))
+        self.device.syn()
+
+    def press(self):
+        self.button(True)
+
+    def release(self):
+        self.button(False)
+
+    def click(self):
+        self.button(True)
+        self.button(False)
+
+    def close(self):
+        self.device.close()
+
+def create_injector(kind="pyautogui"):
+    if kind == "pyautogui":
+        return PyAutoGuiInjector()
+    if kind == "xdotool":
+        return XdotoolInjector()
+    if kind == "uinput":
+        return UinputInjector()
+    if kind == "record":
+        return RecordingInjector()
+    raise ValueError(f"Unknown injector '{kind}', expected one of {', '.join(INJECTORS)}")
+
+class InputDriver:
+    """Applies cursor targets and button actions from the detection thread on an injector thread"""
+
+    def __init__(self, injector, rate=INJECT_RATE):
+        self.injector = injector
+        self.period = 1.0 / rate
+        self.target = None  # (x, y, requested at), newest cursor target not yet applied
+        self.actions = deque()  # (operation, requested at)
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.last_move = float("-inf")
+
+        # Counters and samples for benchmarks
+        self.moves_requested = 0
+        self.moves_applied = 0
+        self.inject_times = {op: deque(maxlen=TIMING_SAMPLES) for op in ("move", "press", "release", "click")}
+        self.latencies = deque(maxlen=TIMING_SAMPLES)  # Seconds from request to injection
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="input-injector", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Apply what is still queued, then stop the injector thread"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        self.injector.close()
+
+    def move_to(self, x, y):
+        """Set the cursor target; replaces a target that has not been applied yet"""
+        with self.condition:
+            self.target = (x, y, time.perf_counter())
+            self.moves_requested += 1
+            self.condition.notify()
+
+    def act(self, operation):
+        """Queue a button action: "press", "release" or "click" (never dropped)"""
+        with self.condition:
+            self.actions.append((operation, time.perf_counter()))
+            self.condition.notify()
+
+    def _loop(self):
+        while True:
+            with self.condition:
+                while self.running and not self.actions and (
+                        self.target is None or time.perf_counter() - self.last_move < self.period):
+                    # Sleep until there is work, or until the next move is allowed
+                    timeout = None if self.target is None else self.period - (time.perf_counter() - self.last_move)
+                    self.condition.wait(timeout)
+                target, self.target = self.target, None
+                actions, self.actions = self.actions, deque()
+                running = self.running
+
+            # The cursor goes first so a click lands where the hand pointed when it fired
+            if target is not None:
+                self.last_move = time.perf_counter()
+                self.inject("move", target[2], target[0], target[1])
+                self.moves_applied += 1
+            for operation, requested in actions:
+                self.inject(operation, requested)
+            if not running:
+                return
+
+    def inject(self, operation, requested, *args):
+        start = time.perf_counter()
+        getattr(self.injector, operation)(*args)
+        done = time.perf_counter()
+        self.inject_times[operation].append(done - start)
+        self.latencies.append(done - requested)
@@ -0,0 +1,183 @@
+"""
+WebSocket load generator for the gesture server
+Opens hundreds of concurrent gesture stream clients, measures how long every
+frame takes from capture (its "timestamp") to arrival at the client, and reads
+the server's CPU time from /metrics before and after, so scaling regressions
+show up as higher latency or more CPU per client. Clients are spread over a few
+processes so the generator itself does not become the bottleneck.
+
+    python gesture_loadgen.py --clients 300 --seconds 10
+    python gesture_loadgen.py --url ws://kiosk:8000/ws/gestures/tree2 --json
+
+Latency is measured against the server's capture timestamps, so it needs a
+live camera session and clients on the same host (or with synchronized clocks).
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from urllib.parse import urlsplit
+import numpy as np
+import websockets
+from gesture_protocol import decode_binary
+from health_latency_probe import http_get
+
+CONNECT_CONCURRENCY = 50  # WebSocket handshakes in flight at once, per process
+RECV_TIMEOUT = 0.5  # Seconds a client waits for a frame before checking whether to stop
+EVENT_TYPES = ("pinch", "swipe")
+
+async def read_server_cpu(url):
+    """process_cpu_seconds_total from the server's /metrics, or None if it is not exposed"""
+    parts = urlsplit(url)
+    try:
+        body = await http_get(parts.hostname, parts.port or 80, "/metrics")
+    except OSError:
+        return None
+    for line in body.splitlines():
+        if line.startswith("process_cpu_seconds_total"):
+            return float(line.split()[-1])
+    return None
+
+async def run_client(url, window, connect_slots, stats):
+    """One client: connect, then record the latency of every frame received inside `window`"""
+    try:
+        async with connect_slots:
+            websocket = await websockets.connect(url, max_size=None)
+    except (OSError, websockets.WebSocketException) as exc:
+        stats["error"] = f"connect: {exc}"
+        return
+    stats["connected"] = True
+    try:
+        start, end = window
+        while time.time() < end:
+            try:
+                message = await asyncio.wait_for(websocket.recv(), timeout=RECV_TIMEOUT)
+            except asyncio.TimeoutError:
+                continue
+            received = time.time()
+            data = decode_binary(message) if isinstance(message, bytes) else json.loads(message)
+            if received < start or data is None or "timestamp" not in data:
+                continue
+            stats["latencies"].append(received - data["timestamp"])
+            if data["type"] in EVENT_TYPES:
+                stats["event_latencies"].append(received - data["timestamp"])
+    except websockets.ConnectionClosed as exc:
+        # 1013 is the server dropping a client that fell too far behind
+        stats["error"] = f"closed: {exc.rcvd.code if exc.rcvd else 'no close frame'}"
+    finally:
+        await websocket.close()
+
+async def run_clients(url, clients, warmup, seconds):
+    """Run `clients` clients in this process, returns one stats dict per client"""
+    now = time.time()
+    window = (now + warmup, now + warmup + seconds)
+    connect_slots = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    stats = [{"connected": False, "latencies": [], "event_latencies": [], "error": None} for _ in range(clients)]
+    await asyncio.gather(*(run_client(url, window, connect_slots, s) for s in stats))
+    return stats
+
+def _client_process(url, clients, warmup, seconds, results):
+    results.put(asyncio.run(run_clients(url, clients, warmup, seconds)))
+
+def percentiles(samples):
+    if not samples:
+        return None
+    values = np.asarray(samples) * 1000
+    return {
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+        "p99": round(float(np.percentile(values, 99)), 2),
+        "max": round(float(values.max()), 2),
+    }
+
+def run_load(url, clients=200, seconds=5.0, warmup=2.0, processes=None):
+    """Open `clients` concurrent clients for `warmup` + `seconds` and report latency and server CPU
+
+    Frames are only measured during the last `seconds`, once every client had
+    time to connect; server CPU is read over the same window.
+    """
+    processes = max(1, min(processes or min(4, os.cpu_count() or 1), clients))
+    shares = [clients // processes + (i < clients % processes) for i in range(processes)]
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_client_process, args=(url, share, warmup, seconds, results),
+                           name=f"loadgen-{i}", daemon=True) for i, share in enumerate(shares)]
+    for worker in workers:
+        worker.start()
+
+    time.sleep(warmup)
+    cpu_start = asyncio.run(read_server_cpu(url))
+    measured_from = time.perf_counter()
+    time.sleep(seconds)
+    cpu_end = asyncio.run(read_server_cpu(url))
+    elapsed = time.perf_counter() - measured_from
+
+    stats = []
+    for _ in workers:
+        stats.extend(results.get(timeout=warmup + seconds + 60))
+    for worker in workers:
+        worker.join(timeout=5.0)
+
+    errors = [s["error"] for s in stats if s["error"]]
+    frames = [len(s["latencies"]) for s in stats]
+    client_p95 = [float(np.percentile(s["latencies"], 95)) * 1000 for s in stats if s["latencies"]]
+    server_cpu = cpu_end - cpu_start if cpu_start is not None and cpu_end is not None else None
+    return {
+        "url": url,
+        "clients": clients,
+        "processes": processes,
+        "connected": sum(s["connected"] for s in stats),
+        "seconds": round(elapsed, 2),
+        "failed": len(errors),
+        "errors": sorted(set(errors)),
+        "frames_per_client": {"min": min(frames), "mean": round(float(np.mean(frames)), 1)} if frames else None,
+        "latency_ms": percentiles([lat for s in stats for lat in s["latencies"]]),
+        "event_latency_ms": percentiles([lat for s in stats for lat in s["event_latencies"]]),
+        "events_per_client": round(float(np.mean([len(s["event_latencies"]) for s in stats])), 2) if stats else 0,
+        "worst_client_p95_ms": round(max(client_p95), 2) if client_p95 else None,
+        "server_cpu_seconds": round(server_cpu, 3) if server_cpu is not None else None,
+        "server_cpu_percent": round(100 * server_cpu / elapsed, 1) if server_cpu is not None else None,
+    }
+
+def print_report(report):
+    print(f"📡 {report['clients']} clients on {report['url']} ({report['processes']} processes), "
+          f"{report['seconds']}s measured")
+    if report["failed"]:
+        print(f"❌ {report['failed']} client(s) failed: {', '.join(report['errors'])}")
+    if report["frames_per_client"]:
+        print(f"   frames per client: min {report['frames_per_client']['min']}, "
+              f"mean {report['frames_per_client']['mean']}, events per client {report['events_per_client']}")
+    for label, key in (("frame latency", "latency_ms"), ("event latency", "event_latency_ms")):
+        values = report[key]
+        if values:
+            print(f"   {label:<14} p50={values['p50']:7.2f}ms  p95={values['p95']:7.2f}ms  "
+                  f"p99={values['p99']:7.2f}ms  max={values['max']:7.2f}ms")
+    if report["worst_client_p95_ms"] is not None:
+        print(f"   worst client p95: {report['worst_client_p95_ms']:.2f}ms")
+    if report["server_cpu_seconds"] is not None:
+        print(f"   server CPU: {report['server_cpu_seconds']:.2f}s ({report['server_cpu_percent']:.1f}% of one core)")
+    else:
+        print("   server CPU: unavailable (no process_cpu_seconds_total on /metrics)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the gesture server with many WebSocket clients")
+    parser.add_argument("--url", default="ws://localhost:8000/ws/gestures", help="Gesture stream to connect to")
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent clients")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measured duration")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds allowed for every client to connect")
+    parser.add_argument("--processes", type=int, default=None, help="Client processes (default: up to 4)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run_load(args.url, args.clients, args.seconds, args.warmup, args.processes)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
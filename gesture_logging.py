@@ -0,0 +1,118 @@
+"""
+Structured, rate-limited logging for the gesture server
+Log lines are logfmt (time=... level=... event=... key=value ...), so they can
+be grepped and parsed, and each event name has its own token bucket: bursts
+such as a gesture on every frame are cut down to LOG_BURST lines followed by
+LOG_RATE per second, and the next line that gets through carries a
+`suppressed=N` count. Records are formatted on the calling thread but written
+by a background listener, so the gesture loop never blocks on terminal I/O.
+
+    log = get_logger("gesture_server")
+    log_event(log, "gesture", session="default", type="pinch")
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+LOG_LEVEL = logging.INFO
+LOG_RATE = 2.0  # Lines per second per event name once the burst is used up
+LOG_BURST = 10  # Lines per event name let through back to back
+
+def logfmt_value(value):
+    if isinstance(value, float):
+        value = f"{value:.4g}"
+    value = str(value)
+    if not value or any(c in value for c in ' ="'):
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return value
+
+class LogfmtFormatter(logging.Formatter):
+    """time=... level=... logger=... event=<message> plus the record's fields"""
+
+    def format(self, record):
+        fields = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        fields.update((k, v) for k, v in getattr(record, "fields", {}).items() if v is not None)
+        if getattr(record, "suppressed", 0):
+            fields["suppressed"] = record.suppressed
+        line = " ".join(f"{key}={logfmt_value(value)}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per (logger, event); warnings and errors are never dropped"""
+
+    def __init__(self, rate=LOG_RATE, burst=LOG_BURST):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}  # (logger, event) -> [tokens, last refill, suppressed]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            record.suppressed, bucket[2] = bucket[2], 0
+        return True
+
+_listener = None
+
+def configure_logging(level=LOG_LEVEL, rate=LOG_RATE, burst=LOG_BURST, stream=None):
+    """Route the "gesture" loggers through the rate limiter to a background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    records = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(records)
+    handler.setFormatter(LogfmtFormatter())  # Applied in QueueHandler.prepare, before queueing
+    handler.addFilter(RateLimitFilter(rate, burst))
+    _listener = logging.handlers.QueueListener(records, logging.StreamHandler(stream or sys.stderr))
+    _listener.start()
+
+    root = logging.getLogger("gesture")
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    root.propagate = False
+    return root
+
+def flush_logging():
+    """Write out queued records and stop the writer thread (runs at exit)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def get_logger(name):
+    """Logger under the shared "gesture" hierarchy"""
+    return logging.getLogger(f"gesture.{name}")
+
+def log_event(logger, event, level=logging.INFO, **fields):
+    """Log one event with key=value fields; the message itself is the event name"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+configure_logging()
+atexit.register(flush_logging)
@@ -0,0 +1,277 @@
+"""
+Runtime metrics and profiling for the gesture pipeline
+Metrics are kept in-process and rendered in the Prometheus text format on
+/metrics; there is no client library dependency. The sampling profiler reads
+sys._current_frames() on a background thread and returns folded stacks
+(one "frame;frame;frame count" line per stack, ready for flamegraph.pl or
+speedscope) for the threads that run the gesture loop.
+"""
+import bisect
+import collections
+import math
+import sys
+import threading
+import time
+
+# Seconds; spans the sub-millisecond classify/serialize stages up to slow inference
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SEND_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# Seconds; from an already-open session (one frame period) up to a cold camera and model start
+STARTUP_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROFILE_INTERVAL = 0.005  # Seconds between stack samples
+PROFILE_MAX_SECONDS = 60.0  # Longest profile one request may ask for
+PROFILE_THREAD_PREFIXES = ("gesture-worker", "frame-grabber")
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in labels) + "}"
+
+class Metric:
+    """One metric family; samples are keyed by their sorted label pairs"""
+    kind = None
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(labels):
+        return tuple(sorted(labels.items()))
+
+    def remove(self, **labels):
+        """Forget one label set (e.g. a disconnected client)"""
+        with self.lock:
+            self.samples.pop(self.key(labels), None)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = list(self.samples.items())
+        for labels, value in items:
+            lines.extend(self.render_sample(labels, value))
+        return lines
+
+    def render_sample(self, labels, value):
+        return [f"{self.name}{format_labels(labels)} {format_value(value)}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.samples[self.key(labels)] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=STAGE_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                # Per-bucket (non-cumulative) counts, sum, count
+                sample = self.samples[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            sample[0][bisect.bisect_left(self.buckets, value)] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    def render_sample(self, labels, sample):
+        counts, total, count = sample
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            bucket_labels = labels + (("le", format_value(float(bound))),)
+            lines.append(f"{self.name}_bucket{format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(total)}")
+        lines.append(f"{self.name}_count{format_labels(labels)} {count}")
+        return lines
+
+class Registry:
+    """Metric families plus collectors that refresh gauges right before a scrape"""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation):
+        return self.register(Counter(name, documentation))
+
+    def gauge(self, name, documentation):
+        return self.register(Gauge(name, documentation))
+
+    def histogram(self, name, documentation, buckets=STAGE_BUCKETS):
+        return self.register(Histogram(name, documentation, buckets))
+
+    def add_collector(self, collect):
+        self.collectors.append(collect)
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram("gesture_stage_seconds", "Time spent per frame in each pipeline stage")
+FRAMES = registry.counter("gesture_frames_total", "Frames processed")
+HAND_FRAMES = registry.counter("gesture_hand_frames_total", "Frames with a hand detected")
+EVENTS = registry.counter("gesture_events_total", "Discrete gestures detected")
+SKIPPED_INFERENCE = registry.counter("gesture_skipped_inference_total",
+                                     "Frames that reused the previous landmarks instead of running inference")
+FPS = registry.gauge("gesture_fps", "Frames processed per second (moving average)")
+HANDS = registry.gauge("gesture_tracked_hands", "Hands visible in the last processed frame")
+HAND_RATIO = registry.gauge("gesture_hand_ratio", "Share of recent frames with a hand detected")
+CAPTURED_FRAMES = registry.gauge("gesture_captured_frames", "Frames read from the live device")
+DROPPED_FRAMES = registry.gauge("gesture_dropped_frames", "Live frames overwritten before they were processed")
+CONNECTIONS = registry.gauge("gesture_connections", "Connected WebSocket and preview clients")
+QUEUE_DEPTH = registry.gauge("gesture_send_queue_depth", "Frames waiting in a client's send queue")
+COALESCED_FRAMES = registry.counter("gesture_coalesced_frames_total",
+                                    "Cursor frames replaced by a newer one before a client read them")
+SLOW_CLIENTS = registry.counter("gesture_slow_client_disconnects_total",
+                                "Clients disconnected for staying over their send-queue limit")
+STARTUP_SECONDS = registry.gauge("gesture_startup_seconds",
+                                  "Seconds the last session start spent opening the source, building and warming the model")
+TIME_TO_FIRST_GESTURE = registry.histogram("gesture_time_to_first_gesture_seconds",
+                                           "Seconds from the first client of an idle session to its first gesture frame",
+                                           STARTUP_BUCKETS)
+CLIENT_SEND_SECONDS = registry.histogram("gesture_client_send_seconds", "Time to hand one message to a client socket",
+                                         SEND_BUCKETS)
+# Standard Prometheus process metric; load tests diff it to get the server's CPU cost
+PROCESS_CPU = registry.counter("process_cpu_seconds_total", "Total user and system CPU time of the server process")
+
+def collect_process_cpu():
+    with PROCESS_CPU.lock:
+        PROCESS_CPU.samples[()] = round(time.process_time(), 4)
+
+registry.add_collector(collect_process_cpu)
+
+class FrameStats:
+    """Per-session moving averages behind the FPS and hand-ratio gauges"""
+
+    def __init__(self, alpha=0.05):
+        self.alpha = alpha
+        self.fps = 0.0
+        self.hand_ratio = 0.0
+        self.last = None
+
+    def update(self, hand_seen, now=None):
+        now = time.perf_counter() if now is None else now
+        if self.last is not None and now > self.last:
+            rate = 1.0 / (now - self.last)
+            self.fps = rate if not self.fps else self.fps + self.alpha * (rate - self.fps)
+        first = self.last is None
+        self.last = now
+        seen = 1.0 if hand_seen else 0.0
+        self.hand_ratio = seen if first else self.hand_ratio + self.alpha * (seen - self.hand_ratio)
+
+def record_frame(session, gesture_data, stage_times, stats):
+    """Account one processed frame of a session"""
+    FRAMES.inc(session=session)
+    hand_seen = gesture_data["type"] != "no_hand"
+    if hand_seen:
+        HAND_FRAMES.inc(session=session)
+    # Multi-hand frames list every hand; a single-hand frame is its own only hand
+    hands = gesture_data.get("hands") or ([gesture_data] if hand_seen else [])
+    HANDS.set(len(hands), session=session)
+    for hand in hands:
+        if hand["type"] in ("pinch", "swipe"):
+            gesture = hand["type"] if hand["type"] == "pinch" else f"swipe_{hand['direction']}"
+            EVENTS.inc(session=session, gesture=gesture)
+    for stage, elapsed in stage_times.items():
+        STAGE_SECONDS.observe(elapsed, session=session, stage=stage)
+    stats.update(hand_seen)
+    FPS.set(round(stats.fps, 2), session=session)
+    HAND_RATIO.set(round(stats.hand_ratio, 4), session=session)
+
+class SamplingProfiler:
+    """Samples the stacks of the pipeline threads and aggregates them as folded stacks"""
+
+    def __init__(self, interval=PROFILE_INTERVAL, thread_prefixes=PROFILE_THREAD_PREFIXES):
+        self.interval = interval
+        self.thread_prefixes = thread_prefixes
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return False
+            self.stacks.clear()
+            self.samples = 0
+            self.running = True
+        self.thread = threading.Thread(target=self._loop, name="gesture-profiler", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Stop sampling and return the folded-stack dump"""
+        with self.lock:
+            self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        return self.dump()
+
+    def _loop(self):
+        me = threading.get_ident()
+        while self.running:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, "")
+                if ident == me or not name.startswith(self.thread_prefixes):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def dump(self):
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+profiler = SamplingProfiler()
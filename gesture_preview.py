@@ -0,0 +1,133 @@
+"""
+Annotated camera preview, served as an MJPEG stream
+The detector hands over a downscaled, mirrored snapshot at most PREVIEW_FPS
+times a second, and only while a viewer is attached; drawing and JPEG encoding
+happen on the viewer's side, outside the gesture loop. Open /preview.mjpg (or
+/preview/{session}.mjpg) in a browser to watch.
+"""
+import threading
+import time
+import numpy as np
+
+PREVIEW_FPS = 10  # Snapshots per second while someone is watching
+PREVIEW_WIDTH = 480
+PREVIEW_HEIGHT = 360
+PREVIEW_QUALITY = 70  # JPEG quality
+OVERLAY_HEIGHT = 80  # Status banner height, in camera pixels
+BOUNDARY = "frame"
+
+# MediaPipe hand topology (same pairs as mp.solutions.hands.HAND_CONNECTIONS)
+HAND_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+]
+
+# Status line per gesture type: (text, BGR color)
+STATUS = {
+    "no_hand": ("No Hand Detected", (0, 0, 255)),  # Red
+    "pinch": ("PINCH!", (255, 0, 255)),  # Magenta
+    "swipe": ("SWIPE!", (255, 255, 0)),  # Cyan
+}
+DEFAULT_STATUS = ("Hand Detected", (0, 255, 0))  # Green
+
+def draw_overlay(preview, hand_landmarks, gesture_type, cursor_pos, scale, pose=None):
+    """Draw landmarks, cursor and the status banner onto a mirrored preview image, in place"""
+    import cv2
+    height, width = preview.shape[:2]
+
+    # Hand landmarks (an (H, 21, 3) array of mirrored, normalized coordinates)
+    for hand in hand_landmarks:
+        points = [(int(x * width), int(y * height)) for x, y, _ in hand]
+        for start, end in HAND_CONNECTIONS:
+            cv2.line(preview, points[start], points[end], (0, 255, 255), 2)
+        for point in points:
+            cv2.circle(preview, point, 2, (0, 255, 0), -1)
+
+    if len(hand_landmarks) and cursor_pos:
+        cx_px = int(cursor_pos[0] * width)
+        cy_px = int(cursor_pos[1] * height)
+        cv2.circle(preview, (cx_px, cy_px), int(10 * scale), (255, 0, 255), -1)
+        cv2.circle(preview, (cx_px, cy_px), int(15 * scale), (255, 0, 255), 2)
+
+    # Darken only the banner: a 60% black overlay is the same as scaling by 0.4
+    banner = preview[:int(OVERLAY_HEIGHT * scale)]
+    cv2.convertScaleAbs(banner, dst=banner, alpha=0.4)
+
+    label = f"Gesture: {gesture_type.upper()}" + (f"  Pose: {pose}" if pose else "")
+    cv2.putText(preview, label, (10, int(30 * scale)),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.8 * scale, (0, 255, 0), 2)
+    status_text, status_color = STATUS.get(gesture_type, DEFAULT_STATUS)
+    cv2.putText(preview, status_text, (10, int(60 * scale)),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7 * scale, status_color, 2)
+    return preview
+
+class PreviewStream:
+    """Low-rate preview of one session: the detector offers frames, viewers pull JPEGs"""
+
+    def __init__(self, fps=PREVIEW_FPS, size=(PREVIEW_WIDTH, PREVIEW_HEIGHT), quality=PREVIEW_QUALITY):
+        self.period = 1.0 / fps
+        self.size = size
+        self.quality = quality
+        self.viewers = 0
+        self.snapshot = None  # (mirrored preview image, hands, gesture type, cursor, scale, pose)
+        self.sequence = 0  # Bumped for every new snapshot
+        self.encoded = None  # (sequence, JPEG bytes), shared by every viewer
+        self.next_capture = 0.0
+        self.lock = threading.Lock()
+
+    def attach(self):
+        with self.lock:
+            self.viewers += 1
+
+    def detach(self):
+        with self.lock:
+            self.viewers -= 1
+            if not self.viewers:
+                self.snapshot = None
+                self.encoded = None
+
+    def wants_frame(self):
+        """True when a viewer is attached and the next snapshot is due (one int check otherwise)"""
+        return self.viewers > 0 and time.monotonic() >= self.next_capture
+
+    def capture(self, img, hand_landmarks, gesture_type, cursor_pos, pose=None):
+        """Keep a downscaled, mirrored copy of the frame (runs on the detector's worker)"""
+        import cv2
+        self.next_capture = time.monotonic() + self.period
+        preview = cv2.resize(img, self.size, interpolation=cv2.INTER_AREA)
+        cv2.flip(preview, 1, dst=preview)
+        scale = self.size[1] / img.shape[0]
+        hands = np.array(hand_landmarks, copy=True)
+        with self.lock:
+            self.snapshot = (preview, hands, gesture_type, cursor_pos, scale, pose)
+            self.sequence += 1
+
+    def next_jpeg(self, after):
+        """(sequence, JPEG) of the newest snapshot if it is newer than `after`, otherwise None"""
+        with self.lock:
+            if self.snapshot is None or self.sequence == after:
+                return None
+            if self.encoded is not None and self.encoded[0] == self.sequence:
+                return self.encoded
+            sequence, snapshot = self.sequence, self.snapshot
+
+        encoded = (sequence, self.render(snapshot))
+        with self.lock:
+            self.encoded = encoded
+        return encoded
+
+    def render(self, snapshot):
+        """Annotate a copy of a snapshot and encode it as JPEG bytes"""
+        import cv2
+        preview, hands, gesture_type, cursor_pos, scale, pose = snapshot
+        preview = draw_overlay(preview.copy(), hands, gesture_type, cursor_pos, scale, pose)
+        _, jpeg = cv2.imencode(".jpg", preview, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return jpeg.tobytes()
+
+def mjpeg_part(jpeg):
+    """One part of a multipart/x-mixed-replace response"""
+    return (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n"
+            .encode() + jpeg + b"\r\n")
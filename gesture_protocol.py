@@ -0,0 +1,156 @@
+"""
+Gesture stream wire protocols
+Clients pick one with the `protocol` query parameter on /ws/gestures:
+
+  json    (default) one JSON text message per detected frame, as before
+  binary  packed little-endian frames, sent only when something changed:
+
+    CURSOR  <B d f f>        1, timestamp, x, y          cursor moved
+    NO_HAND <B d>            2, timestamp                hand lost (sent once)
+    EVENT   <B d B f f B B>  3, timestamp, code, x, y,   discrete gesture
+                             hand ID, handedness
+
+  Event codes: 1 pinch, 2 swipe left, 3 swipe right, 4 swipe up, 5 swipe down.
+  Handedness: 0 unknown, 1 left, 2 right. The hand ID wraps at 256; the two
+  trailing bytes can be ignored by decoders that predate them.
+"""
+import json
+import struct
+
+PROTOCOLS = ("json", "binary")
+
+MSG_CURSOR = 1
+MSG_NO_HAND = 2
+MSG_EVENT = 3
+
+CURSOR_STRUCT = struct.Struct("<Bdff")
+NO_HAND_STRUCT = struct.Struct("<Bd")
+EVENT_STRUCT = struct.Struct("<BdBffBB")
+LEGACY_EVENT_STRUCT = struct.Struct("<BdBff")  # Events without the hand ID/handedness bytes
+
+EVENT_CODES = {
+    ("pinch", None): 1,
+    ("swipe", "left"): 2,
+    ("swipe", "right"): 3,
+    ("swipe", "up"): 4,
+    ("swipe", "down"): 5,
+}
+EVENT_ACTIONS = {
+    1: ("pinch", None, "add_item"),
+    2: ("swipe", "left", "rotate_left"),
+    3: ("swipe", "right", "rotate_right"),
+    4: ("swipe", "up", "open_modal"),
+    5: ("swipe", "down", "close_modal"),
+}
+
+HANDEDNESS_CODES = {None: 0, "Left": 1, "Right": 2}
+HANDEDNESS_NAMES = {code: name for name, code in HANDEDNESS_CODES.items()}
+
+CURSOR_EPSILON = 0.001  # Normalized cursor movement below which a frame is suppressed
+
+class EncodedFrame:
+    """A published gesture frame whose encodings are computed once and shared by all clients"""
+    __slots__ = ("data", "_json", "_binary")
+
+    def __init__(self, data):
+        self.data = data
+        self._json = None
+        self._binary = None
+
+    @property
+    def json_text(self):
+        if self._json is None:
+            self._json = json.dumps(self.data)
+        return self._json
+
+    @property
+    def binary(self):
+        """Packed form of the frame (event or cursor), None for no_hand"""
+        if self._binary is None:
+            self._binary = pack(self.data)
+        return self._binary
+
+def pack(gesture_data):
+    """Pack one gesture frame; no_hand frames return None (see pack_no_hand)"""
+    cursor = gesture_data.get("cursor")
+    if cursor is None:
+        return None
+
+    code = EVENT_CODES.get((gesture_data["type"], gesture_data.get("direction")))
+    if code is not None:
+        return EVENT_STRUCT.pack(MSG_EVENT, gesture_data["timestamp"], code, cursor["x"], cursor["y"],
+                                 gesture_data.get("hand_id", 0) % 256,
+                                 HANDEDNESS_CODES.get(gesture_data.get("handedness"), 0))
+    return CURSOR_STRUCT.pack(MSG_CURSOR, gesture_data["timestamp"], cursor["x"], cursor["y"])
+
+def pack_no_hand(timestamp):
+    return NO_HAND_STRUCT.pack(MSG_NO_HAND, timestamp)
+
+def decode_binary(payload):
+    """Unpack a binary message back into the JSON-protocol dict"""
+    kind = payload[0]
+    if kind == MSG_NO_HAND:
+        _, timestamp = NO_HAND_STRUCT.unpack(payload)
+        return {"type": "no_hand", "timestamp": timestamp}
+    if kind == MSG_CURSOR:
+        _, timestamp, x, y = CURSOR_STRUCT.unpack(payload)
+        return {"type": "none", "timestamp": timestamp, "cursor": {"x": x, "y": y}}
+    if kind == MSG_EVENT:
+        if len(payload) == LEGACY_EVENT_STRUCT.size:
+            _, timestamp, code, x, y = LEGACY_EVENT_STRUCT.unpack(payload)
+            hand = None
+        else:
+            _, timestamp, code, x, y, hand_id, handedness = EVENT_STRUCT.unpack(payload)
+            hand = {"hand_id": hand_id, "handedness": HANDEDNESS_NAMES.get(handedness)}
+        gesture_type, direction, action = EVENT_ACTIONS[code]
+        data = {"type": gesture_type, "timestamp": timestamp, "cursor": {"x": x, "y": y}, "action": action}
+        if direction is not None:
+            data["direction"] = direction
+        if hand is not None:
+            data.update(hand)
+        return data
+    raise ValueError(f"Unknown gesture message type {kind}")
+
+class JsonEncoder:
+    """Legacy protocol: every frame as JSON text"""
+
+    def encode(self, frame):
+        return frame.json_text
+
+class BinaryDeltaEncoder:
+    """Packed frames, suppressing cursor updates and no_hand frames that repeat the last state"""
+
+    def __init__(self, epsilon=CURSOR_EPSILON):
+        self.epsilon = epsilon
+        self.last_cursor = None
+        self.hand_visible = None
+
+    def encode(self, frame):
+        """Bytes to send for this frame, or None when nothing changed"""
+        data = frame.data
+        cursor = data.get("cursor")
+
+        if cursor is None:
+            if self.hand_visible is False:
+                return None
+            self.hand_visible = False
+            self.last_cursor = None
+            return pack_no_hand(data["timestamp"])
+
+        self.hand_visible = True
+        is_event = data["type"] != "none"
+        if not is_event and self.last_cursor is not None:
+            last_x, last_y = self.last_cursor
+            if abs(cursor["x"] - last_x) < self.epsilon and abs(cursor["y"] - last_y) < self.epsilon:
+                return None
+
+        self.last_cursor = (cursor["x"], cursor["y"])
+        return frame.binary
+
+def make_encoder(protocol):
+    """Per-connection encoder for a negotiated protocol name"""
+    if protocol == "binary":
+        return BinaryDeltaEncoder()
+    if protocol == "json":
+        return JsonEncoder()
+    raise ValueError(f"Unknown protocol '{protocol}', expected one of {', '.join(PROTOCOLS)}")
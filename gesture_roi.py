@@ -0,0 +1,108 @@
+"""
+Region-of-interest inference for hand tracking
+Once a hand is tracked, MediaPipe only gets a crop around it, resized to a small
+inference resolution; landmarks are mapped back to full-frame coordinates so
+clients still receive the same normalized cursor values. When tracking is lost
+the next frame is searched in full (optionally downscaled for low-end CPUs).
+When tracking several hands the crop is only used while all of them are found,
+so a hand entering elsewhere in the frame is still picked up.
+"""
+import numpy as np
+
+ROI_MARGIN = 0.35  # Padding around the hand bounding box, as a fraction of its size
+ROI_MIN_SIZE = 96  # Smallest crop side in pixels
+ROI_INFERENCE_SIZE = 192  # Longest crop side fed to MediaPipe
+INFERENCE_SCALE = 1.0  # Downscale factor for full-frame searches (e.g. 0.5 on low-end CPUs)
+
+# (x0, y0, width, height) of the inference input within the full frame, normalized
+FULL_FRAME = (0.0, 0.0, 1.0, 1.0)
+
+MAX_RESIZE_BUFFERS = 8  # Distinct resize output sizes kept for reuse
+
+class HandRoiTracker:
+    """Chooses the inference input for each frame and maps landmarks back"""
+
+    def __init__(self, roi_enabled=True, margin=ROI_MARGIN, min_size=ROI_MIN_SIZE,
+                 inference_size=ROI_INFERENCE_SIZE, downscale=INFERENCE_SCALE, max_hands=1):
+        self.roi_enabled = roi_enabled
+        self.max_hands = max_hands
+        self.margin = margin
+        self.min_size = min_size
+        self.inference_size = inference_size
+        self.downscale = downscale
+        self.box = None  # Normalized (x0, y0, width, height) around the tracked hand
+        self.roi_frames = 0  # Frames inferred on a crop
+        self.full_frames = 0  # Frames inferred on the whole image
+        self.buffers = {}  # (width, height, channels) -> reused resize output
+
+    def reset(self):
+        self.box = None
+
+    def resize(self, img, size):
+        """cv2.resize into a buffer reused across frames of the same output size"""
+        import cv2
+        key = (size[0], size[1], img.shape[2])
+        dst = self.buffers.get(key)
+        if dst is None:
+            if len(self.buffers) >= MAX_RESIZE_BUFFERS:
+                self.buffers.clear()
+            dst = self.buffers[key] = np.empty((size[1], size[0], img.shape[2]), dtype=img.dtype)
+        return cv2.resize(img, size, dst=dst, interpolation=cv2.INTER_AREA)
+
+    def prepare(self, rgb):
+        """Return (inference image, transform) for this frame"""
+        h, w = rgb.shape[:2]
+
+        if self.box is None:
+            self.full_frames += 1
+            if self.downscale >= 1.0:
+                return rgb, FULL_FRAME
+            size = (max(1, int(w * self.downscale)), max(1, int(h * self.downscale)))
+            return self.resize(rgb, size), FULL_FRAME
+
+        self.roi_frames += 1
+        x0, y0, bw, bh = self.box
+        px0, py0 = int(x0 * w), int(y0 * h)
+        px1, py1 = min(w, int((x0 + bw) * w)), min(h, int((y0 + bh) * h))
+        crop = rgb[py0:py1, px0:px1]
+
+        crop_h, crop_w = crop.shape[:2]
+        scale = self.inference_size / max(crop_w, crop_h)
+        if scale < 1.0:
+            crop = self.resize(crop, (max(1, int(crop_w * scale)), max(1, int(crop_h * scale))))
+        else:
+            crop = np.ascontiguousarray(crop)
+
+        return crop, (px0 / w, py0 / h, (px1 - px0) / w, (py1 - py0) / h)
+
+    def map_landmarks(self, landmarks, transform):
+        """Map (H, 21, 3) landmarks from inference-input to full-frame coordinates, in place"""
+        if transform is FULL_FRAME or not len(landmarks):
+            return landmarks
+
+        x0, y0, sw, sh = transform
+        landmarks[..., 0] = x0 + landmarks[..., 0] * sw
+        landmarks[..., 1] = y0 + landmarks[..., 1] * sh
+        landmarks[..., 2] *= sw
+        return landmarks
+
+    def update(self, landmarks, frame_size):
+        """Track the hands found this frame; fewer than max_hands means a full search next frame"""
+        if not self.roi_enabled or not len(landmarks) or len(landmarks) < self.max_hands:
+            self.box = None
+            return
+
+        w, h = frame_size
+        xs = landmarks[..., 0] * w
+        ys = landmarks[..., 1] * h
+        min_x, max_x = float(xs.min()), float(xs.max())
+        min_y, max_y = float(ys.min()), float(ys.max())
+
+        # Square box around all tracked hands, padded and clamped to the frame
+        side = max(max_x - min_x, max_y - min_y) * (1 + 2 * self.margin)
+        side = min(max(side, self.min_size), w, h)
+        cx, cy = (min_x + max_x) / 2, (min_y + max_y) / 2
+        bx0 = min(max(cx - side / 2, 0.0), w - side)
+        by0 = min(max(cy - side / 2, 0.0), h - side)
+
+        self.box = (bx0 / w, by0 / h, side / w, side / h)
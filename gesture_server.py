@@ -2,15 +2,38 @@
 Hand Gesture Control Server
 Provides WebSocket API for real-time hand gesture recognition
 """
+import argparse
 import asyncio
+import itertools
 import json
-import mediapipe as mp
-import cv2
+import logging
 import numpy as np
+import os
+import threading
 import time
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import uvicorn
+from gesture_camera import CAMERA_BACKENDS, CameraConfig, parse_exposure, parse_size
+from gesture_features import classify_poses, extract_features
+from gesture_filters import FILTERS, make_cursor_filter
+from gesture_inference import BACKENDS, create_backend, create_hands, mirror_handedness
+from gesture_logging import get_logger, log_event
+from gesture_metrics import (CAPTURED_FRAMES, CLIENT_SEND_SECONDS, COALESCED_FRAMES, CONNECTIONS,
+                             DROPPED_FRAMES, PROFILE_MAX_SECONDS, QUEUE_DEPTH, SKIPPED_INFERENCE, SLOW_CLIENTS,
+                             STAGE_SECONDS, STARTUP_SECONDS, TIME_TO_FIRST_GESTURE, FrameStats, profiler,
+                             record_frame, registry)
+from gesture_preview import BOUNDARY, PREVIEW_FPS, PreviewStream, mjpeg_part
+from gesture_roi import HandRoiTracker
+from gesture_skip import TemporalSkip
+from gesture_protocol import PROTOCOLS, EncodedFrame, make_encoder
+from gesture_sources import SessionRecorder, open_source
+from gesture_state import GestureStateMachine
+from gesture_tracking import HandTracker, combine_hands
 
 # ================== CONFIG ==================
 CAM_W, CAM_H = 640, 480
@@ -19,16 +42,78 @@ SWIPE_HORIZONTAL_THRESHOLD = 80  # Horizontal swipe threshold (increased to prev
 SWIPE_VERTICAL_THRESHOLD = 80  # Vertical swipe threshold (increased)
 GESTURE_COOLDOWN = 0.8  # Cooldown between gestures to prevent cancellation
 MOVEMENT_CONFIRMATION_FRAMES = 3  # Number of frames to confirm movement direction
+MAX_HANDS = 1  # Hands tracked at once; above 1, frames list every hand under "hands"
+HAND_SCALED_PINCH = False  # Pinch from the pose classifier (scales with hand size) instead of PINCH_THRESHOLD
 
-# Display settings
-SHOW_CAMERA_WINDOW = True  # Set to False to disable camera preview
-WINDOW_NAME = "Hand Gesture Control - Camera Feed"
-PREVIEW_WIDTH = 480  # Smaller preview window
-PREVIEW_HEIGHT = 360
+# Preview settings
+PREVIEW_ENABLED = True  # Serve /preview.mjpg; frames are only rendered while someone watches
+
+# Capture settings
+SOURCE = 0  # Camera index or /dev/video*, stream URL, video file, image directory or landmark recording (.jsonl/.npz)
+DEFAULT_SESSION = "default"  # Session served on /ws/gestures
+SESSION_SOURCES = {DEFAULT_SESSION: SOURCE}  # Session ID -> source, served on /ws/gestures/{session}
+RECORD_PATH = None  # Record sessions to .jsonl/.npz landmarks, a video file or an image directory
+FRAME_WAIT_TIMEOUT = 0.5  # Seconds the worker waits for a fresh frame before retrying
+
+# Camera mode (see gesture_camera.py --probe to find the best one for a device)
+CAMERA_BACKEND = "auto"  # "auto", "v4l2", "gstreamer" or "ffmpeg"
+CAMERA_FOURCC = "MJPG"  # Pixel format requested from the device
+CAMERA_SIZE = None  # (width, height) requested from the device; None is CAM_W x CAM_H. Gesture thresholds stay in CAM_W x CAM_H pixels
+CAMERA_FPS = 30  # Frame rate requested from the device
+CAMERA_BUFFER_SIZE = 1  # Driver frame queue depth
+CAMERA_EXPOSURE = None  # None keeps the driver setting, "auto", or a manual value (driver units)
+
+# Startup
+WARM_START = False  # Open every session's source and build its model at startup, before any client connects
+CAMERA_GRACE_SECONDS = 30.0  # Keep a session's source and model open this long after its last client (None: until shutdown)
+WARMUP_IMAGE = None  # Optional BGR photo of a hand for the warm-up inference, so the landmark model is warmed too
+IDLE_POLL_INTERVAL = 0.05  # Seconds between checks for a returning client while a session is open without one
+
+# Inference input
+ROI_TRACKING = False  # Crop inference around the tracked hand instead of using the full frame
+INFERENCE_SCALE = 1.0  # Downscale factor for full-frame searches (e.g. 0.5 on low-end CPUs)
+INFERENCE_BACKEND = "thread"  # "thread" (in-process) or "process" (worker processes, one Hands each)
+INFERENCE_PROCESSES = 2  # Worker processes per session with the process backend
+TEMPORAL_SKIP = False  # Reuse the last landmarks while the hand region is static (see gesture_skip)
+
+# Frame pacing
+TARGET_FPS = 30  # Detection rate while a hand is being tracked
+IDLE_FPS = 5  # Reduced rate once no hand has been seen for a while
+IDLE_AFTER_SECONDS = 5.0  # Time without a hand before dropping to IDLE_FPS
+
+# Worker pool shared by every session's capture/inference steps
+INFERENCE_WORKERS = os.cpu_count() or 1
+
+# Broadcast settings
+CURSOR_POLICIES = ("latest", "all")
+CURSOR_POLICY = "latest"  # "latest": a client only gets the newest cursor frame, "all": every frame is queued
+CLIENT_QUEUE_LIMIT = 32  # Queued frames (events, or every frame with "all") a client may fall behind by
+SLOW_CLIENT_GRACE = 2.0  # Seconds a client may stay over the limit, or block in one send, before it is disconnected
+CLIENT_QUEUE_HARD_LIMIT = 256  # Disconnect at once past this backlog, whatever the grace period
+
+# Diagnostics
+PROFILING_ENABLED = False  # Serve /debug/profile (sampling profiler of the pipeline threads)
 
 # ============================================
 
-app = FastAPI(title="Hand Gesture Control API")
+@asynccontextmanager
+async def lifespan(app):
+    """Warm sessions up in the background (the server accepts requests at once), stop them on shutdown"""
+    if WARM_START:
+        for session_id in SESSION_SOURCES:
+            get_session(session_id).start_producer()
+    yield
+    for hub in list(sessions.values()):
+        if hub.linger is not None:
+            # A pending grace period would otherwise stop the producer after shutdown
+            hub.linger.cancel()
+            await asyncio.wait([hub.linger])
+        await hub.stop_producer()
+        if hub.stopping is not None:
+            await asyncio.wait([hub.stopping])
+
+app = FastAPI(title="Hand Gesture Control API", lifespan=lifespan)
+log = get_logger("server")
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -39,359 +124,1056 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# MediaPipe setup
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
-    max_num_hands=1,
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
+# Camera reads and MediaPipe both block, so they run on this
+# pool instead of the asyncio event loop. Sessions take turns on it; each session
+# only ever has one step in flight, so its own state needs no extra ordering.
+inference_pool = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="gesture-worker")
 
-class GestureDetector:
-    def __init__(self):
-        self.prev_x = None
-        self.prev_y = None
-        
-        # Gesture cooldowns (separate for each type)
-        self.last_pinch_time = 0
-        self.last_swipe_horizontal_time = 0
-        self.last_swipe_vertical_time = 0
-        
-        # Movement tracking for anti-cancellation
-        self.movement_start_x = None
-        self.movement_start_y = None
-        self.movement_direction = None  # 'left', 'right', 'up', 'down', or None
-        self.movement_confirmed_frames = 0
-        
-        # Camera management
-        self.cap = None
-        self.active_connections = 0
-        self.camera_lock = False
-        
-    def get_distance(self, p1, p2):
-        """Calculate Euclidean distance between two points"""
-        return np.linalg.norm(np.array(p1) - np.array(p2))
+class FrameGrabber:
+    """Keeps draining a live source on its own thread and exposes only the newest frame"""
+
+    def __init__(self, source):
+        self.source = source
+        self.condition = threading.Condition()
+        self.frame = None
+        self.sequence = 0  # Frames read from the device
+        self.consumed = 0  # Sequence number of the last frame handed out
+        self.dropped_frames = 0  # Frames overwritten before anyone consumed them
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="frame-grabber", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def _loop(self):
+        while self.running:
+            frame = self.source.read()
+            if frame is None:
+                time.sleep(0.01)
+                continue
+
+            with self.condition:
+                if self.frame is not None and self.consumed < self.sequence:
+                    # Never handed out, so its buffer can go straight back to the source
+                    self.dropped_frames += 1
+                    self.source.release(self.frame)
+                self.frame = frame
+                self.sequence += 1
+                self.condition.notify_all()
+
+    def read(self, timeout=FRAME_WAIT_TIMEOUT):
+        """Wait for a frame newer than the last one read, returns a SourceFrame or None"""
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.sequence > self.consumed or not self.running, timeout
+            ):
+                return None
+            if self.sequence <= self.consumed:
+                return None
+
+            self.consumed = self.sequence
+            return self.frame
+
+class FrameScheduler:
+    """Paces the detection loop to a target FPS, slowing down while no hand is visible"""
 
+    def __init__(self, target_fps=TARGET_FPS, idle_fps=IDLE_FPS, idle_after=IDLE_AFTER_SECONDS,
+                 name=DEFAULT_SESSION):
+        self.name = name
+        self.active_period = 1.0 / target_fps
+        self.idle_period = 1.0 / idle_fps
+        self.idle_after = idle_after
+        self.last_hand_time = time.monotonic()
+        self.frame_start = self.last_hand_time
+        self.idle = False
+
+    def start_frame(self):
+        """Mark the start of a frame's capture/inference/send work"""
+        self.frame_start = time.monotonic()
+
+    def frame_done(self, hand_seen):
+        """Return how long to wait so the frame takes one period including its work"""
+        now = time.monotonic()
+        if hand_seen:
+            self.last_hand_time = now
+
+        idle = now - self.last_hand_time > self.idle_after
+        if idle != self.idle:
+            self.idle = idle
+            if idle:
+                log_event(log, "pacing_idle", session=self.name, idle_after=self.idle_after,
+                          fps=round(1 / self.idle_period))
+            else:
+                log_event(log, "pacing_active", session=self.name, fps=round(1 / self.active_period))
+
+        period = self.idle_period if idle else self.active_period
+        return max(0.0, self.frame_start + period - now)
+
+class GestureDetector:
+    def __init__(self, source=None, record_path=RECORD_PATH, log_gestures=True, name=DEFAULT_SESSION, executor=None,
+                 backend=None, processes=None, max_hands=None, hands_factory=create_hands):
+        self.name = name
+        self.max_hands = max_hands if max_hands is not None else MAX_HANDS
+        
+        # Stable hand IDs, with pinch/swipe classification per hand,
+        # independent of camera and sockets
+        self.tracker = HandTracker(self.max_hands, self.new_state_machine, pose_pinch=HAND_SCALED_PINCH)
+        
+        # Chooses the MediaPipe input: full frame or a crop around the tracked hands
+        self.roi = HandRoiTracker(ROI_TRACKING, downscale=INFERENCE_SCALE, max_hands=self.max_hands)
+        
+        # Skips MediaPipe for frames where the hand has not moved since the last inference
+        self.skipper = TemporalSkip(TEMPORAL_SKIP)
+        
+        # Frame source management (owned by the single producer loop)
+        self.source = source if source is not None else open_session_source(SOURCE)
+        self.source_open = False
+        self.status = "idle"  # "idle", "starting", "ready" (source open, model warm) or "failed", shown on /health
+        self.grabber = None
+        self.record_path = record_path
+        self.recorder = None
+        self.log_gestures = log_gestures
+        
+        # Seconds spent in each stage of the last frame (capture, convert,
+        # inference, classify, preview), read by the benchmark
+        self.stage_times = {}
+        
+        # Scratch array reused every frame through OpenCV's dst= output, unless the
+        # backend lends a shared-memory slot to convert into
+        self.rgb_buffer = None
+        self.frame_shape = (CAM_H, CAM_W, 3)  # Shape of the source's frames, known once it is open
+        
+        # Snapshots for /preview.mjpg, taken only while a viewer is attached
+        self.preview = PreviewStream()
+        
+        # Moving averages behind the FPS and hand-ratio gauges on /metrics
+        self.stats = FrameStats()
+        
+        # This session's MediaPipe backend, built when the source opens. With the
+        # process backend up to `capacity` frames are in flight at once; `pending`
+        # holds them (frame, ROI transform) oldest first
+        self.backend_kind = backend if backend is not None else INFERENCE_BACKEND
+        self.processes = processes if processes is not None else INFERENCE_PROCESSES
+        self.inference = None
+        self.hands_factory = hands_factory  # Builds the MediaPipe Hands graph (replaced by fakes in tests)
+        self.pending = deque()
+        
+        # Blocking work runs on the shared pool; the lock keeps start/step/stop
+        # of this session from overlapping when a cancelled step is still running
+        self.worker = executor if executor is not None else inference_pool
+        self.lock = threading.Lock()
     
-    def draw_preview(self, img, hand_landmarks, gesture_type, cursor_pos=None):
-        """Draw hand landmarks and gesture info on preview window"""
-        if not SHOW_CAMERA_WINDOW:
-            return
+    @staticmethod
+    def new_state_machine():
+        return GestureStateMachine(
+            pinch_threshold=PINCH_THRESHOLD,
+            swipe_horizontal_threshold=SWIPE_HORIZONTAL_THRESHOLD,
+            swipe_vertical_threshold=SWIPE_VERTICAL_THRESHOLD,
+            cooldown=GESTURE_COOLDOWN,
+            confirmation_frames=MOVEMENT_CONFIRMATION_FRAMES,
+            frame_size=(CAM_W, CAM_H)
+        )
         
-        # Draw hand landmarks
-        if hand_landmarks:
-            mp_draw = mp.solutions.drawing_utils
-            mp_draw.draw_landmarks(
-                img, 
-                hand_landmarks, 
-                mp_hands.HAND_CONNECTIONS,
-                mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                mp_draw.DrawingSpec(color=(0, 255, 255), thickness=2)
-            )
+    def start_source(self):
+        """Open the frame source (camera, clip or recording)"""
+        with self.lock:
+            if not self.source_open:
+                self.status = "starting"
+                start = time.perf_counter()
+                if not self.source.open():
+                    log_event(log, "source_failed", logging.ERROR, session=self.name,
+                              source=type(self.source).__name__)
+                    self.status = "failed"
+                    return False
+                self.source_open = True
+                STARTUP_SECONDS.set(round(time.perf_counter() - start, 4), session=self.name, phase="source")
             
-            # Draw cursor position
-            if cursor_pos:
-                cx_px = int(cursor_pos[0] * CAM_W)
-                cy_px = int(cursor_pos[1] * CAM_H)
-                cv2.circle(img, (cx_px, cy_px), 10, (255, 0, 255), -1)
-                cv2.circle(img, (cx_px, cy_px), 15, (255, 0, 255), 2)
-        
-        # Draw gesture status overlay
-        overlay_height = 80
-        overlay = img.copy()
-        cv2.rectangle(overlay, (0, 0), (CAM_W, overlay_height), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.6, img, 0.4, 0, img)
-        
-        # Gesture type text
-        gesture_text = f"Gesture: {gesture_type.upper()}"
-        cv2.putText(img, gesture_text, (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-        
-        # Status indicator
-        if gesture_type == "no_hand":
-            status_color = (0, 0, 255)  # Red
-            status_text = "No Hand Detected"
-        elif gesture_type == "click":
-            status_color = (255, 0, 255)  # Magenta
-            status_text = "CLICK!"
-        elif gesture_type in ["drag_start", "dragging"]:
-            status_color = (0, 165, 255)  # Orange
-            status_text = "DRAGGING"
-        elif gesture_type == "swipe":
-            status_color = (255, 255, 0)  # Cyan
-            status_text = "SWIPE!"
-        elif gesture_type == "open_hand":
-            status_color = (147, 112, 219)  # Purple
-            status_text = "OPEN HAND - View Item!"
-        else:
-            status_color = (0, 255, 0)  # Green
-            status_text = "Hand Detected"
-        
-        cv2.putText(img, status_text, (10, 60), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)
+                # Drain live devices continuously so inference always sees the newest frame
+                if self.source.realtime:
+                    self.grabber = FrameGrabber(self.source)
+                    self.grabber.start()
+            
+                if self.record_path:
+                    self.recorder = SessionRecorder(self.record_path, TARGET_FPS)
+                    log_event(log, "recording_started", session=self.name, path=self.record_path)
+            
+                # Recorded landmark streams never reach MediaPipe, so they need no graph
+                if not self.source.provides_landmarks and self.inference is None:
+                    start = time.perf_counter()
+                    # Shared-memory slots fit the mode the source actually opened with
+                    self.frame_shape = self.source.frame_shape or (CAM_H, CAM_W, 3)
+                    self.inference = create_backend(self.backend_kind, self.processes, self.frame_shape,
+                                                    self.max_hands, self.hands_factory)
+                    STARTUP_SECONDS.set(round(time.perf_counter() - start, 4), session=self.name, phase="model")
+                    start = time.perf_counter()
+                    self.warm_up_inference()
+                    STARTUP_SECONDS.set(round(time.perf_counter() - start, 4), session=self.name, phase="warmup")
+            
+                self.status = "ready"
+                log_event(log, "source_opened", session=self.name, source=type(self.source).__name__)
+                if getattr(self.source, "mode", None) is not None:
+                    # What the driver agreed to, which is not always what was asked for
+                    log_event(log, "camera_mode", session=self.name, mode=self.source.describe())
         
-        # Resize for preview
-        preview = cv2.resize(img, (PREVIEW_WIDTH, PREVIEW_HEIGHT))
-        cv2.imshow(WINDOW_NAME, preview)
-        cv2.waitKey(1)
+            return True
     
-    def start_camera(self):
-        """Initialize camera"""
-        if self.cap is None:
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                print("❌ Failed to open camera")
-                self.cap = None
-                return False
+    def stop_source(self):
+        """Release the source once the producer loop stops"""
+        with self.lock:
+            if self.source_open:
+                if self.grabber is not None:
+                    self.grabber.stop()
+                    log_event(log, "grabber_stopped", session=self.name,
+                              captured=self.grabber.sequence, dropped=self.grabber.dropped_frames)
+                    self.grabber = None
+            
+                if self.recorder is not None:
+                    self.recorder.close()
+                    log_event(log, "recording_stopped", session=self.name,
+                              frames=self.recorder.frames, path=self.record_path)
+                    self.recorder = None
             
-            self.cap.set(3, CAM_W)
-            self.cap.set(4, CAM_H)
+                self.source.close()
+                self.source_open = False
+                self.roi.reset()
+                self.skipper.reset()
+                self.tracker.reset()
             
-            if SHOW_CAMERA_WINDOW:
-                cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
-                cv2.resizeWindow(WINDOW_NAME, PREVIEW_WIDTH, PREVIEW_HEIGHT)
+                self.pending.clear()
+                if self.inference is not None:
+                    self.inference.close()
+                    self.inference = None
             
-            print(f"📷 Camera initialized")
+                self.status = "idle"
+                log_event(log, "source_released", session=self.name)
+    
+    def warm_up_inference(self):
+        """Run every inference worker once, so the first camera frame does not pay for graph initialization
+        
+        A blank frame only exercises palm detection; with WARMUP_IMAGE (a photo of a
+        hand) the landmark model runs as well.
+        """
+        frame = None
+        if WARMUP_IMAGE:
+            import cv2
+            frame = cv2.imread(WARMUP_IMAGE)
+            if frame is not None:
+                frame = cv2.resize(frame, (self.frame_shape[1], self.frame_shape[0]))
+        if frame is None:
+            frame = np.full(self.frame_shape, 128, dtype=np.uint8)
+        frame = frame[..., ::-1].copy()  # MediaPipe takes RGB
+        for _ in range(self.inference.capacity):
+            self.inference.submit(frame)
+        for _ in range(self.inference.capacity):
+            self.inference.result()
+    
+    def prepare_inference(self, img):
+        """Convert a frame for MediaPipe, returns (inference input, ROI transform)
+        
+        The frame is not flipped: MediaPipe sees the raw image and the landmarks are
+        mirrored afterwards (see finish_inference), so the only per-frame pixel work
+        is the color conversion. With the process backend it writes straight into a
+        shared-memory slot, so a full frame is never copied a second time.
+        """
+        import cv2
+        start = time.perf_counter()
+        rgb = self.inference.frame_buffer(img.shape)
+        if rgb is None:
+            if self.rgb_buffer is None or self.rgb_buffer.shape != img.shape:
+                self.rgb_buffer = np.empty_like(img)
+            rgb = self.rgb_buffer
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=rgb)
+        inference_input, transform = self.roi.prepare(rgb)
+        self.stage_times["convert"] = time.perf_counter() - start
+        return inference_input, transform
+    
+    def finish_inference(self, img, hands, transform):
+        """Map landmarks back to the full frame, move the ROI and mirror them for clients
         
-        self.active_connections += 1
-        print(f"👥 Active connections: {self.active_connections}")
-        return True
+        Returns (landmarks, handedness). MediaPipe labels handedness as if the image
+        were mirrored; it sees the raw frame, so the labels are swapped back here.
+        """
+        landmarks, handedness = hands
+        if len(landmarks):
+            # Back to full-frame coordinates, so clients see the same normalized cursor
+            self.roi.map_landmarks(landmarks, transform)
+        # The ROI lives in raw image space, clients get the selfie view (x -> 1 - x)
+        self.roi.update(landmarks, (img.shape[1], img.shape[0]))
+        np.subtract(1.0, landmarks[..., 0], out=landmarks[..., 0])
+        return landmarks, mirror_handedness(handedness)
     
-    def stop_camera(self):
-        """Release camera only when no active connections"""
-        self.active_connections = max(0, self.active_connections - 1)
-        print(f"👥 Active connections: {self.active_connections}")
-        
-        if self.active_connections == 0 and self.cap is not None:
-            self.cap.release()
-            self.cap = None
+    def check_static(self, img):
+        """Temporal skip check, timed as its own stage; True when the last landmarks can be reused"""
+        if not self.skipper.enabled:
+            return False
+        start = time.perf_counter()
+        static = self.skipper.is_static(img)
+        self.stage_times["skip"] = time.perf_counter() - start
+        if static:
+            SKIPPED_INFERENCE.inc(session=self.name)
+        return static
+    
+    def infer_landmarks(self, img):
+        """Run MediaPipe on a frame, returns (H, 21, 3) mirrored landmarks and their handedness"""
+        if self.check_static(img):
+            return self.skipper.reuse()
+        inference_input, transform = self.prepare_inference(img)
+        start = time.perf_counter()
+        hands = self.inference.process(inference_input)
+        self.stage_times["inference"] = time.perf_counter() - start
+        landmarks, handedness = self.finish_inference(img, hands, transform)
+        self.skipper.store(img, landmarks, handedness)
+        return landmarks, handedness
+    
+    def log_gesture(self, hands):
+        """Log detected gestures of every hand (rate-limited, see gesture_logging)"""
+        if not self.log_gestures:
+            return
+        for hand in hands:
+            if hand["type"] in ("pinch", "swipe"):
+                log_event(log, "gesture", session=self.name, type=hand["type"],
+                          direction=hand.get("direction"), action=hand.get("action"),
+                          hand=hand["hand_id"], handedness=hand["handedness"], t=hand["timestamp"])
+    
+    def process_frame(self, frame):
+        """Run hand tracking and gesture classification on one SourceFrame"""
+        self.stage_times = {}
+        
+        # Recorded landmark streams skip MediaPipe entirely (and carry no handedness)
+        if frame.landmarks is None:
+            landmarks, handedness = self.infer_landmarks(frame.image)
+        else:
+            landmarks, handedness = frame.landmarks, None
+        
+        return self.classify_frame(frame, landmarks, handedness)
+    
+    def classify_frame(self, frame, landmarks, handedness=None):
+        """Record, classify and preview a frame whose landmarks are known"""
+        if self.recorder is not None:
+            self.recorder.write(frame.image, landmarks, frame.timestamp)
+        
+        # Hand geometry and static poses of every hand in one vectorized pass
+        start = time.perf_counter()
+        landmarks = landmarks[:self.max_hands]
+        # Aspect ratio of the actual frame, which a camera mode (CAMERA_SIZE) may change
+        frame_size = (frame.image.shape[1], frame.image.shape[0]) if frame.image is not None else (CAM_W, CAM_H)
+        features = extract_features(landmarks, frame_size)
+        poses = classify_poses(features)
+        self.stage_times["features"] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        hands = self.tracker.update(landmarks, handedness, frame.timestamp, features, poses)
+        gesture_data = combine_hands(hands, frame.timestamp, include_hands=self.max_hands > 1)
+        self.stage_times["classify"] = time.perf_counter() - start
+        self.log_gesture(hands)
+        
+        # Hand a snapshot to the MJPEG preview; free when nobody is watching
+        if frame.image is not None and self.preview.wants_frame():
+            start = time.perf_counter()
+            cursor = gesture_data.get("cursor")
+            self.preview.capture(frame.image, landmarks, gesture_data["type"],
+                                 (cursor["x"], cursor["y"]) if cursor else None, gesture_data.get("pose"))
+            self.stage_times["preview"] = time.perf_counter() - start
+        
+        return gesture_data
+
+    def capture_and_process(self):
+        """Classify the next frame (runs on the worker thread)"""
+        with self.lock:
+            if not self.source_open:
+                raise RuntimeError("Source is not open")
+        
+            start = time.perf_counter()
+            if self.grabber is not None:
+                # Live source: newest frame only
+                frame = self.grabber.read()
+            else:
+                # Offline source: every frame, in order
+                frame = self.source.read()
+                if frame is None and self.source.exhausted and not self.pending:
+                    raise EOFError("Source exhausted")
+        
+            capture_time = time.perf_counter() - start
             
-            if SHOW_CAMERA_WINDOW:
-                cv2.destroyAllWindows()
+            if self.inference is not None and self.inference.capacity > 1:
+                gesture_data = self.process_pipelined(frame)
+            elif frame is not None:
+                gesture_data = self.process_frame(frame)
+                self.source.release(frame)
+            else:
+                return None
             
-            print("📷 Camera released")
+            if gesture_data is not None:
+                self.stage_times["capture"] = capture_time
+            return gesture_data
+    
+    def process_pipelined(self, frame):
+        """Keep up to `capacity` frames in the worker processes, classify the oldest once it is due
+        
+        Results come back in capture order, so the state machine sees the same sequence as
+        the synchronous path, just `capacity - 1` frames later. The ROI follows the newest
+        finished frame. Static frames (temporal skip) are queued without a transform and
+        take the landmarks of the frame finished before them (no hands if it had none).
+        The static check compares against the newest finished frame, so its reference is
+        `capacity - 1` frames older than in the synchronous path. Returns None while the
+        pipeline is still filling.
+        """
+        if frame is not None:
+            self.stage_times = {}
+            if self.check_static(frame.image):
+                self.pending.append((frame, None))
+            else:
+                inference_input, transform = self.prepare_inference(frame.image)
+                self.inference.submit(inference_input)
+                self.pending.append((frame, transform))
+            if len(self.pending) < self.inference.capacity:
+                return None
+        elif not self.pending:
+            return None
+        
+        # Full pipeline, or no new frame to overlap with: wait for the oldest one
+        frame, transform = self.pending.popleft()
+        if transform is None:
+            landmarks, handedness = self.skipper.reuse()
+        else:
+            start = time.perf_counter()
+            hands = self.inference.result()
+            self.stage_times["inference"] = time.perf_counter() - start
+            landmarks, handedness = self.finish_inference(frame.image, hands, transform)
+            self.skipper.store(frame.image, landmarks, handedness)
+        gesture_data = self.classify_frame(frame, landmarks, handedness)
+        self.source.release(frame)
+        return gesture_data
     
-    async def detect_gestures(self, websocket: WebSocket):
-        """Main gesture detection loop"""
-        if not self.start_camera():
-            print("❌ Cannot start camera, aborting gesture detection")
+    def replay(self):
+        """Run an offline source through the detector as fast as possible, yielding every frame's result"""
+        if self.source.realtime:
+            raise ValueError("replay() needs an offline source (video, image directory or landmarks)")
+        if not self.start_source():
             return
         
+        try:
+            for frame in self.source:
+                gesture_data = self.process_frame(frame)
+                self.source.release(frame)
+                yield gesture_data
+        finally:
+            self.stop_source()
+    
+    async def run(self, hub):
+        """Single capture/inference loop feeding every subscriber of the hub"""
+        loop = asyncio.get_running_loop()
+        
+        if not await loop.run_in_executor(self.worker, self.start_source):
+            log_event(log, "detection_aborted", logging.ERROR, session=self.name, reason="source_failed")
+            hub.close_stream(asyncio.current_task())
+            return
+        
+        scheduler = FrameScheduler(name=self.name)
         try:
             while True:
-                if self.cap is None:
-                    print("❌ Camera is None, breaking loop")
-                    break
-                    
-                success, img = self.cap.read()
-                if not success:
-                    await asyncio.sleep(0.01)
+                if not hub.subscribers:
+                    # Warm start or grace period: source and model stay open, nothing is processed
+                    await asyncio.sleep(IDLE_POLL_INTERVAL)
                     continue
                 
-                img = cv2.flip(img, 1)
-                rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                result = hands.process(rgb)
+                scheduler.start_frame()
                 
-                gesture_data = {
-                    "type": "none",
-                    "timestamp": time.time()
-                }
+                # The event loop only waits here; the blocking work is on the worker
+                gesture_data = await loop.run_in_executor(self.worker, self.capture_and_process)
+                if gesture_data is None:
+                    await asyncio.sleep(0.01)
+                    continue
+                
+                record_frame(self.name, gesture_data, self.stage_times, self.stats)
                 
-                if result.multi_hand_landmarks:
-                    hand = result.multi_hand_landmarks[0]
-                    lm = hand.landmark
-                    
-                    index_tip = lm[8]
-                    thumb_tip = lm[4]
-                    
-                    # Normalized coordinates (0-1)
-                    cx = index_tip.x
-                    cy = index_tip.y
-                    
-                    # Send cursor position
-                    gesture_data["cursor"] = {
-                        "x": cx,
-                        "y": cy
-                    }
-                    
-                    current_time = time.time()
-                    
-                    # ========== ACTION 1: PINCH (Add Gift/Card) ==========
-                    dist = self.get_distance(
-                        (index_tip.x, index_tip.y),
-                        (thumb_tip.x, thumb_tip.y)
-                    )
-                    
-                    if dist < PINCH_THRESHOLD / CAM_W:
-                        if current_time - self.last_pinch_time > GESTURE_COOLDOWN:
-                            gesture_data["type"] = "pinch"
-                            gesture_data["action"] = "add_item"
-                            self.last_pinch_time = current_time
-                            print(f"👌 PINCH detected! Adding item...")
-                    
-                    # ========== SWIPE DETECTION WITH ANTI-CANCELLATION ==========
-                    # Initialize movement tracking
-                    if self.movement_start_x is None:
-                        self.movement_start_x = cx
-                        self.movement_start_y = cy
-                    
-                    # Calculate movement from start position
-                    dx = cx - self.movement_start_x
-                    dy = cy - self.movement_start_y
-                    
-                    # Convert to pixels for threshold comparison
-                    dx_px = abs(dx * CAM_W)
-                    dy_px = abs(dy * CAM_H)
-                    
-                    # Determine if we have significant movement
-                    has_horizontal_movement = dx_px > SWIPE_HORIZONTAL_THRESHOLD
-                    has_vertical_movement = dy_px > SWIPE_VERTICAL_THRESHOLD
-                    
-                    # ========== ACTION 2 & 3: SWIPE LEFT/RIGHT (Rotate) ==========
-                    if has_horizontal_movement and not has_vertical_movement:
-                        # Determine direction
-                        new_direction = 'right' if dx > 0 else 'left'
-                        
-                        # Confirm movement direction
-                        if self.movement_direction == new_direction:
-                            self.movement_confirmed_frames += 1
-                        else:
-                            self.movement_direction = new_direction
-                            self.movement_confirmed_frames = 1
-                        
-                        # Trigger gesture only if confirmed and cooldown passed
-                        if (self.movement_confirmed_frames >= MOVEMENT_CONFIRMATION_FRAMES and 
-                            current_time - self.last_swipe_horizontal_time > GESTURE_COOLDOWN):
-                            
-                            gesture_data["type"] = "swipe"
-                            gesture_data["direction"] = new_direction
-                            gesture_data["action"] = f"rotate_{new_direction}"
-                            self.last_swipe_horizontal_time = current_time
-                            
-                            # Reset movement tracking to prevent re-trigger
-                            self.movement_start_x = cx
-                            self.movement_start_y = cy
-                            self.movement_direction = None
-                            self.movement_confirmed_frames = 0
-                            
-                            print(f"{'➡️' if new_direction == 'right' else '⬅️'} SWIPE {new_direction.upper()} detected!")
-                    
-                    # ========== ACTION 4 & 5: SWIPE UP/DOWN (Open/Close Modal) ==========
-                    elif has_vertical_movement and not has_horizontal_movement:
-                        # Determine direction (remember: y increases downward)
-                        new_direction = 'up' if dy < 0 else 'down'
-                        
-                        # Confirm movement direction
-                        if self.movement_direction == new_direction:
-                            self.movement_confirmed_frames += 1
-                        else:
-                            self.movement_direction = new_direction
-                            self.movement_confirmed_frames = 1
-                        
-                        # Trigger gesture only if confirmed and cooldown passed
-                        if (self.movement_confirmed_frames >= MOVEMENT_CONFIRMATION_FRAMES and 
-                            current_time - self.last_swipe_vertical_time > GESTURE_COOLDOWN):
-                            
-                            # Swipe UP: Always opens modal
-                            if new_direction == 'up':
-                                gesture_data["type"] = "swipe"
-                                gesture_data["direction"] = "up"
-                                gesture_data["action"] = "open_modal"
-                                self.last_swipe_vertical_time = current_time
-                                print(f"⬆️ SWIPE UP detected! Opening modal...")
-                            
-                            # Swipe DOWN: Send to frontend (frontend will check if modal is open)
-                            elif new_direction == 'down':
-                                gesture_data["type"] = "swipe"
-                                gesture_data["direction"] = "down"
-                                gesture_data["action"] = "close_modal"
-                                self.last_swipe_vertical_time = current_time
-                                print(f"⬇️ SWIPE DOWN detected! Sending close signal...")
-                            
-                            # Reset movement tracking
-                            self.movement_start_x = cx
-                            self.movement_start_y = cy
-                            self.movement_direction = None
-                            self.movement_confirmed_frames = 0
-                    
-                    # Reset movement tracking if hand is relatively still
-                    elif not has_horizontal_movement and not has_vertical_movement:
-                        # Hand returned to neutral - reset tracking
-                        self.movement_start_x = cx
-                        self.movement_start_y = cy
-                        self.movement_direction = None
-                        self.movement_confirmed_frames = 0
-                    
-                    # Update previous position
-                    self.prev_x = cx
-                    self.prev_y = cy
-                    
-                    # Draw preview window with hand tracking
-                    self.draw_preview(img, hand, gesture_data["type"], (cx, cy))
-                else:
-                    # No hand detected - reset all tracking
-                    gesture_data["type"] = "no_hand"
-                    self.prev_x = None
-                    self.prev_y = None
-                    self.movement_start_x = None
-                    self.movement_start_y = None
-                    self.movement_direction = None
-                    self.movement_confirmed_frames = 0
-                    
-                    # Draw preview window without hand
-                    self.draw_preview(img, None, gesture_data["type"])
+                # Fan the frame out to every connected client
+                hub.publish(gesture_data)
                 
-                # Send gesture data to frontend
-                await websocket.send_json(gesture_data)
-                await asyncio.sleep(0.03)  # ~30 FPS
+                # Sleep only for what is left of the frame period after the work above
+                await asyncio.sleep(scheduler.frame_done(gesture_data["type"] != "no_hand"))
                 
-        except Exception as e:
-            print(f"Error in gesture detection: {e}")
+        except EOFError:
+            log_event(log, "source_finished", session=self.name)
+        except Exception:
+            log.exception("detection_failed", extra={"fields": {"session": self.name}})
         finally:
-            self.stop_camera()
+            # Queued behind any in-flight frame, so the source is never released mid-read
+            await asyncio.shield(loop.run_in_executor(self.worker, self.stop_source))
+            hub.close_stream(asyncio.current_task())
+
+class ClientQueue:
+    """Bounded outbound queue of one client
+    
+    Discrete events (pinch, swipe) are queued in order and never dropped. Cursor
+    and no_hand frames collapse into the newest one ("latest" policy), which is
+    delivered after the queued events, or are queued like events ("all"). A
+    client whose backlog stays over `limit` for `grace` seconds, or whose send
+    is stuck that long, is flagged slow, loses its backlog and has its sender
+    cancelled; publishing never waits.
+    """
+    
+    def __init__(self, client_id, session=DEFAULT_SESSION, cursor_policy=None, limit=CLIENT_QUEUE_LIMIT,
+                 grace=SLOW_CLIENT_GRACE, hard_limit=CLIENT_QUEUE_HARD_LIMIT):
+        self.client_id = client_id
+        self.session = session
+        self.cursor_policy = cursor_policy if cursor_policy is not None else CURSOR_POLICY
+        self.limit = limit
+        self.grace = grace
+        self.hard_limit = hard_limit
+        self.frames = deque()
+        self.latest = None  # Coalesced cursor frame, newer than everything in `frames`
+        self.over_limit_since = None
+        self.finished = False  # Producer stopped: deliver what is queued, then None
+        self.slow = False
+        self.on_slow = None  # Called once when the client is flagged slow
+        self.ready = asyncio.Event()
+    
+    def qsize(self):
+        return len(self.frames) + (self.latest is not None)
+    
+    def put(self, frame):
+        """Queue a frame for this client (never blocks)"""
+        if self.finished or self.slow:
+            return
+        
+        if frame.data["type"] in ("pinch", "swipe") or self.cursor_policy == "all":
+            if self.latest is not None:
+                # The event carries a newer cursor than the pending one
+                self.latest = None
+                COALESCED_FRAMES.inc(session=self.session)
+            self.frames.append(frame)
+        else:
+            if self.latest is not None:
+                COALESCED_FRAMES.inc(session=self.session)
+            self.latest = frame
+        # Checked on cursor frames too: a stalled client must not outlive its grace
+        # period just because no gesture happens
+        self.check_backlog()
+        self.ready.set()
+    
+    def check_backlog(self):
+        if len(self.frames) <= self.limit:
+            self.over_limit_since = None
+            return
+        
+        now = time.monotonic()
+        if self.over_limit_since is None:
+            self.over_limit_since = now
+        if now - self.over_limit_since >= self.grace or len(self.frames) > self.hard_limit:
+            self.drop()
+    
+    def drop(self):
+        """Flag the client slow: its backlog is discarded and on_slow is called"""
+        if self.slow:
+            return
+        self.slow = True
+        self.frames.clear()
+        self.latest = None
+        self.ready.set()
+        SLOW_CLIENTS.inc(session=self.session)
+        if self.on_slow is not None:
+            self.on_slow()
+    
+    def finish(self):
+        """The producer stopped; get() returns None once the queue is drained"""
+        self.finished = True
+        self.ready.set()
+    
+    async def get(self):
+        """Next frame to send, or None when the stream is over (or the client was too slow)"""
+        while True:
+            if self.slow:
+                return None
+            if self.frames:
+                return self.frames.popleft()
+            if self.latest is not None:
+                frame, self.latest = self.latest, None
+                return frame
+            if self.finished:
+                return None
+            self.ready.clear()
+            await self.ready.wait()
+
+class GestureHub:
+    """Runs one detection loop and fans its gesture events out to every client"""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.subscribers = set()  # ClientQueue per connected client
+        self.producer = None
+        self.stopping = None  # Previous producer, still releasing the source
+        self.linger = None  # Stops the producer once the grace period after the last client is over
+        self.first_client_at = None  # (perf_counter, "warm"/"cold") until the first frame after an idle period
+
+    def subscribe(self, client_id=None, cursor_policy=None):
+        """Register a client queue, starting the producer for the first one"""
+        if client_id is None:
+            client_id = next(client_ids)
+        queue = ClientQueue(client_id, self.detector.name, cursor_policy)
+        self.subscribers.add(queue)
+        log_event(log, "connections", session=self.detector.name, clients=len(self.subscribers))
+
+        if len(self.subscribers) == 1:
+            start = "warm" if self.detector.status == "ready" else "cold"
+            self.first_client_at = (time.perf_counter(), start)
+        self.start_producer()
+        return queue
+
+    async def unsubscribe(self, queue):
+        """Drop a client queue; after the last one the producer stops once CAMERA_GRACE_SECONDS have passed"""
+        self.subscribers.discard(queue)
+        CLIENT_SEND_SECONDS.remove(session=self.detector.name, client=queue.client_id)
+        log_event(log, "connections", session=self.detector.name, clients=len(self.subscribers))
+
+        if not self.subscribers and self.producer is not None and CAMERA_GRACE_SECONDS is not None:
+            if CAMERA_GRACE_SECONDS > 0:
+                self.linger = asyncio.create_task(self.stop_producer(CAMERA_GRACE_SECONDS))
+            else:
+                await self.stop_producer()
+
+    def start_producer(self):
+        """Start the detection loop unless it is running; also called at startup with WARM_START"""
+        if self.linger is not None:
+            self.linger.cancel()
+            self.linger = None
+        if self.producer is None or self.producer.done():
+            self.producer = asyncio.create_task(self.run_producer(self.stopping))
+
+    async def run_producer(self, previous):
+        if previous is not None:
+            # The previous loop releases the source on the worker; reopening must wait for it
+            await asyncio.wait([previous])
+        await self.detector.run(self)
+
+    async def stop_producer(self, delay=0.0):
+        """Stop the detection loop and release the source, after `delay` seconds unless a client returns"""
+        if delay:
+            await asyncio.sleep(delay)
+        # Past this point a returning client starts a new producer instead of cancelling this
+        self.linger = None
+        producer, self.producer = self.producer, None
+        if producer is None:
+            return
+        self.stopping = producer
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+        if self.stopping is producer:
+            self.stopping = None
+
+    def publish(self, gesture_data):
+        """Hand one detected frame to every subscriber"""
+        if self.first_client_at is not None:
+            started, start = self.first_client_at
+            TIME_TO_FIRST_GESTURE.observe(time.perf_counter() - started, session=self.detector.name, start=start)
+            self.first_client_at = None
+
+        # Wrapped once so each wire encoding is computed once, not once per client
+        frame = EncodedFrame(gesture_data)
+        for queue in list(self.subscribers):
+            queue.put(frame)
+
+    def close_stream(self, producer):
+        """Tell every subscriber that `producer` has stopped
+
+        A client that connected while a stopped producer was still releasing the
+        source already belongs to its successor, so a producer that is no longer
+        the hub's current one leaves the queues alone.
+        """
+        if self.producer is not None and self.producer is not producer:
+            return
+        for queue in self.subscribers:
+            queue.finish()
+
+# One hub per session; each owns its source, MediaPipe graph and gesture state
+sessions = {}
+
+# Connection IDs, used as the client label on /metrics
+client_ids = itertools.count(1)
+
+def camera_config():
+    """Capture options for live sources, read when a session opens"""
+    width, height = CAMERA_SIZE or (CAM_W, CAM_H)
+    return CameraConfig(SOURCE, width, height, CAMERA_BACKEND, CAMERA_FOURCC, CAMERA_FPS,
+                        CAMERA_BUFFER_SIZE, CAMERA_EXPOSURE)
+
+def open_session_source(spec):
+    """Frame source of a session; cameras are opened with camera_config()"""
+    config = camera_config()
+    return open_source(spec, config.width, config.height, config)
 
-# Global detector instance
-detector = GestureDetector()
+def get_session(session_id):
+    """Hub for a configured session ID, created on first use; None if unknown"""
+    hub = sessions.get(session_id)
+    if hub is None and session_id in SESSION_SOURCES:
+        detector = GestureDetector(
+            open_session_source(SESSION_SOURCES[session_id]),
+            record_path=session_record_path(session_id),
+            name=session_id
+        )
+        hub = sessions[session_id] = GestureHub(detector)
+    return hub
+
+def session_record_path(session_id):
+    """RECORD_PATH for the default session, suffixed with the ID for the others"""
+    if not RECORD_PATH or session_id == DEFAULT_SESSION:
+        return RECORD_PATH
+    root, ext = os.path.splitext(RECORD_PATH.rstrip("/"))
+    return f"{root}-{session_id}{ext}"
 
 @app.websocket("/ws/gestures")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for gesture streaming"""
+    """WebSocket endpoint for the default session"""
+    await stream_session(websocket, DEFAULT_SESSION)
+
+@app.websocket("/ws/gestures/{session_id}")
+async def session_websocket_endpoint(websocket: WebSocket, session_id: str):
+    """WebSocket endpoint for one session (camera) by ID"""
+    await stream_session(websocket, session_id)
+
+async def stream_session(websocket, session_id):
+    """Stream a session's gestures (?protocol=json|binary, ?filter=none|one_euro|kalman, ?cursor=latest|all)"""
     await websocket.accept()
-    print("Client connected to gesture stream")
+    
+    hub = get_session(session_id)
+    if hub is None:
+        await websocket.close(code=1008, reason=f"Unknown session '{session_id}'")
+        return
+    
+    protocol = websocket.query_params.get("protocol", "json")
+    if protocol not in PROTOCOLS:
+        await websocket.close(code=1008, reason=f"Unknown protocol '{protocol}'")
+        return
+    encoder = make_encoder(protocol)
     
     try:
-        await detector.detect_gestures(websocket)
+        cursor_filter = make_cursor_filter(websocket.query_params, hub.detector.source.realtime)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    cursor_policy = websocket.query_params.get("cursor", CURSOR_POLICY)
+    if cursor_policy not in CURSOR_POLICIES:
+        await websocket.close(code=1008, reason=f"Unknown cursor policy '{cursor_policy}'")
+        return
+    client_id = next(client_ids)
+    log_event(log, "client_connected", session=session_id, client=client_id, protocol=protocol,
+              filter=websocket.query_params.get("filter", "none"), cursor=cursor_policy)
+    
+    queue = hub.subscribe(client_id, cursor_policy)
+    # A stalled socket can block a send indefinitely, so the sender runs as its own
+    # task that the queue cancels when the client falls too far behind. Binary
+    # clients get nothing while no hand is in view, so only the receiver notices
+    # a client that leaves then.
+    sender = asyncio.create_task(send_frames(websocket, session_id, queue, encoder, cursor_filter))
+    receiver = asyncio.create_task(wait_for_disconnect(websocket))
+    queue.on_slow = sender.cancel
+    try:
+        await asyncio.wait([sender, receiver], return_when=asyncio.FIRST_COMPLETED)
+        if receiver.done():
+            receiver.result()
+            log_event(log, "client_disconnected", session=session_id, client=client_id)
+        elif queue.slow:
+            log_event(log, "client_too_slow", logging.WARNING, session=session_id, client=client_id,
+                      limit=queue.limit, grace=queue.grace)
+            await websocket.close(code=1013, reason="Client too slow")
+        else:
+            sender.result()
+            await websocket.close()
     except WebSocketDisconnect:
-        print("Client disconnected from gesture stream")
+        log_event(log, "client_disconnected", session=session_id, client=client_id)
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        log_event(log, "client_error", logging.WARNING, session=session_id, client=client_id, error=e)
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        # The loser may have failed too (a send to a socket that just closed); that is expected
+        await asyncio.gather(sender, receiver, return_exceptions=True)
+        await hub.unsubscribe(queue)
+
+async def wait_for_disconnect(websocket):
+    """Read (and ignore) client messages until the client disconnects"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+async def send_frames(websocket, session_id, queue, encoder, cursor_filter):
+    """Drain one client's queue onto its socket until the stream ends"""
+    while True:
+        frame = await queue.get()
+        if frame is None:
+            # Producer stopped (source failed or finished)
+            return
+        
+        # Every frame goes through the filter, even ones the encoder suppresses
+        if cursor_filter is not None:
+            frame = cursor_filter.apply(frame)
+        
+        # Binary clients only get frames where something changed
+        start = time.perf_counter()
+        payload = encoder.encode(frame)
+        encoded = time.perf_counter()
+        STAGE_SECONDS.observe(encoded - start, session=session_id, stage="serialize")
+        if payload is None:
+            continue
+        send = websocket.send_bytes(payload) if isinstance(payload, bytes) else websocket.send_text(payload)
+        try:
+            # With the "latest" policy a stalled client never builds a backlog, so the send itself is bounded
+            await asyncio.wait_for(send, queue.grace)
+        except asyncio.TimeoutError:
+            queue.drop()
+            return
+        sent = time.perf_counter() - encoded
+        STAGE_SECONDS.observe(sent, session=session_id, stage="send")
+        CLIENT_SEND_SECONDS.observe(sent, session=session_id, client=queue.client_id)
+
+@app.get("/preview.mjpg")
+async def preview_endpoint():
+    """MJPEG preview of the default session"""
+    return preview_response(DEFAULT_SESSION)
+
+@app.get("/preview/{session_id}.mjpg")
+async def session_preview_endpoint(session_id: str):
+    """MJPEG preview of one session by ID"""
+    return preview_response(session_id)
+
+def preview_response(session_id):
+    hub = get_session(session_id) if PREVIEW_ENABLED else None
+    if hub is None:
+        raise HTTPException(status_code=404, detail=f"No preview for session '{session_id}'")
+    return StreamingResponse(preview_frames(hub), media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+
+async def preview_frames(hub):
+    """Annotated JPEGs for one viewer; the viewer keeps the session's producer running"""
+    preview = hub.detector.preview
+    loop = asyncio.get_running_loop()
+    queue = hub.subscribe()
+    preview.attach()
+    sequence = 0
+    try:
+        while True:
+            if await queue.get() is None:
+                break
+            if preview.sequence == sequence:
+                continue
+            # Drawing and encoding run on the default executor, away from the gesture workers
+            encoded = await loop.run_in_executor(None, preview.next_jpeg, sequence)
+            if encoded is not None:
+                sequence, jpeg = encoded
+                yield mjpeg_part(jpeg)
     finally:
-        detector.stop_camera()
+        preview.detach()
+        await hub.unsubscribe(queue)
 
 @app.get("/")
 async def root():
     """Health check endpoint"""
+    session_status = {}
+    for session_id in SESSION_SOURCES:
+        hub = sessions.get(session_id)
+        grabber = hub.detector.grabber if hub else None
+        session_status[session_id] = {
+            "websocket": "/ws/gestures" if session_id == DEFAULT_SESSION else f"/ws/gestures/{session_id}",
+            "preview": "/preview.mjpg" if session_id == DEFAULT_SESSION else f"/preview/{session_id}.mjpg",
+            "clients": len(hub.subscribers) if hub else 0,
+            "frames": {
+                "captured": grabber.sequence if grabber else 0,
+                "dropped": grabber.dropped_frames if grabber else 0
+            },
+            "camera": getattr(hub.detector.source, "mode", None) if hub else None
+        }
     return {
         "status": "running",
         "service": "Hand Gesture Control API",
-        "websocket": "/ws/gestures"
+        "websocket": "/ws/gestures",
+        "protocols": list(PROTOCOLS),
+        "filters": list(FILTERS),
+        "workers": INFERENCE_WORKERS,
+        "inference": {"backend": INFERENCE_BACKEND, "processes": INFERENCE_PROCESSES},
+        "max_hands": MAX_HANDS,
+        "sessions": session_status
     }
 
 @app.get("/health")
 async def health():
-    """Health check"""
-    return {"status": "healthy"}
+    """Health check; 503 while a session's source has failed, and with WARM_START until every session is warm"""
+    states = {
+        session_id: sessions[session_id].detector.status if session_id in sessions else "idle"
+        for session_id in SESSION_SOURCES
+    }
+    failed = any(state == "failed" for state in states.values())
+    ready = not failed and not any(state == "starting" for state in states.values())
+    status = "failed" if failed else "healthy" if ready else "starting"
+    body = {"status": status, "ready": ready, "sessions": states}
+    if failed or (WARM_START and not ready):
+        return JSONResponse(body, status_code=503)
+    return body
+
+def collect_session_metrics():
+    """Refresh the gauges that are read from live session state at scrape time"""
+    QUEUE_DEPTH.clear()
+    for session_id, hub in sessions.items():
+        grabber = hub.detector.grabber
+        CONNECTIONS.set(len(hub.subscribers), session=session_id)
+        CAPTURED_FRAMES.set(grabber.sequence if grabber else 0, session=session_id)
+        DROPPED_FRAMES.set(grabber.dropped_frames if grabber else 0, session=session_id)
+        for queue in hub.subscribers:
+            QUEUE_DEPTH.set(queue.qsize(), session=session_id, client=queue.client_id)
+
+registry.add_collector(collect_session_metrics)
+
+@app.get("/metrics")
+async def metrics():
+    """Pipeline metrics in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profile")
+async def profile(seconds: float = 5.0):
+    """Sample the capture/inference threads for a while and return folded stacks"""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (start the server with --profiling)")
+    if not profiler.start():
+        raise HTTPException(status_code=409, detail="A profile is already being recorded")
+    try:
+        await asyncio.sleep(min(max(seconds, 0.1), PROFILE_MAX_SECONDS))
+    finally:
+        dump = profiler.stop()
+    log_event(log, "profile_recorded", samples=profiler.samples, stacks=len(profiler.stacks))
+    return PlainTextResponse(dump)
+
+def run_replay(path, roi_enabled=ROI_TRACKING, inference_scale=INFERENCE_SCALE):
+    """Replay a recording offline and print the gestures it produces"""
+    replay_detector = GestureDetector(open_source(path), record_path=None)
+    replay_detector.roi = HandRoiTracker(roi_enabled, downscale=inference_scale, max_hands=replay_detector.max_hands)
+    
+    print(f"📼 Replaying {path}...")
+    frames = 0
+    first_time = last_time = None
+    started = time.perf_counter()
+    for gesture_data in replay_detector.replay():
+        frames += 1
+        if first_time is None:
+            first_time = gesture_data["timestamp"]
+        last_time = gesture_data["timestamp"]
+        if gesture_data["type"] not in ("none", "no_hand"):
+            print(f"  t={gesture_data['timestamp']:8.3f}s  hand {gesture_data['hand_id']:<3} "
+                  f"{gesture_data['type']:<6} {gesture_data.get('direction', '')}")
+    elapsed = time.perf_counter() - started
+    
+    if frames:
+        duration = last_time - first_time
+        print(f"✅ {frames} frames in {elapsed:.3f}s ({frames / elapsed:.0f} FPS, "
+              f"{duration / elapsed:.0f}x real time)")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hand Gesture Control Server")
+    parser.add_argument("--source", default=None,
+                        help="Camera index, video file, image directory or landmark recording")
+    parser.add_argument("--session", action="append", default=[], metavar="ID=SOURCE",
+                        help="Serve another source on /ws/gestures/ID (repeatable)")
+    parser.add_argument("--camera-backend", choices=CAMERA_BACKENDS, default=CAMERA_BACKEND,
+                        help="OpenCV capture backend for live sources")
+    parser.add_argument("--camera-fourcc", default=CAMERA_FOURCC,
+                        help="Pixel format requested from cameras, e.g. MJPG or YUYV")
+    parser.add_argument("--camera-size", type=parse_size, default=CAMERA_SIZE,
+                        help=f"Frame size WxH requested from cameras (default {CAM_W}x{CAM_H})")
+    parser.add_argument("--camera-fps", type=int, default=CAMERA_FPS, help="Frame rate requested from cameras")
+    parser.add_argument("--camera-buffer-size", type=int, default=CAMERA_BUFFER_SIZE,
+                        help="Driver frame queue depth")
+    parser.add_argument("--camera-exposure", type=parse_exposure, default=CAMERA_EXPOSURE,
+                        help='"auto" or a manual exposure value in driver units')
+    parser.add_argument("--record", default=RECORD_PATH,
+                        help="Record the session to .jsonl/.npz landmarks, a video file or an image directory")
+    parser.add_argument("--replay", default=None,
+                        help="Replay a recording offline instead of starting the server")
+    parser.add_argument("--roi", action="store_true", default=ROI_TRACKING,
+                        help="Crop inference around the tracked hand")
+    parser.add_argument("--inference-scale", type=float, default=INFERENCE_SCALE,
+                        help="Downscale factor for full-frame searches")
+    parser.add_argument("--backend", choices=BACKENDS, default=INFERENCE_BACKEND,
+                        help="Run MediaPipe in-process or in worker processes")
+    parser.add_argument("--processes", type=int, default=INFERENCE_PROCESSES,
+                        help="Worker processes per session with --backend process")
+    parser.add_argument("--temporal-skip", action="store_true", default=TEMPORAL_SKIP,
+                        help="Reuse the last landmarks while the hand is static instead of running inference")
+    parser.add_argument("--max-hands", type=int, default=MAX_HANDS,
+                        help="Hands tracked at once, each with its own gesture state")
+    parser.add_argument("--warm-start", action="store_true", default=WARM_START,
+                        help="Open sources and warm the model at startup, before the first client")
+    parser.add_argument("--camera-grace", type=float, default=CAMERA_GRACE_SECONDS,
+                        help="Seconds a source stays open after its last client (negative: until shutdown)")
+    parser.add_argument("--profiling", action="store_true", default=PROFILING_ENABLED,
+                        help="Serve /debug/profile?seconds=N (sampling profiler)")
+    args = parser.parse_args()
+    
+    INFERENCE_BACKEND = args.backend
+    INFERENCE_PROCESSES = args.processes
+    PROFILING_ENABLED = args.profiling
+    MAX_HANDS = args.max_hands
+    
+    if args.replay:
+        run_replay(args.replay, args.roi, args.inference_scale)
+        raise SystemExit(0)
+    
+    # Sessions are created on first connection and read these settings then
+    ROI_TRACKING = args.roi
+    INFERENCE_SCALE = args.inference_scale
+    TEMPORAL_SKIP = args.temporal_skip
+    RECORD_PATH = args.record
+    CAMERA_BACKEND = args.camera_backend
+    CAMERA_FOURCC = args.camera_fourcc
+    CAMERA_SIZE = args.camera_size
+    CAMERA_FPS = args.camera_fps
+    CAMERA_BUFFER_SIZE = args.camera_buffer_size
+    CAMERA_EXPOSURE = args.camera_exposure
+    WARM_START = args.warm_start
+    CAMERA_GRACE_SECONDS = args.camera_grace if args.camera_grace is None or args.camera_grace >= 0 else None
+    if args.source is not None:
+        SESSION_SOURCES[DEFAULT_SESSION] = args.source
+    for spec in args.session:
+        session_id, _, session_source = spec.partition("=")
+        if not session_id or not session_source:
+            parser.error(f"--session expects ID=SOURCE, got '{spec}'")
+        SESSION_SOURCES[session_id] = session_source
+    
     print("=" * 60)
     print("🚀 Starting Hand Gesture Control Server...")
     print("=" * 60)
     print("📡 WebSocket endpoint: ws://localhost:8000/ws/gestures")
+    for session_id, session_source in SESSION_SOURCES.items():
+        if session_id != DEFAULT_SESSION:
+            print(f"   └─ Session '{session_id}': ws://localhost:8000/ws/gestures/{session_id} ({session_source})")
+    print(f"🧵 Worker pool: {INFERENCE_WORKERS} threads")
+    if WARM_START:
+        print("🔥 Warm start: sources open and models warm up in the background (readiness on /health)")
+    if CAMERA_GRACE_SECONDS is None:
+        print("⏳ Sources stay open after the last client disconnects")
+    elif CAMERA_GRACE_SECONDS > 0:
+        print(f"⏳ Sources stay open {CAMERA_GRACE_SECONDS:g}s after the last client disconnects")
+    if MAX_HANDS > 1:
+        print(f"✋ Tracking up to {MAX_HANDS} hands (per-hand IDs and gesture state)")
+    if INFERENCE_BACKEND == "process":
+        print(f"   └─ Inference: {INFERENCE_PROCESSES} worker processes per session")
     print("🌐 Frontend should connect to this endpoint")
-    print("🎥 Camera Preview:", "ENABLED" if SHOW_CAMERA_WINDOW else "DISABLED")
-    if SHOW_CAMERA_WINDOW:
-        print(f"   └─ Window: '{WINDOW_NAME}'")
-        print(f"   └─ Size: {PREVIEW_WIDTH}x{PREVIEW_HEIGHT}")
+    print("📈 Metrics: http://localhost:8000/metrics")
+    if PROFILING_ENABLED:
+        print("   └─ Profiler: http://localhost:8000/debug/profile?seconds=5")
+    print("🎥 Camera Preview:", "ENABLED" if PREVIEW_ENABLED else "DISABLED")
+    if PREVIEW_ENABLED:
+        print(f"   └─ Open http://localhost:8000/preview.mjpg ({PREVIEW_FPS} FPS, rendered only while watched)")
     print("=" * 60)
-    print("\n💡 Tip: Set SHOW_CAMERA_WINDOW = False to disable preview\n")
+    print("\n💡 Tip: Set PREVIEW_ENABLED = False to disable the preview endpoint\n")
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,111 @@
+"""
+Temporal skip inference for static hands
+While a visitor holds a hand still over the tree (most of the time spent
+choosing where to pinch), consecutive frames give MediaPipe nothing new.
+TemporalSkip compares a small grayscale thumbnail of the hand region with the
+one taken at the last inference; while the difference stays under a motion
+threshold the frame reuses the previous landmarks instead of being inferred.
+Inference is forced on motion, whenever no hand was found, and after
+`max_skip` reused frames in a row, so new hands, pinches and swipes are still
+picked up within a few frames.
+
+Landmarks are reused rather than extrapolated: a frame only counts as static
+when the hand region barely changed, and projecting the last velocity forward
+would only add drift.
+
+With the process backend frames are checked when they are captured but results
+are stored when they come back, so the reference a frame is compared against is
+`capacity - 1` frames older than in the synchronous path. A frame queued as
+static before a no-hand result arrives reuses that result (no hands), never the
+hand seen before it.
+"""
+import numpy as np
+from gesture_inference import NO_HANDEDNESS, NO_LANDMARKS
+
+SKIP_MOTION_THRESHOLD = 2.5  # Mean absolute gray-level change of the hand thumbnail that counts as motion
+SKIP_MAX_FRAMES = 4  # Reused frames in a row before an inference is forced
+SKIP_MARGIN = 0.25  # Padding around the hands' bounding box, as a fraction of its size
+THUMBNAIL_SIZE = 24  # Side of the downsampled patch that is compared
+
+class TemporalSkip:
+    """Decides per frame whether MediaPipe can be skipped, and keeps the landmarks to reuse"""
+
+    def __init__(self, enabled=False, threshold=SKIP_MOTION_THRESHOLD, max_skip=SKIP_MAX_FRAMES,
+                 margin=SKIP_MARGIN, size=THUMBNAIL_SIZE):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.margin = margin
+        self.size = size
+        self.patch = np.empty((size, size, 3), dtype=np.uint8)  # Resize output, reused
+        self.inferred_frames = 0  # Frames checked and sent to inference
+        self.skipped_frames = 0  # Frames that reused the previous landmarks
+        self.reset()
+
+    def reset(self):
+        self.clear()
+        self.box = None  # (x0, y0, x1, y1) pixels around the hands in the raw frame
+        self.shape = None
+        self.skipped = 0  # Reused frames since the last inference
+
+    def clear(self):
+        """Forget the last landmarks; the next frame is inferred"""
+        self.landmarks = None  # Mirrored landmarks of the last inference, as clients get them
+        self.handedness = None
+        self.reference = None  # Thumbnail of the box at the last inference
+
+    def thumbnail(self, img):
+        import cv2
+        x0, y0, x1, y1 = self.box
+        cv2.resize(img[y0:y1, x0:x1], (self.size, self.size), dst=self.patch, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(self.patch, cv2.COLOR_BGR2GRAY)
+
+    def is_static(self, img):
+        """True when `img` may reuse the last landmarks; False means it has to be inferred"""
+        if not self.enabled:
+            return False
+        if self.reference is not None and self.skipped < self.max_skip and img.shape == self.shape:
+            import cv2
+            if float(cv2.absdiff(self.thumbnail(img), self.reference).mean()) <= self.threshold:
+                self.skipped += 1
+                self.skipped_frames += 1
+                return True
+        self.skipped = 0
+        self.inferred_frames += 1
+        return False
+
+    def reuse(self):
+        """(landmarks, handedness) of the last inference, for a static frame; no hands if it found none"""
+        if self.landmarks is None:
+            return NO_LANDMARKS, NO_HANDEDNESS
+        return self.landmarks.copy(), self.handedness
+
+    def store(self, img, landmarks, handedness):
+        """Remember an inference result (mirrored landmarks) and the hand region it came from"""
+        if not self.enabled:
+            return
+        if not len(landmarks):
+            # Nothing to reuse: every frame is inferred until a hand is found, and frames
+            # already queued as static (process backend) get no hands, not the previous one
+            self.clear()
+            return
+
+        h, w = img.shape[:2]
+        xs = (1.0 - landmarks[..., 0]) * w  # Back to raw image space
+        ys = landmarks[..., 1] * h
+        min_x, max_x = float(xs.min()), float(xs.max())
+        min_y, max_y = float(ys.min()), float(ys.max())
+        pad_x = (max_x - min_x) * self.margin
+        pad_y = (max_y - min_y) * self.margin
+        x0, x1 = max(int(min_x - pad_x), 0), min(int(max_x + pad_x) + 1, w)
+        y0, y1 = max(int(min_y - pad_y), 0), min(int(max_y + pad_y) + 1, h)
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            # Hand outside the frame or degenerate
+            self.clear()
+            return
+
+        self.box = (x0, y0, x1, y1)
+        self.shape = img.shape
+        self.landmarks = landmarks.copy()
+        self.handedness = handedness
+        self.reference = self.thumbnail(img)
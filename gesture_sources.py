@@ -0,0 +1,360 @@
+"""
+Frame and landmark sources for the gesture detector
+Lets GestureDetector run from a live camera, a video file, an image directory
+or a recorded landmark stream, and records sessions to those same formats.
+OpenCV is imported when a source first needs it, not at module import.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque, namedtuple
+import numpy as np
+from gesture_camera import CameraConfig, describe_mode, is_camera_spec, mode_matches, negotiated_mode, open_capture
+
+# One unit of input for the detector.
+#   image:     BGR frame as delivered by the device (not mirrored), or None
+#   landmarks: None when the image still has to go through MediaPipe, otherwise
+#              an (H, 21, 3) array of mirrored, normalized landmarks (H may be 0)
+#   timestamp: capture time in seconds, used for gesture cooldowns
+SourceFrame = namedtuple("SourceFrame", ["image", "landmarks", "timestamp"])
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+LANDMARK_EXTENSIONS = (".jsonl", ".npz")
+NUM_LANDMARKS = 21
+FRAME_POOL_SIZE = 6  # Spare frame buffers kept per source
+
+class FrameBufferPool:
+    """Frame arrays handed back by the consumer and reused for the next capture
+
+    acquire() returns None until a buffer has been released, in which case
+    OpenCV allocates one; after the first few frames every capture decodes
+    into a recycled array. Buffers of a different shape are simply dropped.
+    """
+
+    def __init__(self, max_size=FRAME_POOL_SIZE):
+        self.max_size = max_size
+        self.free = deque()
+        self.shape = None
+        self.lock = threading.Lock()  # Grabber thread acquires, worker thread releases
+
+    def acquire(self):
+        with self.lock:
+            return self.free.pop() if self.free else None
+
+    def release(self, buffer):
+        if buffer is None:
+            return
+        with self.lock:
+            if buffer.shape != self.shape:
+                self.shape = buffer.shape
+                self.free.clear()
+            if len(self.free) < self.max_size:
+                self.free.append(buffer)
+
+class FrameSource:
+    """Base class: open(), read() -> SourceFrame or None, close()
+
+    `realtime` sources (cameras) produce frames on their own clock and must be
+    drained continuously; offline sources can be read as fast as the consumer
+    wants. `exhausted` becomes True once an offline source has no more frames.
+    `frame_shape` is the (height, width, 3) of the images, when known after open().
+    Consumers call release(frame) once they are done with a frame's image so
+    sources with a buffer pool can decode the next frame into it.
+    Sessions reopen their source for every new producer, so open() after close()
+    starts an offline source over from its first frame.
+    """
+    realtime = False
+    provides_landmarks = False
+
+    def __init__(self):
+        self.exhausted = False
+        self.pool = None
+        self.frame_shape = None
+
+    def release(self, frame):
+        """Return a frame's image to the pool; the frame must not be used afterwards"""
+        if self.pool is not None and frame is not None:
+            self.pool.release(frame.image)
+
+    def open(self):
+        return True
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        """Iterate over every remaining frame of an offline source"""
+        while True:
+            frame = self.read()
+            if frame is None:
+                if self.exhausted:
+                    return
+                continue
+            yield frame
+
+class CameraSource(FrameSource):
+    """Live cv2.VideoCapture device, opened with the backend and mode of a CameraConfig
+
+    After open(), `mode` holds what the driver negotiated (see gesture_camera).
+    `capture_factory` replaces cv2.VideoCapture (a fake camera in tests).
+    """
+    realtime = True
+
+    def __init__(self, device=0, width=640, height=480, config=None, capture_factory=None):
+        super().__init__()
+        base = config if config is not None else CameraConfig(device)
+        self.config = base._replace(device=device, width=width, height=height)
+        self.capture_factory = capture_factory
+        self.cap = None
+        self.mode = None
+        self.pool = FrameBufferPool()
+
+    def open(self):
+        self.cap = open_capture(self.config, self.capture_factory)
+        if not self.cap.isOpened():
+            self.cap = None
+            return False
+
+        self.mode = negotiated_mode(self.cap)
+        if self.mode["width"] > 0 and self.mode["height"] > 0:
+            self.frame_shape = (self.mode["height"], self.mode["width"], 3)
+        return True
+
+    def describe(self):
+        """One line for the startup log: the negotiated mode, flagged when it is not the requested one"""
+        if self.mode is None:
+            return None
+        text = describe_mode(self.mode)
+        if not mode_matches(self.config, self.mode):
+            text += f" (requested {self.config.fourcc} {self.config.width}x{self.config.height} @ {self.config.fps})"
+        return text
+
+    def read(self):
+        success, img = self.cap.read(self.pool.acquire())
+        if not success:
+            return None
+        return SourceFrame(img, None, time.time())
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+class VideoFileSource(FrameSource):
+    """Recorded video clip, timestamped from the file's frame rate"""
+
+    def __init__(self, path, fps=None, capture_factory=None):
+        super().__init__()
+        self.path = path
+        self.fps = fps
+        self.capture_factory = capture_factory  # Replaces cv2.VideoCapture(path), e.g. in tests
+        self.cap = None
+        self.index = 0
+        self.pool = FrameBufferPool()
+
+    def open(self):
+        import cv2
+        self.index = 0
+        self.exhausted = False
+        self.cap = (self.capture_factory or cv2.VideoCapture)(self.path)
+        if not self.cap.isOpened():
+            self.cap = None
+            return False
+
+        if self.fps is None:
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        width, height = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width > 0 and height > 0:
+            self.frame_shape = (height, width, 3)
+        return True
+
+    def read(self):
+        success, img = self.cap.read(self.pool.acquire())
+        if not success:
+            self.exhausted = True
+            return None
+
+        timestamp = self.index / self.fps
+        self.index += 1
+        return SourceFrame(img, None, timestamp)
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+class ImageDirectorySource(FrameSource):
+    """Directory of still frames, read in file name order"""
+
+    def __init__(self, path, fps=30.0):
+        super().__init__()
+        self.path = path
+        self.fps = fps
+        self.files = []
+        self.index = 0
+
+    def open(self):
+        self.index = 0
+        self.exhausted = False
+        self.files = sorted(
+            f for f in glob.glob(os.path.join(self.path, "*"))
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if self.files:
+            import cv2
+            first = cv2.imread(self.files[0])
+            self.frame_shape = first.shape if first is not None else None
+        return bool(self.files)
+
+    def read(self):
+        if self.index >= len(self.files):
+            self.exhausted = True
+            return None
+
+        import cv2
+        img = cv2.imread(self.files[self.index])
+        timestamp = self.index / self.fps
+        self.index += 1
+        return SourceFrame(img, None, timestamp)
+
+class LandmarkFileSource(FrameSource):
+    """Recorded landmark stream (JSONL or NPZ); bypasses MediaPipe entirely
+
+    JSONL: one object per frame, {"t": timestamp, "hands": [[[x, y, z] * 21], ...]}
+    NPZ:   "timestamps" (T,) and "landmarks" (T, H, 21, 3), NaN where no hand
+    """
+    provides_landmarks = True
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.timestamps = None
+        self.landmarks = None
+        self.index = 0
+
+    def open(self):
+        self.index = 0
+        self.exhausted = False
+        if not os.path.exists(self.path):
+            return False
+        self.timestamps, self.landmarks = load_landmarks(self.path)
+        return True
+
+    def read(self):
+        if self.index >= len(self.timestamps):
+            self.exhausted = True
+            return None
+
+        hands = self.landmarks[self.index]
+        hands = hands[~np.isnan(hands).any(axis=(1, 2))]
+        frame = SourceFrame(None, hands, float(self.timestamps[self.index]))
+        self.index += 1
+        return frame
+
+def load_landmarks(path):
+    """Load a landmark recording as (timestamps (T,), landmarks (T, H, 21, 3))"""
+    if path.endswith(".npz"):
+        data = np.load(path)
+        return data["timestamps"].astype(np.float64), data["landmarks"].astype(np.float32)
+
+    timestamps = []
+    frames = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            timestamps.append(record["t"])
+            frames.append(record["hands"])
+
+    max_hands = max((len(hands) for hands in frames), default=0) or 1
+    landmarks = np.full((len(frames), max_hands, NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+    for i, hands in enumerate(frames):
+        if hands:
+            landmarks[i, :len(hands)] = hands
+    return np.asarray(timestamps, dtype=np.float64), landmarks
+
+def open_source(spec, width=640, height=480, camera=None):
+    """Build a source from a CLI-style spec: camera, video, image dir or landmark file
+
+    Cameras are an index, a /dev/video* path, a stream URL or a GStreamer
+    pipeline, opened with the `camera` CameraConfig (device and size come from
+    the spec and arguments).
+    """
+    if is_camera_spec(spec):
+        return CameraSource(int(spec) if str(spec).isdigit() else spec, width, height, camera)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec)
+    if spec.lower().endswith(LANDMARK_EXTENSIONS):
+        return LandmarkFileSource(spec)
+    return VideoFileSource(spec)
+
+class SessionRecorder:
+    """Records a detector session as landmarks (JSONL/NPZ), a video file or an image directory
+
+    Landmark formats store what the detector saw after MediaPipe, so replaying
+    them skips inference; video and image formats store the raw camera frames.
+    """
+
+    def __init__(self, path, fps=30.0):
+        self.path = path
+        self.fps = fps
+        self.frames = 0
+        self.file = None
+        self.writer = None
+        self.timestamps = []
+        self.landmarks = []
+
+        lower = path.lower()
+        if lower.endswith(".jsonl"):
+            self.mode = "jsonl"
+            self.file = open(path, "w")
+        elif lower.endswith(".npz"):
+            self.mode = "npz"
+        elif lower.endswith((".mp4", ".avi", ".mkv")):
+            self.mode = "video"
+        else:
+            self.mode = "images"
+            os.makedirs(path, exist_ok=True)
+
+    def write(self, image, landmarks, timestamp):
+        """Append one frame; landmarks is an (H, 21, 3) array or None/empty for no hand"""
+        if landmarks is None:
+            landmarks = np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+
+        if self.mode == "jsonl":
+            record = {"t": timestamp, "hands": np.round(landmarks, 5).tolist()}
+            self.file.write(json.dumps(record) + "\n")
+        elif self.mode == "npz":
+            self.timestamps.append(timestamp)
+            self.landmarks.append(np.asarray(landmarks, dtype=np.float32))
+        elif image is not None:
+            import cv2
+            if self.mode == "video":
+                if self.writer is None:
+                    h, w = image.shape[:2]
+                    fourcc = cv2.VideoWriter_fourcc(*("mp4v" if self.path.lower().endswith(".mp4") else "MJPG"))
+                    self.writer = cv2.VideoWriter(self.path, fourcc, self.fps, (w, h))
+                self.writer.write(image)
+            else:
+                cv2.imwrite(os.path.join(self.path, f"frame_{self.frames:06d}.png"), image)
+        self.frames += 1
+
+    def close(self):
+        if self.mode == "jsonl" and self.file is not None:
+            self.file.close()
+            self.file = None
+        elif self.mode == "npz":
+            max_hands = max((len(hands) for hands in self.landmarks), default=0) or 1
+            stacked = np.full((len(self.landmarks), max_hands, NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+            for i, hands in enumerate(self.landmarks):
+                stacked[i, :len(hands)] = hands
+            np.savez_compressed(self.path, timestamps=np.asarray(self.timestamps), landmarks=stacked)
+        elif self.writer is not None:
+            self.writer.release()
+            self.writer = None
@@ -0,0 +1,195 @@
+"""
+Gesture state machine
+Pure pinch/swipe classification over MediaPipe hand landmarks, separated from
+camera I/O, preview drawing and WebSocket sends so it can be replayed and tuned offline
+"""
+import math
+import numpy as np
+
+# Landmark indices (MediaPipe hand model)
+THUMB_TIP = 4
+INDEX_TIP = 8
+
+# Defaults, mirrored by the CONFIG block in gesture_server.py
+CAM_W, CAM_H = 640, 480
+PINCH_THRESHOLD = 30  # Pixels between index and thumb tips
+SWIPE_HORIZONTAL_THRESHOLD = 80  # Pixels
+SWIPE_VERTICAL_THRESHOLD = 80  # Pixels
+GESTURE_COOLDOWN = 0.8  # Seconds
+MOVEMENT_CONFIRMATION_FRAMES = 3
+
+SWIPE_ACTIONS = {
+    "left": "rotate_left",
+    "right": "rotate_right",
+    "up": "open_modal",
+    "down": "close_modal",
+}
+
+class GestureStateMachine:
+    """Turns a stream of (21, 3) landmark arrays and timestamps into gesture events
+
+    update() handles one live frame; classify_batch() runs a whole (T, 21, 3)
+    recording, computing the geometry for every frame in one vectorized pass.
+    Both share the same per-frame transition, so they always agree.
+    """
+
+    def __init__(self, pinch_threshold=PINCH_THRESHOLD,
+                 swipe_horizontal_threshold=SWIPE_HORIZONTAL_THRESHOLD,
+                 swipe_vertical_threshold=SWIPE_VERTICAL_THRESHOLD,
+                 cooldown=GESTURE_COOLDOWN,
+                 confirmation_frames=MOVEMENT_CONFIRMATION_FRAMES,
+                 frame_size=(CAM_W, CAM_H)):
+        self.frame_w, self.frame_h = frame_size
+        # Thresholds are given in pixels, landmarks are normalized (0-1)
+        self.pinch_threshold = pinch_threshold / self.frame_w
+        self.swipe_dx = swipe_horizontal_threshold / self.frame_w
+        self.swipe_dy = swipe_vertical_threshold / self.frame_h
+        self.cooldown = cooldown
+        self.confirmation_frames = confirmation_frames
+        self.reset()
+
+    def reset(self):
+        """Forget all tracking state, including cooldowns"""
+        # -inf so recordings whose timestamps start at 0 are not in cooldown
+        self.last_pinch_time = float("-inf")
+        self.last_swipe_horizontal_time = float("-inf")
+        self.last_swipe_vertical_time = float("-inf")
+        self.clear_movement()
+
+    def clear_movement(self):
+        """Forget the current movement (hand lost)"""
+        self.movement_start_x = None
+        self.movement_start_y = None
+        self.movement_direction = None  # 'left', 'right', 'up', 'down', or None
+        self.movement_confirmed_frames = 0
+
+    def update(self, landmarks, timestamp, pinching=None):
+        """Classify one frame; landmarks is a (21, 3) array or None when no hand is visible
+
+        Returns the gesture frame sent to clients: a dict with "type" ("none",
+        "no_hand", "pinch" or "swipe"), "timestamp", and when a hand is visible
+        "cursor" plus "direction"/"action" for events. `pinching` overrides the
+        fixed pixel threshold (e.g. with the hand-size-scaled pose classifier).
+        """
+        if landmarks is None:
+            self.step(False, 0.0, 0.0, False, timestamp)
+            return {"type": "no_hand", "timestamp": timestamp}
+
+        cx = float(landmarks[INDEX_TIP, 0])
+        cy = float(landmarks[INDEX_TIP, 1])
+        if pinching is None:
+            pinching = math.hypot(
+                cx - float(landmarks[THUMB_TIP, 0]),
+                cy - float(landmarks[THUMB_TIP, 1])
+            ) < self.pinch_threshold
+
+        gesture_data = {
+            "type": "none",
+            "timestamp": timestamp,
+            "cursor": {"x": cx, "y": cy}
+        }
+        event = self.step(True, cx, cy, pinching, timestamp)
+        if event is not None:
+            gesture_data.update(event)
+        return gesture_data
+
+    def classify_batch(self, landmarks, timestamps):
+        """Classify a recording of shape (T, 21, 3), NaN rows where no hand was visible
+
+        Returns a list of event dicts (pinch/swipe only), each tagged with its
+        frame index. Continues from the machine's current state.
+        """
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+
+        # Geometry for every frame at once
+        present = ~np.isnan(landmarks[:, INDEX_TIP, 0]) & ~np.isnan(landmarks[:, THUMB_TIP, 0])
+        tips = landmarks[:, INDEX_TIP, :2]
+        gap = tips - landmarks[:, THUMB_TIP, :2]
+        pinching = np.einsum("ij,ij->i", gap, gap) < self.pinch_threshold ** 2
+
+        # The transition itself is a cheap scalar scan over the precomputed columns
+        events = []
+        step = self.step
+        for i, (hand, cx, cy, pinch, t) in enumerate(zip(
+                present.tolist(), tips[:, 0].tolist(), tips[:, 1].tolist(),
+                pinching.tolist(), timestamps.tolist())):
+            event = step(hand, cx, cy, pinch, t)
+            if event is not None:
+                event["frame"] = i
+                event["timestamp"] = t
+                event["cursor"] = {"x": cx, "y": cy}
+                events.append(event)
+        return events
+
+    def step(self, hand, cx, cy, pinching, t):
+        """Advance the state by one frame, returns the event fields or None"""
+        if not hand:
+            # No hand detected - reset all tracking
+            self.clear_movement()
+            return None
+
+        event = None
+
+        # ========== ACTION 1: PINCH (Add Gift/Card) ==========
+        if pinching and t - self.last_pinch_time > self.cooldown:
+            event = {"type": "pinch", "action": "add_item"}
+            self.last_pinch_time = t
+
+        # ========== SWIPE DETECTION WITH ANTI-CANCELLATION ==========
+        if self.movement_start_x is None:
+            self.movement_start_x = cx
+            self.movement_start_y = cy
+
+        # Movement from the start position
+        dx = cx - self.movement_start_x
+        dy = cy - self.movement_start_y
+        has_horizontal_movement = abs(dx) > self.swipe_dx
+        has_vertical_movement = abs(dy) > self.swipe_dy
+
+        if has_horizontal_movement == has_vertical_movement:
+            # Still (or diagonal when both): hand returned to neutral - restart tracking
+            if not has_horizontal_movement:
+                self.movement_start_x = cx
+                self.movement_start_y = cy
+                self.movement_direction = None
+                self.movement_confirmed_frames = 0
+            return event
+
+        if has_horizontal_movement:
+            # ========== ACTION 2 & 3: SWIPE LEFT/RIGHT (Rotate) ==========
+            new_direction = "right" if dx > 0 else "left"
+            last_time = self.last_swipe_horizontal_time
+        else:
+            # ========== ACTION 4 & 5: SWIPE UP/DOWN (Open/Close Modal) ==========
+            # y increases downward
+            new_direction = "up" if dy < 0 else "down"
+            last_time = self.last_swipe_vertical_time
+
+        # Confirm movement direction
+        if self.movement_direction == new_direction:
+            self.movement_confirmed_frames += 1
+        else:
+            self.movement_direction = new_direction
+            self.movement_confirmed_frames = 1
+
+        # Trigger only if confirmed and cooldown passed
+        if (self.movement_confirmed_frames >= self.confirmation_frames and
+                t - last_time > self.cooldown):
+            event = {
+                "type": "swipe",
+                "direction": new_direction,
+                "action": SWIPE_ACTIONS[new_direction]
+            }
+            if has_horizontal_movement:
+                self.last_swipe_horizontal_time = t
+            else:
+                self.last_swipe_vertical_time = t
+
+            # Reset movement tracking to prevent re-trigger
+            self.movement_start_x = cx
+            self.movement_start_y = cy
+            self.movement_direction = None
+            self.movement_confirmed_frames = 0
+
+        return event
@@ -0,0 +1,144 @@
+"""
+Multi-hand tracking
+Gives every visible hand a stable track ID across frames by matching palm
+centres to where each track is expected to be (last centre plus its
+velocity), tracks seen in the previous frame first, and runs a separate GestureStateMachine per
+track so one hand's pinch cooldown or half-finished swipe never affects another.
+A track survives a few missed detections before its ID is retired.
+Each hand is also tagged with its static pose (see gesture_features).
+"""
+import numpy as np
+from gesture_features import classify_poses, extract_features
+from gesture_state import GestureStateMachine
+
+MAX_HANDS = 1  # Hands tracked at once (MediaPipe max_num_hands)
+MAX_MATCH_DISTANCE = 0.2  # Normalized palm-centre distance beyond which a detection starts a new track
+MAX_MISSED_FRAMES = 5  # Frames a track may go undetected before its ID is retired
+
+class HandTrack:
+    """One tracked hand: its ID, last position and gesture state"""
+
+    def __init__(self, hand_id, state):
+        self.hand_id = hand_id
+        self.state = state
+        self.centroid = None
+        self.velocity = np.zeros(2, dtype=np.float32)  # Centroid change per frame
+        self.handedness = None  # "Left", "Right", or None when unknown (recorded landmarks)
+        self.missed = 0
+
+class HandTracker:
+    """Assigns track IDs to the hands of each frame and classifies each track's gestures"""
+
+    def __init__(self, max_hands=MAX_HANDS, state_factory=GestureStateMachine,
+                 max_distance=MAX_MATCH_DISTANCE, max_missed=MAX_MISSED_FRAMES, pose_pinch=False):
+        self.max_hands = max_hands
+        self.pose_pinch = pose_pinch  # Pinch from the hand-size-scaled pose, not the pixel threshold
+        self.state_factory = state_factory
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.reset()
+
+    def reset(self):
+        self.tracks = []
+        self.spare_states = []  # State machines of retired tracks, reused so cooldowns carry over
+        self.next_id = 1
+
+    def match(self, centroids):
+        """Greedy nearest-centroid assignment, returns {detection index: track}
+
+        Pairs are taken in order of (frames the track was missed, distance), so a
+        hand still in view keeps its ID even when it passes where a lost one was.
+        """
+        if not self.tracks or not len(centroids):
+            return {}
+
+        predicted = np.array([track.centroid + track.velocity * (track.missed + 1) for track in self.tracks])
+        distances = np.linalg.norm(centroids[:, None, :] - predicted[None, :, :], axis=2)
+        missed = np.array([track.missed for track in self.tracks])
+        order = np.lexsort((distances.ravel(), np.broadcast_to(missed, distances.shape).ravel()))
+        matches = {}
+        used = set()
+        for flat in order:
+            det, trk = divmod(int(flat), len(self.tracks))
+            if distances[det, trk] > self.max_distance or det in matches or trk in used:
+                continue
+            matches[det] = self.tracks[trk]
+            used.add(trk)
+        return matches
+
+    def retire(self, track):
+        self.tracks.remove(track)
+        self.spare_states.append(track.state)
+
+    def new_track(self, unmatched):
+        """Start a track; when all max_hands slots are taken, the stalest unmatched track makes room"""
+        if len(self.tracks) >= self.max_hands:
+            self.retire(max(unmatched, key=lambda t: t.missed))
+        state = self.spare_states.pop() if self.spare_states else self.state_factory()
+        track = HandTrack(self.next_id, state)
+        self.next_id += 1
+        self.tracks.append(track)
+        return track
+
+    def update(self, landmarks, handedness, timestamp, features=None, poses=None):
+        """Classify one frame of (H, 21, 3) landmarks, returns one gesture dict per visible hand
+
+        Each dict is the hand's GestureStateMachine output tagged with "hand_id",
+        "handedness" and "pose", ordered by hand ID. `features` and `poses` are
+        extract_features()/classify_poses() of the same landmarks (truncated to
+        max_hands), if the caller already has them.
+        """
+        landmarks = landmarks[:self.max_hands]
+        if features is None:
+            features = extract_features(landmarks)
+        if poses is None:
+            poses = classify_poses(features)
+        centroids = features.palm_center
+        matches = self.match(centroids)
+        unmatched = [track for track in self.tracks if track not in matches.values()]
+
+        hands = []
+        for i, hand in enumerate(landmarks):
+            track = matches.get(i)
+            if track is None:
+                track = self.new_track(unmatched)
+                unmatched = [t for t in unmatched if t in self.tracks]
+            if track.centroid is not None and not track.missed:
+                track.velocity = centroids[i] - track.centroid
+            track.centroid = centroids[i]
+            track.missed = 0
+            if handedness is not None:
+                track.handedness = handedness[i]
+
+            pinching = poses[i] == "pinch" if self.pose_pinch else None
+            gesture_data = track.state.update(hand, timestamp, pinching)
+            gesture_data["hand_id"] = track.hand_id
+            gesture_data["handedness"] = track.handedness
+            gesture_data["pose"] = poses[i]
+            hands.append(gesture_data)
+
+        for track in unmatched:
+            # Same as a no_hand frame for this track: its movement is forgotten
+            track.state.clear_movement()
+            track.missed += 1
+            if track.missed > self.max_missed:
+                self.retire(track)
+
+        hands.sort(key=lambda h: h["hand_id"])
+        return hands
+
+def combine_hands(hands, timestamp, include_hands=False):
+    """Merge per-hand gesture dicts into the single frame published to clients
+
+    The top level describes one hand, so single-hand clients keep working: the
+    first hand that fired an event this frame, otherwise the lowest hand ID.
+    With include_hands every hand is also listed under "hands".
+    """
+    if not hands:
+        return {"type": "no_hand", "timestamp": timestamp}
+
+    primary = next((hand for hand in hands if hand["type"] in ("pinch", "swipe")), hands[0])
+    gesture_data = dict(primary)
+    if include_hands:
+        gesture_data["hands"] = hands
+    return gesture_data
@@ -1,110 +1,169 @@
-import mediapipe as mp
+"""
+Hand gesture mouse control
+Moves the OS pointer with the index finger: pinch clicks, a closed fist holds
+the button down (drag), and a fast sideways flick is reported as a rotation.
+Poses come from gesture_features, so the thresholds scale with hand size.
+Capture and inference run on the main thread; input is applied by an
+InputDriver thread (see gesture_input), so injection never delays the next
+frame and only the newest cursor target reaches the OS.
+
+    python hand_control.py                       # camera 0, pyautogui
+    python hand_control.py --injector xdotool
+    python hand_control.py --source clip.mp4 --injector record   # headless, prints injection stats
+"""
+import argparse
+import time
 import cv2
-import pyautogui
 import numpy as np
-import time
+from gesture_features import classify_poses, extract_features, palm_velocity
+from gesture_inference import create_backend
+from gesture_input import INJECT_RATE, INJECTORS, InputDriver, create_injector
+from gesture_sources import open_source
 
 # ================== CONFIG ==================
-SCREEN_W, SCREEN_H = pyautogui.size()
 CAM_W, CAM_H = 640, 480
 
-CLICK_THRESHOLD = 30
-SWIPE_THRESHOLD = 40
-SMOOTHING = 5
-
-# ============================================
-
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
-    max_num_hands=1,
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
-mp_draw = mp.solutions.drawing_utils
-
-cap = cv2.VideoCapture(0)
-cap.set(3, CAM_W)
-cap.set(4, CAM_H)
-
-prev_x = None
-dragging = False
-last_swipe_time = time.time()
-
-def get_distance(p1, p2):
-    return np.linalg.norm(np.array(p1) - np.array(p2))
-
-def fingers_up(lm):
-    tips = [4, 8, 12, 16, 20]
-    fingers = []
-    fingers.append(lm[tips[0]].x < lm[tips[0] - 1].x)
-    for i in range(1, 5):
-        fingers.append(lm[tips[i]].y < lm[tips[i] - 2].y)
-    return fingers
-
-while True:
-    success, img = cap.read()
-    if not success:
-        break
-
-    img = cv2.flip(img, 1)
-    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb)
+SWIPE_SPEED = 1.8  # Palm speed (frame widths per second) that counts as a flick
+CLICK_DEBOUNCE = 0.25  # Seconds between repeated clicks while pinching
+SWIPE_COOLDOWN = 0.6  # Seconds between rotations
 
-    if result.multi_hand_landmarks:
-        hand = result.multi_hand_landmarks[0]
-        lm = hand.landmark
+SOURCE = 0  # Camera index, video file, image directory or landmark recording
+INJECTOR = "pyautogui"  # "pyautogui", "xdotool", "uinput" or "record"
 
-        index_tip = lm[8]
-        thumb_tip = lm[4]
-
-        cx = int(index_tip.x * CAM_W)
-        cy = int(index_tip.y * CAM_H)
-
-        screen_x = np.interp(cx, (0, CAM_W), (0, SCREEN_W))
-        screen_y = np.interp(cy, (0, CAM_H), (0, SCREEN_H))
-
-        pyautogui.moveTo(screen_x, screen_y, duration=0.01)
-
-        dist = get_distance(
-            (index_tip.x * CAM_W, index_tip.y * CAM_H),
-            (thumb_tip.x * CAM_W, thumb_tip.y * CAM_H)
-        )
+# ============================================
 
-        if dist < CLICK_THRESHOLD:
-            pyautogui.click()
+class HandController:
+    """Turns one hand's landmarks per frame into pointer moves and button actions"""
+
+    def __init__(self, driver, screen_size):
+        self.driver = driver
+        self.screen_w, self.screen_h = screen_size
+        self.prev_palm = None  # (palm centre, timestamp) of the previous frame with a hand
+        self.dragging = False
+        # -inf so the first pinch or flick always fires
+        self.last_click_time = float("-inf")
+        self.last_swipe_time = float("-inf")
+
+    def update(self, landmarks, timestamp):
+        """Handle one frame; landmarks is an (H, 21, 3) array, only the first hand is used"""
+        if not len(landmarks):
+            self.prev_palm = None
+            return
+
+        landmarks = landmarks[:1]
+        features = extract_features(landmarks, (CAM_W, CAM_H))
+        pose = classify_poses(features)[0]
+
+        index_tip = landmarks[0, 8]
+        screen_x = np.clip(index_tip[0], 0.0, 1.0) * self.screen_w
+        screen_y = np.clip(index_tip[1], 0.0, 1.0) * self.screen_h
+        self.driver.move_to(screen_x, screen_y)
+
+        # Debounced by timestamp: the cursor keeps following the hand between clicks
+        if pose == "pinch" and timestamp - self.last_click_time >= CLICK_DEBOUNCE:
+            self.driver.act("click")
+            self.last_click_time = timestamp
             print("Roate click")
-            time.sleep(0.25)
 
-        finger_state = fingers_up(lm)
-        if finger_state == [False, False, False, False, False]:
-            if not dragging:
-                pyautogui.mouseDown()
+        if pose == "fist":
+            if not self.dragging:
+                self.driver.act("press")
                 print("Mouse down")
-                dragging = True
+                self.dragging = True
         else:
-            if dragging:
-                pyautogui.mouseUp()
+            if self.dragging:
+                self.driver.act("release")
                 print("Mouse up, drag")
-                dragging = False
+                self.dragging = False
 
-        current_time = time.time()
-        if prev_x is not None and current_time - last_swipe_time > 0.6:
-            dx = cx - prev_x
-            if dx > SWIPE_THRESHOLD:
+        palm = features.palm_center
+        if self.prev_palm is not None and timestamp - self.last_swipe_time > SWIPE_COOLDOWN:
+            previous, previous_time = self.prev_palm
+            vx = palm_velocity(palm, previous, timestamp - previous_time)[0, 0]
+            if vx > SWIPE_SPEED:
                 print("ROTATE RIGHT")
-                last_swipe_time = current_time
-            elif dx < -SWIPE_THRESHOLD:
+                self.last_swipe_time = timestamp
+            elif vx < -SWIPE_SPEED:
                 print("ROTATE LEFT")
-                last_swipe_time = current_time
-
-        prev_x = cx
-
-        mp_draw.draw_landmarks(img, hand, mp_hands.HAND_CONNECTIONS)
-
-    # cv2.imshow("Hand Gesture Control", img)
-
-    if cv2.waitKey(1) & 0xFF == 27:
-        break
-
-cap.release()
-cv2.destroyAllWindows()
+                self.last_swipe_time = timestamp
+
+        self.prev_palm = (palm, timestamp)
+
+    def close(self):
+        if self.dragging:
+            self.driver.act("release")
+            self.dragging = False
+
+def run(source, controller):
+    """Capture/inference loop; returns the number of frames processed"""
+    inference = None if source.provides_landmarks else create_backend("thread")
+    rgb = None
+    frames = 0
+    try:
+        while True:
+            frame = source.read()
+            if frame is None:
+                if source.exhausted:
+                    break
+                continue
+
+            landmarks = frame.landmarks
+            if landmarks is None:
+                # MediaPipe sees the raw frame; landmarks are mirrored instead of the image
+                if rgb is None or rgb.shape != frame.image.shape:
+                    rgb = np.empty_like(frame.image)
+                cv2.cvtColor(frame.image, cv2.COLOR_BGR2RGB, dst=rgb)
+                landmarks, _ = inference.process(rgb)
+                np.subtract(1.0, landmarks[..., 0], out=landmarks[..., 0])
+            source.release(frame)
+
+            controller.update(landmarks, frame.timestamp)
+            frames += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        controller.close()
+        if inference is not None:
+            inference.close()
+    return frames
+
+def print_stats(driver, frames, elapsed):
+    print(f"\n📊 {frames} frames in {elapsed:.2f}s ({frames / max(elapsed, 1e-9):.0f} FPS)")
+    print(f"   cursor moves: {driver.moves_requested} requested, {driver.moves_applied} applied "
+          f"({driver.moves_requested - driver.moves_applied} coalesced)")
+    for operation, samples in driver.inject_times.items():
+        if samples:
+            values = np.asarray(samples) * 1e6
+            print(f"   {operation:<8} {len(values):>6} calls  mean {values.mean():8.1f} µs  "
+                  f"p95 {np.percentile(values, 95):8.1f} µs")
+    if driver.latencies:
+        values = np.asarray(driver.latencies) * 1000
+        print(f"   request -> injected: p50 {np.percentile(values, 50):.2f} ms, "
+              f"p95 {np.percentile(values, 95):.2f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Control the mouse pointer with hand gestures")
+    parser.add_argument("--source", default=SOURCE,
+                        help="Camera index, video file, image directory or landmark recording")
+    parser.add_argument("--injector", choices=INJECTORS, default=INJECTOR, help="How input reaches the OS")
+    parser.add_argument("--rate", type=float, default=INJECT_RATE, help="Cursor moves applied per second at most")
+    args = parser.parse_args(argv)
+
+    source = open_source(args.source, CAM_W, CAM_H)
+    if not source.open():
+        raise SystemExit(f"Cannot open source {args.source}")
+
+    injector = create_injector(args.injector)
+    driver = InputDriver(injector, args.rate)
+    controller = HandController(driver, injector.screen_size)
+    driver.start()
+    started = time.perf_counter()
+    try:
+        frames = run(source, controller)
+    finally:
+        source.close()
+        driver.stop()
+    print_stats(driver, frames, time.perf_counter() - started)
+
+if __name__ == "__main__":
+    main()
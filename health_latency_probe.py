@@ -0,0 +1,81 @@
+"""
+Latency probe for the gesture server
+Measures /health response time while idle and while gestures are streaming,
+to check that camera reads and inference stay off the event loop
+"""
+import argparse
+import asyncio
+import time
+import websockets
+
+async def http_get(host, port, path):
+    """Minimal HTTP/1.1 GET, returns the response body (also used by gesture_loadgen)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return response.partition(b"\r\n\r\n")[2].decode(errors="replace")
+
+async def probe_health(host, port, samples, interval):
+    """Hit /health repeatedly and collect response times in milliseconds"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await http_get(host, port, "/health")
+        timings.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return timings
+
+async def stream_client(uri, counter, stop):
+    """Keep one gesture stream open and count the frames it receives"""
+    async with websockets.connect(uri) as websocket:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(websocket.recv(), timeout=0.5)
+                counter[0] += 1
+            except asyncio.TimeoutError:
+                pass
+
+def report(label, timings):
+    ordered = sorted(timings)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    print(f"{label:<12} n={len(ordered):<4} min={ordered[0]:6.2f}ms  p50={pick(0.5):6.2f}ms  "
+          f"p95={pick(0.95):6.2f}ms  max={ordered[-1]:6.2f}ms")
+
+async def main(args):
+    uri = f"ws://{args.host}:{args.port}/ws/gestures"
+
+    print("⏱️  Probing /health with no gesture stream...")
+    idle = await probe_health(args.host, args.port, args.samples, args.interval)
+
+    print(f"📡 Opening {args.clients} gesture stream(s) on {uri}...")
+    counter = [0]
+    stop = asyncio.Event()
+    clients = [asyncio.create_task(stream_client(uri, counter, stop)) for _ in range(args.clients)]
+    await asyncio.sleep(args.warmup)
+
+    print("⏱️  Probing /health while streaming...")
+    frames_before = counter[0]
+    started = time.perf_counter()
+    streaming = await probe_health(args.host, args.port, args.samples, args.interval)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await asyncio.gather(*clients, return_exceptions=True)
+
+    print("-" * 60)
+    report("idle", idle)
+    report("streaming", streaming)
+    print(f"stream rate  {(counter[0] - frames_before) / elapsed / args.clients:.1f} frames/s per client")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--clients", type=int, default=1, help="Concurrent gesture streams")
+    parser.add_argument("--samples", type=int, default=200, help="/health requests per phase")
+    parser.add_argument("--interval", type=float, default=0.02, help="Seconds between requests")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds to let the camera start")
+    asyncio.run(main(parser.parse_args()))
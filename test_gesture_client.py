@@ -2,12 +2,16 @@
 Test script for gesture server
 Run this to verify the gesture detection is working
 """
+import argparse
 import asyncio
 import websockets
 import json
+from gesture_protocol import decode_binary
 
-async def test_gesture_server():
+async def test_gesture_server(protocol="json"):
     uri = "ws://localhost:8000/ws/gestures"
+    if protocol != "json":
+        uri += f"?protocol={protocol}"
     
     print("🔌 Connecting to gesture server...")
     print(f"📡 URI: {uri}")
@@ -22,7 +26,10 @@ async def test_gesture_server():
             gesture_count = 0
             
             async for message in websocket:
-                data = json.loads(message)
+                if isinstance(message, bytes):
+                    data = decode_binary(message)
+                else:
+                    data = json.loads(message)
                 gesture_count += 1
                 
                 # Clear previous line
@@ -31,25 +38,23 @@ async def test_gesture_server():
                 # Display gesture type
                 gesture_type = data.get('type', 'unknown')
                 
-                if gesture_type == 'click':
-                    print("👆 CLICK detected!", end="")
-                elif gesture_type == 'drag_start':
-                    print("✊ DRAG START!", end="")
-                elif gesture_type == 'dragging':
-                    print("🤜 Dragging...", end="")
-                elif gesture_type == 'drag_end':
-                    print("🖐️ DRAG END!", end="")
+                if gesture_type == 'pinch':
+                    print(f"🤏 PINCH ({data.get('action', 'add_item')})!", end="")
                 elif gesture_type == 'swipe':
                     direction = data.get('direction', '?')
-                    if direction == 'right':
-                        print("👉 SWIPE RIGHT!", end="")
-                    else:
-                        print("👈 SWIPE LEFT!", end="")
+                    arrow = {'left': '👈', 'right': '👉', 'up': '👆', 'down': '👇'}.get(direction, '❓')
+                    print(f"{arrow} SWIPE {direction.upper()} ({data.get('action', '?')})!", end="")
                 elif gesture_type == 'no_hand':
                     print("❌ No hand detected", end="")
                 else:
                     print(f"🖐️ Hand detected", end="")
                 
+                # Hand ID and pose, when the server reports them
+                if 'hand_id' in data:
+                    print(f" | Hand {data['hand_id']}", end="")
+                if data.get('pose'):
+                    print(f" ({data['pose']})", end="")
+                
                 # Display cursor position if available
                 if 'cursor' in data:
                     cursor = data['cursor']
@@ -72,12 +77,17 @@ async def test_gesture_server():
         print(f"\n❌ Error: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gesture server test client")
+    parser.add_argument("--binary", action="store_true",
+                        help="Use the packed binary protocol (frames only sent on change)")
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("🧪 Gesture Server Test Client")
     print("=" * 50)
     print()
     
-    asyncio.run(test_gesture_server())
+    asyncio.run(test_gesture_server("binary" if args.binary else "json"))
     
     print("\n" + "=" * 50)
     print("✅ Test completed")
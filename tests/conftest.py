@@ -0,0 +1,239 @@
+"""
+Shared fixtures: a fake camera, a scripted MediaPipe and the app wired to both
+FakeVideoCapture stands in for cv2.VideoCapture and writes each frame's index
+into its pixels; ScriptedHands stands in for MediaPipe Hands and reads that
+index back to return the landmarks a test scripted for the frame. The server
+code between them (sources, pacing, ROI, mirroring, tracking, state machine,
+broadcast) is the real one.
+"""
+import functools
+import json
+import time
+import types
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+import gesture_server
+from gesture_protocol import decode_binary
+from gesture_server import FrameScheduler, GestureDetector, GestureHub, app
+from gesture_sources import VideoFileSource
+
+FPS = 30.0
+FRAME_W, FRAME_H = gesture_server.CAM_W, gesture_server.CAM_H
+
+# CAP_PROP_* ids the fake answers (values of the cv2 constants, so cv2 is not needed here)
+CAP_PROP_FRAME_WIDTH = 3
+CAP_PROP_FRAME_HEIGHT = 4
+CAP_PROP_FPS = 5
+CAP_PROP_FOURCC = 6
+CAP_PROP_FRAME_COUNT = 7
+CAP_PROP_BUFFERSIZE = 38
+
+def encode_index(image, index):
+    """Frame index in the first two pixels, the same value in every channel so BGR->RGB keeps it"""
+    image[0, 0] = index & 0xFF
+    image[0, 1] = (index >> 8) & 0xFF
+
+def decode_index(image):
+    return int(image[0, 0, 0]) | int(image[0, 1, 0]) << 8
+
+class FakeVideoCapture:
+    """cv2.VideoCapture stand-in producing `frames` numbered frames (None: endless)
+
+    With realtime=True reads are paced at `fps`, like a camera; otherwise they
+    return at once, like a video file.
+    """
+
+    def __init__(self, frames=None, fps=FPS, realtime=False, width=FRAME_W, height=FRAME_H):
+        self.frames = frames
+        self.realtime = realtime
+        self.props = {
+            CAP_PROP_FRAME_WIDTH: float(width),
+            CAP_PROP_FRAME_HEIGHT: float(height),
+            CAP_PROP_FPS: float(fps),
+            CAP_PROP_FOURCC: float(0x47504A4D),  # "MJPG"
+            CAP_PROP_FRAME_COUNT: float(frames or 0),
+            CAP_PROP_BUFFERSIZE: 1.0,
+        }
+        self.index = 0
+        self.opened = True
+        self.started = None
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        if not self.opened or (self.frames is not None and self.index >= self.frames):
+            return False, None
+        if self.realtime:
+            if self.started is None:
+                self.started = time.perf_counter()
+            due = self.started + self.index / self.props[CAP_PROP_FPS]
+            time.sleep(max(0.0, due - time.perf_counter()))
+
+        shape = (int(self.props[CAP_PROP_FRAME_HEIGHT]), int(self.props[CAP_PROP_FRAME_WIDTH]), 3)
+        if image is None or image.shape != shape:
+            image = np.zeros(shape, dtype=np.uint8)
+        encode_index(image, self.index)
+        self.index += 1
+        return True, image
+
+    def get(self, prop):
+        return self.props.get(prop, 0.0)
+
+    def set(self, prop, value):
+        # Like most drivers: FOURCC, size and rate are kept as requested, the rest is accepted silently
+        self.props[prop] = float(value)
+        return True
+
+    def getBackendName(self):
+        return "FAKE"
+
+    def release(self):
+        self.opened = False
+
+class ScriptedHands:
+    """MediaPipe Hands stand-in returning the landmarks scripted for each frame index
+
+    `script` maps a frame index to a list of (21, 3) landmark arrays in client
+    (mirrored) coordinates, as the frontend sees them; frames not in the script
+    have no hand. With `period`, the script repeats every `period` frames.
+    """
+
+    def __init__(self, script, period=None, **options):
+        self.script = script
+        self.period = period
+        self.max_num_hands = options.get("max_num_hands", 1)
+
+    def process(self, image):
+        index = decode_index(image)
+        if self.period:
+            index %= self.period
+        hands = self.script.get(index, [])[:self.max_num_hands]
+        landmarks, handedness = [], []
+        for hand in hands:
+            # MediaPipe sees the raw camera image: un-mirror so the server's mirroring restores the script
+            points = [types.SimpleNamespace(x=1.0 - x, y=y, z=z) for x, y, z in np.asarray(hand).tolist()]
+            landmarks.append(types.SimpleNamespace(landmark=points))
+            label = types.SimpleNamespace(label="Left", score=0.99)
+            handedness.append(types.SimpleNamespace(classification=[label]))
+        return types.SimpleNamespace(multi_hand_landmarks=landmarks or None, multi_handedness=handedness or None)
+
+    def close(self):
+        pass
+
+def hand_at(x, y, pinch=False, size=0.15):
+    """(21, 3) landmarks of an upright hand whose index fingertip (the cursor) is at (x, y)
+
+    Open hand by default; with pinch=True the thumb and index tips touch.
+    """
+    points = np.zeros((21, 3), np.float32)
+    bases = {1: -0.35, 5: -0.2, 9: 0.0, 13: 0.18, 17: 0.34}
+    for base, dx in bases.items():
+        points[base] = (dx, -0.3 if base == 1 else -0.9, 0.0)
+        if base != 1:
+            points[base + 1:base + 4, 0] = dx
+            points[base + 1:base + 4, 1] = (-1.3, -1.6, -1.85)
+    points[2:5, :2] = ((-0.55, -0.5), (-0.75, -0.75), (-0.9, -1.0))  # Thumb
+    if pinch:
+        points[6:9, :2] = ((-0.35, -1.25), (-0.6, -1.3), (-0.85, -1.1))  # Index bent onto the thumb tip
+    points[:, 0] *= size * FRAME_H / FRAME_W
+    points[:, 1] *= size
+    points[:, :2] += np.array([x, y], np.float32) - points[8, :2]
+    return points
+
+def script_from_path(path):
+    """Script from one entry per frame: (x, y), (x, y, pinch) or None for no hand"""
+    return {i: [hand_at(*point)] for i, point in enumerate(path) if point is not None}
+
+def stream(client, query=""):
+    """Every message of the default session until the clip ends"""
+    frames = []
+    with client.websocket_connect(f"/ws/gestures{query}") as websocket:
+        while True:
+            try:
+                message = websocket.receive()
+            except WebSocketDisconnect:
+                break
+            if message["type"] == "websocket.close":
+                break
+            if message.get("bytes") is not None:
+                frames.append(decode_binary(message["bytes"]))
+            else:
+                frames.append(json.loads(message["text"]))
+    return frames
+
+def frame_types(detector):
+    """Run an open detector to the end of its source, returns the type of every frame it produced"""
+    types = []
+    while True:
+        try:
+            gesture_data = detector.capture_and_process()
+        except EOFError:
+            return types
+        if gesture_data is not None:
+            types.append(gesture_data["type"])
+
+@pytest.fixture
+def process_detector():
+    """GestureDetector on the process inference backend with scripted hands: process_detector(source, script)
+
+    The source is not opened; it is released again after the test.
+    """
+    detectors = []
+
+    def build(source, script, processes=2):
+        detector = GestureDetector(source, record_path=None, log_gestures=False, backend="process",
+                                   processes=processes, hands_factory=functools.partial(ScriptedHands, script))
+        detectors.append(detector)
+        return detector
+
+    yield build
+    for detector in detectors:
+        detector.stop_source()
+
+@pytest.fixture
+def fast_pacing(monkeypatch):
+    """Run the detection loop far above the camera rate, so offline scripts finish quickly"""
+    monkeypatch.setattr(gesture_server, "FrameScheduler",
+                        functools.partial(FrameScheduler, target_fps=1000, idle_fps=1000))
+
+@pytest.fixture
+def install_session(monkeypatch):
+    """Install a session fed by the fake camera and scripted hands: install_session(source, script, period=None)"""
+    monkeypatch.setattr(gesture_server, "CAMERA_GRACE_SECONDS", None)
+    installed = []
+
+    def install(source, script, period=None, session_id=gesture_server.DEFAULT_SESSION):
+        detector = GestureDetector(source, record_path=None, name=session_id,
+                                   hands_factory=functools.partial(ScriptedHands, script, period))
+        gesture_server.sessions[session_id] = GestureHub(detector)
+        installed.append(session_id)
+        return detector
+
+    yield install
+    for session_id in installed:
+        gesture_server.sessions.pop(session_id, None)
+
+@pytest.fixture
+def scripted_client(install_session, fast_pacing):
+    """TestClient whose default session replays a script offline: scripted_client(path) -> TestClient
+
+    The clip has exactly len(path) frames at FPS, so frame i has timestamp i / FPS
+    and the stream closes after the last one.
+    """
+    clients = []
+
+    def start(path):
+        frames = len(path)
+        install_session(VideoFileSource("scripted.avi", capture_factory=lambda name: FakeVideoCapture(frames)),
+                        script_from_path(path))
+        client = TestClient(app)
+        client.__enter__()
+        clients.append(client)
+        return client
+
+    yield start
+    for client in clients:
+        client.__exit__(None, None, None)
@@ -0,0 +1,34 @@
+"""
+Camera mode probing on the fake camera
+"""
+import gesture_server
+from conftest import FakeVideoCapture
+from gesture_camera import CameraConfig, print_probe, probe_modes
+
+def test_probe_skips_modes_that_fail_and_prints_reproducible_flags(capsys):
+    opened = []
+
+    def capture_factory(device, api):
+        cap = FakeVideoCapture(realtime=True, fps=60)
+        if not opened:
+            cap.release()  # The first mode is refused by the device
+        opened.append(cap)
+        return cap
+
+    config = CameraConfig(0, backend="v4l2")
+    results = probe_modes(config, ["MJPG"], [(640, 480), (1280, 720)], [30], frames=5,
+                          capture_factory=capture_factory)
+
+    assert len(results) == 2
+    assert results[0]["requested"]["width"] == 1280 and results[0]["matched"]
+    assert results[-1]["negotiated"] is None and results[-1]["requested"]["width"] == 640
+
+    print_probe(results, config)
+    output = capsys.readouterr().out
+    assert "failed to open" in output
+    assert "--source 0 --camera-backend v4l2 --camera-fourcc MJPG --camera-size 1280x720 --camera-fps 30" in output
+
+def test_server_requests_the_configured_camera_size(monkeypatch):
+    monkeypatch.setattr(gesture_server, "CAMERA_SIZE", (1280, 720))
+    source = gesture_server.open_session_source("0")
+    assert (source.config.width, source.config.height) == (1280, 720)
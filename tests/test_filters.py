@@ -0,0 +1,26 @@
+"""
+Server-side cursor filters: prediction only applies to live sources
+"""
+import pytest
+from conftest import FPS, stream
+from gesture_filters import make_cursor_filter
+from gesture_protocol import EncodedFrame
+
+def test_file_session_is_not_predicted(scripted_client):
+    path = [(0.2 + 0.01 * i, 0.5) for i in range(30)]
+    frames = stream(scripted_client(path), "?cursor=all&filter=one_euro&predict=1")
+
+    # File timestamps start at 0, so a predicted cursor would run MAX_PREDICTION ahead;
+    # it must match plain smoothing of the same frames
+    smoothing = make_cursor_filter({"filter": "one_euro"})
+    expected = []
+    for i, (x, y) in enumerate(path):
+        cursor = smoothing.apply(EncodedFrame({"type": "none", "timestamp": i / FPS, "cursor": {"x": x, "y": y}}))
+        expected.extend(cursor.data["cursor"].values())
+    received = [value for frame in frames for value in frame["cursor"].values()]
+    assert received == pytest.approx(expected, abs=1e-6)
+
+def test_prediction_follows_the_source_clock():
+    params = {"filter": "kalman", "predict": "1"}
+    assert make_cursor_filter(params).predict
+    assert not make_cursor_filter(params, realtime=False).predict
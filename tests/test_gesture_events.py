@@ -0,0 +1,94 @@
+"""
+End-to-end gesture events: scripted hand trajectories in, exact WebSocket events out
+Each test scripts where the index fingertip is on every frame (client coordinates,
+30 FPS), streams the session over /ws/gestures and checks which frames fired
+which events, including the 0.8 s cooldowns.
+"""
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from conftest import FPS, stream
+
+def still(x, y, frames, pinch=False):
+    return [(x, y, pinch)] * frames
+
+def events(frames):
+    """(frame index, type, action) of every pinch and swipe"""
+    return [(round(frame["timestamp"] * FPS), frame["type"], frame["action"])
+            for frame in frames if frame["type"] in ("pinch", "swipe")]
+
+def swipe(start, step, frames=3):
+    """A fast flick: `frames` steps of `step` from `start`, each well over the swipe threshold"""
+    (x, y), (dx, dy) = start, step
+    return [(x + dx * i, y + dy * i, False) for i in range(1, frames + 1)]
+
+def test_pinch_fires_once_per_cooldown(scripted_client):
+    path = (still(0.5, 0.5, 5)
+            + still(0.5, 0.5, 16, pinch=True)  # Held pinch: one event
+            + still(0.5, 0.5, 4)
+            + still(0.5, 0.5, 4, pinch=True)  # Re-pinch 0.67 s after the first: inside the cooldown
+            + still(0.5, 0.5, 11)
+            + still(0.5, 0.5, 6, pinch=True)  # 1.17 s after the first
+            + still(0.5, 0.5, 4))
+    frames = stream(scripted_client(path), "?cursor=all")
+
+    assert events(frames) == [(5, "pinch", "add_item"), (40, "pinch", "add_item")]
+    assert len(frames) == len(path)
+
+@pytest.mark.parametrize("start, step, direction, action", [
+    ((0.2, 0.5), (0.15, 0.0), "right", "rotate_right"),
+    ((0.8, 0.5), (-0.15, 0.0), "left", "rotate_left"),
+    ((0.5, 0.8), (0.0, -0.2), "up", "open_modal"),
+    ((0.5, 0.2), (0.0, 0.2), "down", "close_modal"),
+])
+def test_swipe_directions(scripted_client, start, step, direction, action):
+    flick = swipe(start, step)
+    path = still(*start, 5) + flick + still(*flick[-1][:2], 12)
+    frames = stream(scripted_client(path), "?cursor=all")
+
+    # Three frames past the threshold confirm the direction: frames 5, 6 and 7
+    assert events(frames) == [(7, "swipe", action)]
+    assert [frame["direction"] for frame in frames if frame["type"] == "swipe"] == [direction]
+
+def test_swipe_cooldown(scripted_client):
+    back = [(0.4, 0.5), (0.3, 0.5), (0.2, 0.5), (0.1, 0.5)]  # Slow return: under the threshold every frame
+    path = (still(0.05, 0.5, 5)
+            + swipe((0.05, 0.5), (0.15, 0.0))  # Fires on frame 7
+            + back + still(0.05, 0.5, 1)
+            + swipe((0.05, 0.5), (0.15, 0.0))  # Confirmed on frame 15, 0.27 s later: suppressed
+            + back + still(0.05, 0.5, 21)
+            + swipe((0.05, 0.5), (0.15, 0.0))  # Frame 43, 1.2 s after the first
+            + still(0.5, 0.5, 5))
+    frames = stream(scripted_client(path), "?cursor=all")
+
+    assert events(frames) == [(7, "swipe", "rotate_right"), (43, "swipe", "rotate_right")]
+
+def test_slow_movement_is_not_a_swipe(scripted_client):
+    path = [(0.1 + 0.02 * i, 0.5) for i in range(40)]
+    frames = stream(scripted_client(path), "?cursor=all")
+
+    assert events(frames) == []
+    assert {frame["type"] for frame in frames} == {"none"}
+
+def test_cursor_and_no_hand_frames(scripted_client):
+    path = still(0.25, 0.4, 3) + [None] * 3 + still(0.75, 0.6, 3)
+    frames = stream(scripted_client(path), "?cursor=all")
+
+    assert [frame["type"] for frame in frames] == ["none"] * 3 + ["no_hand"] * 3 + ["none"] * 3
+    # The fake camera is un-mirrored by the server, so clients get the scripted coordinates back
+    assert frames[0]["cursor"] == pytest.approx({"x": 0.25, "y": 0.4}, abs=1e-5)
+    assert frames[-1]["cursor"] == pytest.approx({"x": 0.75, "y": 0.6}, abs=1e-5)
+    assert frames[0]["pose"] == "open"
+
+def test_binary_protocol_carries_the_same_events(scripted_client):
+    path = (still(0.5, 0.5, 5) + still(0.5, 0.5, 3, pinch=True) + still(0.5, 0.5, 2)
+            + swipe((0.5, 0.5), (-0.15, 0.0)) + still(0.05, 0.5, 5))
+    frames = stream(scripted_client(path), "?protocol=binary")
+
+    assert events(frames) == [(5, "pinch", "add_item"), (12, "swipe", "rotate_left")]
+
+def test_unknown_session_is_rejected(scripted_client):
+    client = scripted_client(still(0.5, 0.5, 1))
+    with client.websocket_connect("/ws/gestures/nope") as websocket:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1008
@@ -0,0 +1,144 @@
+"""
+Session hub: producer lifecycle and per-client queues
+The hub runs on its own event loop with the fake camera, so the timing of a
+producer that is still releasing its source can be controlled.
+"""
+import asyncio
+import time
+from fastapi.testclient import TestClient
+import gesture_server
+from conftest import FakeVideoCapture, hand_at
+from gesture_protocol import EncodedFrame, make_encoder
+from gesture_server import ClientQueue, send_frames
+from gesture_sources import CameraSource, VideoFileSource
+
+class FakeWebSocket:
+    """The parts of starlette's WebSocket that stream_session uses; the client leaves once `left` is set"""
+
+    def __init__(self, query_params=None, stalled=False):
+        self.query_params = query_params or {}
+        self.stalled = stalled  # Sends never complete, like a client that stopped reading
+        self.sent = []
+        self.left = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        await self.left.wait()
+        return {"type": "websocket.disconnect", "code": 1001}
+
+    async def send_bytes(self, payload):
+        await self.send_text(payload)
+
+    async def send_text(self, payload):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(payload)
+
+    async def close(self, code=1000, reason=None):
+        pass
+
+def live_session(install_session, script):
+    """Hub of a default session on an endless realtime fake camera"""
+    detector = install_session(
+        CameraSource(capture_factory=lambda device, api: FakeVideoCapture(realtime=True)), script, period=1)
+    return gesture_server.sessions[detector.name]
+
+def test_client_joining_during_shutdown_keeps_its_stream(install_session, monkeypatch):
+    monkeypatch.setattr(gesture_server, "IDLE_POLL_INTERVAL", 0.01)
+    hub = live_session(install_session, {0: [hand_at(0.5, 0.5)]})
+    detector = hub.detector
+
+    stop_source = detector.stop_source
+    def slow_stop_source():
+        time.sleep(0.3)  # A camera that takes a while to release
+        stop_source()
+    monkeypatch.setattr(detector, "stop_source", slow_stop_source)
+
+    async def scenario():
+        first = hub.subscribe()
+        assert await asyncio.wait_for(first.get(), 5.0) is not None
+        await hub.unsubscribe(first)
+
+        # The old producer is still in stop_source when the next client arrives
+        stopping = asyncio.create_task(hub.stop_producer())
+        await asyncio.sleep(0.05)
+        second = hub.subscribe()
+        await stopping
+
+        frame = await asyncio.wait_for(second.get(), 5.0)
+        finished = second.finished
+        await hub.unsubscribe(second)
+        await hub.stop_producer()
+        return frame, finished
+
+    frame, finished = asyncio.run(scenario())
+    assert not finished
+    assert frame is not None and frame.data["type"] == "none"
+
+def test_stalled_client_is_dropped_without_new_events():
+    queue = ClientQueue(1, limit=2, grace=0.05)
+    dropped = []
+    queue.on_slow = lambda: dropped.append(True)
+    for i in range(3):
+        queue.put(EncodedFrame({"type": "pinch", "action": "add_item", "timestamp": i}))
+    assert not queue.slow
+
+    # Nobody pinches or swipes any more: only cursor frames arrive after the grace period
+    time.sleep(0.06)
+    queue.put(EncodedFrame({"type": "none", "timestamp": 3.0, "cursor": {"x": 0.5, "y": 0.5}}))
+    assert queue.slow and dropped == [True]
+    assert queue.qsize() == 0
+
+def test_binary_client_leaving_while_idle_is_unsubscribed(install_session, monkeypatch):
+    monkeypatch.setattr(gesture_server, "IDLE_POLL_INTERVAL", 0.01)
+    hub = live_session(install_session, {})
+
+    async def scenario():
+        websocket = FakeWebSocket({"protocol": "binary"})
+        session = asyncio.create_task(gesture_server.stream_session(websocket, hub.detector.name))
+        try:
+            while not websocket.sent:
+                await asyncio.sleep(0.01)
+            # No hand in view: the binary encoder sends the first no_hand frame, then nothing
+            await asyncio.sleep(0.2)
+            sent = len(websocket.sent)
+            websocket.left.set()
+            await asyncio.wait_for(session, 2.0)
+            return sent, len(hub.subscribers)
+        finally:
+            session.cancel()
+            await hub.stop_producer()
+
+    sent, subscribers = asyncio.run(scenario())
+    assert sent == 1
+    assert subscribers == 0
+
+def test_client_stuck_in_a_send_is_dropped():
+    async def scenario():
+        # "latest" policy: the stalled client never holds more than one frame
+        queue = ClientQueue(1, limit=2, grace=0.05)
+        sender = asyncio.create_task(send_frames(FakeWebSocket(stalled=True), "default", queue,
+                                                 make_encoder("json"), None))
+        queue.on_slow = sender.cancel
+        queue.put(EncodedFrame({"type": "none", "timestamp": 0.0, "cursor": {"x": 0.5, "y": 0.5}}))
+        await asyncio.wait([sender], timeout=2.0)
+        return queue, sender
+
+    queue, sender = asyncio.run(scenario())
+    assert sender.done() and queue.slow
+
+def test_health_reports_a_source_that_failed_to_open(install_session):
+    def missing_file(path):
+        capture = FakeVideoCapture()
+        capture.opened = False
+        return capture
+    install_session(VideoFileSource("missing.avi", capture_factory=missing_file), {})
+
+    with TestClient(gesture_server.app) as client:
+        with client.websocket_connect("/ws/gestures") as websocket:
+            websocket.receive()  # Closed as soon as the producer gives up
+        response = client.get("/health")
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
@@ -0,0 +1,66 @@
+"""
+Process inference backend: in-place conversion into shared memory, slot sizing
+"""
+import functools
+import os
+import numpy as np
+import pytest
+from conftest import FakeVideoCapture, ScriptedHands, decode_index, encode_index, frame_types, hand_at
+from gesture_inference import ProcessInferenceBackend
+from gesture_sources import VideoFileSource
+
+class CrashingHands(ScriptedHands):
+    """Takes its worker process down on frame `crash_at`, like a crash inside MediaPipe"""
+
+    def __init__(self, crash_at, **options):
+        super().__init__({}, **options)
+        self.crash_at = crash_at
+
+    def process(self, image):
+        if decode_index(image) == self.crash_at:
+            os._exit(1)
+        return super().process(image)
+
+def test_frame_buffer_is_submitted_without_a_copy(monkeypatch):
+    hands_factory = functools.partial(ScriptedHands, {5: [hand_at(0.5, 0.5)]})
+    backend = ProcessInferenceBackend(1, (8, 8, 3), hands_factory=hands_factory)
+    copies = []
+    copyto = np.copyto
+    monkeypatch.setattr(np, "copyto", lambda *args, **kwargs: copies.append(args) or copyto(*args, **kwargs))
+    try:
+        view = backend.frame_buffer((8, 8, 3))
+        assert np.shares_memory(view, backend.buffers)
+        view[:] = 0
+        encode_index(view, 5)
+        backend.submit(view)
+        landmarks, _ = backend.result()
+        assert len(landmarks) == 1 and copies == []
+
+        # Anything else is still copied, and a lent slot that was not used goes back
+        backend.frame_buffer((8, 8, 3))
+        frame = np.zeros((4, 4, 3), np.uint8)
+        backend.submit(frame)
+        landmarks, _ = backend.result()
+        assert len(landmarks) == 0 and len(copies) == 1
+        assert len(backend.free_slots) == backend.slots
+    finally:
+        backend.close()
+
+def test_process_backend_fits_a_larger_camera_mode(process_detector):
+    script = {1: [hand_at(0.3, 0.5)], 2: [hand_at(0.3, 0.5)]}
+    detector = process_detector(
+        VideoFileSource("hd.avi", capture_factory=lambda path: FakeVideoCapture(4, width=1280, height=720)), script)
+    assert detector.start_source()
+    assert detector.inference.slot_bytes == 1280 * 720 * 3
+    assert frame_types(detector) == ["no_hand", "none", "none", "no_hand"]
+
+def test_result_fails_once_a_worker_dies_mid_frame():
+    backend = ProcessInferenceBackend(2, (8, 8, 3), hands_factory=functools.partial(CrashingHands, 0))
+    try:
+        backend.submit(np.zeros((8, 8, 3), np.uint8))
+        # Frame 0 died with its worker; the other worker is still alive
+        with pytest.raises(RuntimeError, match="exited"):
+            backend.result()
+        assert sum(worker.is_alive() for worker in backend.workers) == 1
+    finally:
+        backend.close()
@@ -0,0 +1,84 @@
+"""
+Load test: hundreds of WebSocket clients on a live (fake) camera session
+Starts the real app under uvicorn on a free port, feeds it an endless 30 FPS
+fake camera looping a swipe and a pinch, and runs gesture_loadgen.py against it
+in a separate process. Fails when a client cannot connect or gets dropped, when
+events stop reaching clients, or when p95 latency from capture to client
+exceeds the budget.
+
+    python -m pytest -m load
+    LOAD_CLIENTS=500 LOAD_P95_MS=400 python -m pytest -m load -s
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import uvicorn
+from conftest import FRAME_H, FRAME_W, FakeVideoCapture, hand_at
+from gesture_server import app
+from gesture_sources import CameraSource
+
+LOAD_CLIENTS = int(os.environ.get("LOAD_CLIENTS", 200))
+LOAD_SECONDS = float(os.environ.get("LOAD_SECONDS", 5.0))
+LOAD_P95_MS = float(os.environ.get("LOAD_P95_MS", 250.0))  # Capture -> client, generous for shared CI machines
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.load
+
+def looping_script():
+    """Two seconds at 30 FPS: a right swipe, a slow return, then a pinch"""
+    path = ([(0.2, 0.5)] * 5
+            + [(0.35, 0.5), (0.5, 0.5), (0.65, 0.5)]
+            + [(0.65, 0.5)] * 12
+            + [(0.55, 0.5), (0.45, 0.5), (0.35, 0.5), (0.25, 0.5)]
+            + [(0.2, 0.5)] * 11
+            + [(0.2, 0.5, True)] * 5
+            + [(0.2, 0.5)] * 20)
+    return {i: [hand_at(*point)] for i, point in enumerate(path)}, len(path)
+
+@pytest.fixture
+def live_server(install_session):
+    """ws:// URL of the app served by uvicorn on a free port, default session on a realtime fake camera"""
+    script, period = looping_script()
+    install_session(CameraSource(0, FRAME_W, FRAME_H,
+                                 capture_factory=lambda device, api: FakeVideoCapture(realtime=True)),
+                    script, period)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", backlog=LOAD_CLIENTS * 2))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10.0
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.05)
+
+    yield f"ws://127.0.0.1:{port}/ws/gestures"
+    server.should_exit = True
+    thread.join(timeout=10.0)
+    sock.close()
+
+def test_many_clients(live_server):
+    command = [sys.executable, os.path.join(ROOT, "gesture_loadgen.py"), "--url", live_server,
+               "--clients", str(LOAD_CLIENTS), "--seconds", str(LOAD_SECONDS), "--json"]
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=LOAD_SECONDS + 120)
+    assert result.stdout, result.stderr
+    report = json.loads(result.stdout)
+    print(json.dumps(report, indent=2))
+
+    assert report["connected"] == LOAD_CLIENTS
+    assert report["failed"] == 0, report["errors"]
+    # Two-second loop with a swipe and a pinch: every client sees events all along
+    assert report["events_per_client"] >= LOAD_SECONDS / 2
+    assert report["frames_per_client"]["min"] > 0
+    assert report["latency_ms"]["p95"] <= LOAD_P95_MS
+    assert report["event_latency_ms"]["p95"] <= LOAD_P95_MS
+    assert report["server_cpu_seconds"] is not None
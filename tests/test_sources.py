@@ -0,0 +1,30 @@
+"""
+Frame sources reopened by consecutive sessions
+"""
+import json
+from conftest import hand_at, stream
+from gesture_sources import LandmarkFileSource
+
+def test_second_client_replays_the_clip_from_the_start(scripted_client):
+    path = [(0.5, 0.5)] * 5 + [(0.5, 0.5, True)] * 3 + [None] * 2
+    client = scripted_client(path)
+    first = stream(client, "?cursor=all")
+    second = stream(client, "?cursor=all")
+
+    assert len(first) == len(second) == len(path)
+    assert [(f["type"], f["timestamp"]) for f in second] == [(f["type"], f["timestamp"]) for f in first]
+    assert second[0]["timestamp"] == 0.0
+
+def test_landmark_file_reopens_from_the_first_frame(tmp_path):
+    recording = tmp_path / "session.jsonl"
+    with open(recording, "w") as f:
+        for i in range(3):
+            f.write(json.dumps({"t": i / 30, "hands": [hand_at(0.5, 0.5).tolist()]}) + "\n")
+
+    source = LandmarkFileSource(str(recording))
+    for _ in range(2):
+        assert source.open()
+        timestamps = [frame.timestamp for frame in source]
+        source.close()
+        assert timestamps == [0.0, 1 / 30, 2 / 30]
+        assert source.exhausted
@@ -0,0 +1,35 @@
+"""
+Temporal skip: reused landmarks, and the reference age with the process backend
+"""
+import numpy as np
+from conftest import FakeVideoCapture, frame_types, hand_at
+from gesture_skip import TemporalSkip
+from gesture_sources import VideoFileSource
+
+def test_no_hand_result_is_reused_as_no_hand():
+    skip = TemporalSkip(enabled=True)
+    image = np.zeros((480, 640, 3), np.uint8)
+    skip.store(image, hand_at(0.5, 0.5)[None], ("Right",))
+    assert skip.is_static(image)
+    assert len(skip.reuse()[0]) == 1
+
+    # A frame already judged static before the empty result came back
+    skip.store(image, np.empty((0, 21, 3), np.float32), ())
+    landmarks, handedness = skip.reuse()
+    assert landmarks.shape == (0, 21, 3) and handedness == ()
+    assert not skip.is_static(image)
+
+def test_pipelined_static_check_uses_an_older_reference(process_detector):
+    # Hand on frame 0 only; the fake camera's frames are identical, so every
+    # frame with a reference counts as static
+    detector = process_detector(VideoFileSource("clip.avi", capture_factory=lambda path: FakeVideoCapture(6)),
+                                {0: [hand_at(0.5, 0.5)]})
+    detector.skipper = TemporalSkip(enabled=True, max_skip=1)
+    assert detector.start_source()
+    types = frame_types(detector)
+
+    # Frame 2 is checked while frame 1 is in flight, against frame 0's hand
+    # (capacity - 1 frames older than the synchronous path would use), and is
+    # skipped. Frame 1 then comes back without a hand, so frame 2 reuses no hands.
+    assert types[:3] == ["none", "no_hand", "no_hand"]
+    assert detector.skipper.skipped_frames >= 1